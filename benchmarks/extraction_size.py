@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Extraction Size Benchmark
+
+Compares the flattened page text with the accessibility outline for a set of URLs
+and reports character counts, estimated tokens and the reduction for each page.
+
+Usage:
+    python benchmarks/extraction_size.py https://example.com https://news.ycombinator.com
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.browser.engine import PlaywrightBrowser
+from src.browser.accessibility import estimate_tokens
+
+DEFAULT_URLS = [
+    "https://example.com",
+    "https://news.ycombinator.com",
+    "https://en.wikipedia.org/wiki/Web_browser",
+]
+
+
+def main():
+    """Run the extraction size comparison."""
+    urls = sys.argv[1:] or DEFAULT_URLS
+    browser = PlaywrightBrowser(headless=True)
+
+    print(f"{'URL':<50} {'text chars':>10} {'tree chars':>10} {'text tok':>9} {'tree tok':>9} {'saved':>7}")
+    try:
+        for url in urls:
+            if not browser.navigate(url).get("success"):
+                print(f"{url:<50} navigation failed")
+                continue
+
+            text = browser.get_content() or ""
+            # Compare against the same 15,000 character cap the providers apply
+            text = text[:15000]
+            tree = browser.get_accessibility_tree(max_tokens=3000) or ""
+
+            saved = 1 - (len(tree) / len(text)) if text else 0
+            print(f"{url[:50]:<50} {len(text):>10} {len(tree):>10} "
+                  f"{estimate_tokens(text):>9} {estimate_tokens(tree):>9} {saved:>6.0%}")
+    finally:
+        browser.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Fast-Path Planner Benchmark
+
+Runs a list of commands through the rule-based planner and reports which share of them
+it plans without a model call, per rule, how long the rules take per command, and the
+planner time they save at a given model planning latency.
+
+Usage:
+    python benchmarks/fast_planner.py [--commands commands.txt] [--plan-seconds 1.5]
+
+The commands file has one command per line. Without it, a built-in sample of typical
+commands is used. Pass the mean planning time from the fast_planner section of
+GET /metrics as --plan-seconds to estimate the savings for a real provider.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.ai.fast_planner import plan_command
+
+SAMPLE_COMMANDS = [
+    "open example.com",
+    "Go to https://news.ycombinator.com and summarize the top stories",
+    "visit wikipedia.org",
+    "what does python.org say about the latest release",
+    "search browser automation on Google",
+    "look up the history of the printing press",
+    "search for \"rust async runtimes\" on duckduckgo",
+    "What is the capital of France?",
+    "How do I reverse a list in Python?",
+    "Explain the difference between TCP and UDP",
+    "what's the weather in Berlin today?",
+    "log in to github.com and open my notifications",
+    "compare the prices of the iPhone on amazon.com and bestbuy.com",
+    "click the first result",
+    "summarize this page",
+    "find the cheapest flight from London to Paris next Friday and book it",
+]
+
+
+def main():
+    """Plan the commands with the rules and print the summary."""
+    parser = argparse.ArgumentParser(description="Benchmark the rule-based fast-path planner")
+    parser.add_argument("--commands", type=Path, help="file with one command per line")
+    parser.add_argument("--plan-seconds", type=float, default=1.5, help="mean duration of a model planner call")
+    args = parser.parse_args()
+    
+    commands = SAMPLE_COMMANDS
+    if args.commands:
+        commands = [line.strip() for line in args.commands.read_text().splitlines() if line.strip()]
+    
+    handled = {}
+    started = time.perf_counter()
+    for command in commands:
+        result = plan_command(command)
+        rule = result[0] if result else "model"
+        handled[rule] = handled.get(rule, 0) + 1
+    rule_ms = (time.perf_counter() - started) * 1000 / len(commands)
+    
+    print(f"{'planner':<10} {'commands':>9} {'share':>7}")
+    for rule in ("url", "search", "question", "model"):
+        print(f"{rule:<10} {handled.get(rule, 0):>9} {handled.get(rule, 0) / len(commands):>7.0%}")
+    
+    fast = len(commands) - handled.get("model", 0)
+    print(f"Rules take {rule_ms:.3f} ms per command")
+    print(f"Saved at {args.plan_seconds} s per planner call: {fast * args.plan_seconds:.1f} s over "
+          f"{len(commands)} commands ({fast * args.plan_seconds / len(commands):.2f} s per command on average)")
+
+
+if __name__ == '__main__':
+    main()
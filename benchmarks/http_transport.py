@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+HTTP Transport Benchmark
+
+Sends chat completion requests to a local stub server, first with a new connection
+per call (bare requests.post, as the providers used to) and then through the shared
+pooled transport, and reports the per-call latency and the connections opened.
+
+Usage:
+    python benchmarks/http_transport.py [--calls 200] [--tls]
+
+With --tls the stub server uses a throwaway self-signed certificate created with the
+openssl command, so the TLS handshake is part of the per-call cost as it is with the
+real endpoints.
+"""
+
+import sys
+import ssl
+import json
+import time
+import tempfile
+import argparse
+import threading
+import statistics
+import subprocess
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import requests
+from src.ai.http_transport import HttpTransport
+
+COMPLETION = json.dumps({
+    "choices": [{"message": {"role": "assistant", "content": "{\"actions\": []}"}}]
+}).encode("utf-8")
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a fixed chat completion and counts new connections."""
+    
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment, or Nagle and delayed ACKs stall keep-alive calls
+    disable_nagle_algorithm = True
+    wbufsize = -1
+    connections = set()
+    
+    def setup(self):
+        super().setup()
+        StubChatHandler.connections.add(self.client_address)
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def create_certificate(directory):
+    """Create a self-signed certificate for 127.0.0.1 with openssl."""
+    cert, key = Path(directory) / "cert.pem", Path(directory) / "key.pem"
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+                    "-keyout", str(key), "-out", str(cert)],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+def measure(call, calls):
+    """Run call() repeatedly and return the per-call latencies in milliseconds."""
+    StubChatHandler.connections.clear()
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(label, latencies):
+    """Print the latency summary of one variant."""
+    print(f"{label:<22} {statistics.mean(latencies):>8.2f} {statistics.median(latencies):>8.2f} "
+          f"{sorted(latencies)[int(len(latencies) * 0.95)]:>8.2f} {len(StubChatHandler.connections):>12}")
+
+
+def main():
+    """Run both variants against the stub server."""
+    parser = argparse.ArgumentParser(description="Benchmark pooled against per-call HTTP connections")
+    parser.add_argument("--calls", type=int, default=200, help="requests per variant")
+    parser.add_argument("--tls", action="store_true", help="serve the stub over HTTPS")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubChatHandler)
+    scheme, verify = "http", True
+    tempdir = tempfile.TemporaryDirectory()
+    if args.tls:
+        cert, key = create_certificate(tempdir.name)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme, verify = "https", str(cert)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    url = f"{scheme}://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    headers = {"Content-Type": "application/json", "Authorization": "Bearer test"}
+    payload = {"model": "stub", "messages": [{"role": "user", "content": "hello"}]}
+    
+    transport = HttpTransport()
+    transport.session.verify = verify
+    # REQUESTS_CA_BUNDLE would otherwise take precedence over the session's verify setting
+    transport.session.trust_env = False
+    
+    def bare_call():
+        response = requests.post(url, headers=headers, json=payload, verify=verify)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+    
+    try:
+        print(f"{'variant':<22} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'connections':>12}")
+        bare = measure(bare_call, args.calls)
+        report("requests.post", bare)
+        pooled = measure(lambda: transport.chat_completion(url, headers, payload), args.calls)
+        report("shared transport", pooled)
+        print(f"Saved per call: {statistics.mean(bare) - statistics.mean(pooled):.2f} ms")
+    finally:
+        server.shutdown()
+        tempdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
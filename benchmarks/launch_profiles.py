@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Launch Profile Benchmark
+
+Launches the Playwright browser with each launch profile and reports the cold launch
+time, the time of the first navigation and the resident memory of the browser processes.
+
+Usage:
+    python benchmarks/launch_profiles.py [--runs 3] [--url https://example.com]
+
+Without --url the first navigation goes to a page served locally, so network latency
+does not hide the differences between profiles. Memory is read from /proc and is only
+reported on Linux.
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import statistics
+from pathlib import Path
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.browser.engine import PlaywrightBrowser
+from src.browser.launch_profiles import LAUNCH_PROFILES
+
+TEST_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Launch benchmark</title></head>
+<body><main><h1>Launch benchmark</h1><ul>""" + b"".join(
+    b"<li><a href='#%d'>Item %d</a></li>" % (i, i) for i in range(200)
+) + b"""</ul></main></body></html>"""
+
+
+class TestPageHandler(SimpleHTTPRequestHandler):
+    """Serves the same small HTML page for every request."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(TEST_PAGE)))
+        self.end_headers()
+        self.wfile.write(TEST_PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def browser_rss_bytes():
+    """Sum the resident memory of all Chromium processes started by this process."""
+    if not Path("/proc").exists():
+        return None
+
+    parents = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            parents[int(entry.name)] = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+
+    descendants = set()
+    frontier = {os.getpid()}
+    while frontier:
+        children = {pid for pid, parent in parents.items() if parent in frontier} - descendants
+        descendants |= children
+        frontier = children
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for pid in descendants:
+        try:
+            cmdline = Path(f"/proc/{pid}/cmdline").read_bytes()
+            if b"chrom" not in cmdline and b"headless_shell" not in cmdline:
+                continue
+            total += int(Path(f"/proc/{pid}/statm").read_text().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+def run_profile(profile, url):
+    """Launch one browser with the given profile and measure it."""
+    started = time.perf_counter()
+    browser = PlaywrightBrowser(headless=True, launch_profile=profile)
+    launch_seconds = time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        browser.navigate(url)
+        navigation_seconds = time.perf_counter() - started
+        rss = browser_rss_bytes()
+    finally:
+        browser.close()
+
+    return launch_seconds, navigation_seconds, rss
+
+
+def main():
+    """Run the benchmark for every launch profile."""
+    parser = argparse.ArgumentParser(description="Benchmark Chromium launch profiles")
+    parser.add_argument("--runs", type=int, default=3, help="launches per profile")
+    parser.add_argument("--url", help="URL for the first navigation (defaults to a local test page)")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), TestPageHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    print(f"{'profile':<12} {'launch s':>9} {'first nav s':>12} {'RSS MB':>8}")
+    try:
+        for profile in LAUNCH_PROFILES:
+            results = [run_profile(profile, url) for _ in range(args.runs)]
+            launch = statistics.median(result[0] for result in results)
+            navigation = statistics.median(result[1] for result in results)
+            rss_values = [result[2] for result in results if result[2] is not None]
+            rss = f"{statistics.median(rss_values) / (1024 * 1024):.0f}" if rss_values else "n/a"
+            print(f"{profile:<12} {launch:>9.2f} {navigation:>12.2f} {rss:>8}")
+    finally:
+        if server:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
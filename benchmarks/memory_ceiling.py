@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Memory Ceiling Check
+
+Runs the low-resource extraction pipeline (Requests browser with capped downloads and
+a content budget) against a large local page inside a memory-capped child process, and
+fails if the child runs out of memory or exceeds the ceiling.
+
+Usage:
+    python benchmarks/memory_ceiling.py [--limit-mb 128] [--page-mb 64] [--pages 5]
+
+On Linux with a writable cgroup v2 hierarchy the child runs in its own cgroup with
+memory.max set to the limit. Otherwise the child's address space is capped with
+RLIMIT_AS, which is stricter because it also counts memory that is mapped but unused.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import threading
+import subprocess
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+CHUNK = b"<p>" + b"low resource mode " * 200 + b"</p>\n"
+
+
+class LargePageHandler(BaseHTTPRequestHandler):
+    """Streams an HTML page of the requested size in megabytes (/<size>)."""
+    
+    def do_GET(self):
+        size = int(self.path.strip("/") or 1) * 1024 * 1024
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        
+        sent = 0
+        try:
+            while sent < size:
+                chunk = CHUNK[:size - sent]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # The capped reader hangs up early on purpose
+            pass
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def run_child(url, pages):
+    """Fetch and extract the page the way a low-resource task does, then report."""
+    from src.browser.engine import RequestsBrowser
+    
+    config = json.loads((project_root / "config" / "config.json").read_text())
+    low_resource = config.get("lowResource", {})
+    max_chars = low_resource.get("maxContentChars", 4000)
+    
+    browser = RequestsBrowser(max_download_bytes=low_resource.get("maxDownloadKB", 512) * 1024)
+    started = time.perf_counter()
+    for _ in range(pages):
+        result = browser.navigate(url)
+        if not result.get("success"):
+            print(json.dumps({"error": result.get("error")}))
+            return 1
+        content = (browser.get_content() or "")[:max_chars]
+    browser.close()
+    
+    print(json.dumps({
+        "content_chars": len(content),
+        "seconds": round(time.perf_counter() - started, 2),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }))
+    return 0
+
+
+def create_cgroup(limit_bytes):
+    """Create a cgroup v2 group with a memory limit, or return None if that is not possible."""
+    if not (CGROUP_ROOT / "cgroup.controllers").exists():
+        return None
+    group = CGROUP_ROOT / f"browser-agent-memory-{os.getpid()}"
+    try:
+        group.mkdir()
+        (group / "memory.max").write_text(str(limit_bytes))
+        (group / "memory.swap.max").write_text("0")
+    except OSError:
+        try:
+            group.rmdir()
+        except OSError:
+            pass
+        return None
+    return group
+
+
+def main():
+    """Run the pipeline under a memory ceiling and report whether it fits."""
+    parser = argparse.ArgumentParser(description="Check the low-resource pipeline against a memory ceiling")
+    parser.add_argument("--limit-mb", type=int, default=128, help="memory ceiling for the child process")
+    parser.add_argument("--page-mb", type=int, default=64, help="size of the served page")
+    parser.add_argument("--pages", type=int, default=5, help="pages fetched by the child")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        return run_child(args.child, args.pages)
+    
+    if not sys.platform.startswith("linux"):
+        print("Memory ceilings are only supported on Linux")
+        return 0
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LargePageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/{args.page_mb}"
+    limit_bytes = args.limit_mb * 1024 * 1024
+    
+    group = create_cgroup(limit_bytes)
+    if group:
+        def apply_limit():
+            (group / "cgroup.procs").write_text(str(os.getpid()))
+        method = "cgroup memory.max"
+    else:
+        def apply_limit():
+            resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+        method = "RLIMIT_AS"
+    
+    try:
+        child = subprocess.run(
+            [sys.executable, __file__, "--child", url, "--pages", str(args.pages)],
+            preexec_fn=apply_limit, capture_output=True, text=True, timeout=300
+        )
+    finally:
+        server.shutdown()
+        if group:
+            try:
+                group.rmdir()
+            except OSError:
+                pass
+    
+    print(f"Ceiling: {args.limit_mb} MB ({method}), page: {args.page_mb} MB x {args.pages}")
+    if child.returncode != 0:
+        print(f"FAILED with exit code {child.returncode}")
+        print(child.stderr.strip()[-2000:])
+        return 1
+    
+    report = json.loads(child.stdout.strip().splitlines()[-1])
+    print(f"Peak RSS: {report['peak_rss_kb'] / 1024:.1f} MB, content: {report['content_chars']} chars, "
+          f"time: {report['seconds']} s")
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Plan Streaming Benchmark
+
+Runs multi-step plans twice: first waiting for the whole plan before the first step,
+as create_action_plan() does, then executing each step as soon as the streamed plan
+contains it. Reports the total task time of both and how much execution overlapped
+with plan generation.
+
+Usage:
+    python benchmarks/plan_streaming.py [--steps 2 4 8] [--tokens-per-second 60] [--step-seconds 0.5]
+
+The model is simulated by a provider that emits the plan a few characters at a time
+at the given token rate, and each step sleeps for --step-seconds, so the result
+depends only on the plan length and the two rates.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.ai.base_provider import BaseAIProvider
+from src.ai.plan_stream import PlanStream
+
+# Characters per simulated token
+TOKEN_CHARS = 4
+
+
+def build_plan(steps):
+    """Build a plan that browses to a page and extracts content, repeated as needed."""
+    actions = []
+    for index in range(steps):
+        if index % 2 == 0:
+            actions.append({"type": "browse", "url": f"https://example.com/page/{index}"})
+        else:
+            actions.append({"type": "extract_content", "processing_goal": f"Summarize page {index - 1}"})
+    return json.dumps({"actions": actions}, indent=2)
+
+
+class SimulatedProvider(BaseAIProvider):
+    """Emits a fixed plan at a fixed token rate."""
+    
+    provider_name = "simulated model"
+    
+    def __init__(self, plan_text, tokens_per_second):
+        super().__init__(api_key=None)
+        self.plan_text = plan_text
+        self.token_delay = 1 / tokens_per_second
+    
+    def _stream(self, prompt, system=None, purpose="response"):
+        for start in range(0, len(self.plan_text), TOKEN_CHARS):
+            time.sleep(self.token_delay)
+            yield self.plan_text[start:start + TOKEN_CHARS]
+    
+    def _complete(self, prompt, system=None, purpose="response"):
+        return "".join(self._stream(prompt, system, purpose))
+
+
+def run_serial(provider, step_seconds):
+    """Wait for the whole plan, then run its steps."""
+    started = time.perf_counter()
+    for _ in provider.create_action_plan("benchmark")["actions"]:
+        time.sleep(step_seconds)
+    return time.perf_counter() - started, 0.0
+
+
+def run_streamed(provider, step_seconds):
+    """Run each step as soon as the streamed plan contains it."""
+    started = time.perf_counter()
+    plan_stream = PlanStream(provider, "benchmark")
+    for _ in plan_stream:
+        time.sleep(step_seconds)
+    return time.perf_counter() - started, plan_stream.timing()["overlap_seconds"]
+
+
+def main():
+    """Compare serial and streamed plan execution for several plan lengths."""
+    parser = argparse.ArgumentParser(description="Benchmark executing plans while they are generated")
+    parser.add_argument("--steps", type=int, nargs="+", default=[2, 4, 8], help="plan lengths to test")
+    parser.add_argument("--tokens-per-second", type=float, default=60, help="simulated generation rate")
+    parser.add_argument("--step-seconds", type=float, default=0.5, help="simulated duration of each step")
+    args = parser.parse_args()
+    
+    print(f"{'steps':>5} {'plan s':>8} {'serial s':>9} {'streamed s':>11} {'overlap s':>10} {'saved':>7}")
+    for steps in args.steps:
+        plan_text = build_plan(steps)
+        provider = SimulatedProvider(plan_text, args.tokens_per_second)
+        plan_seconds = len(plan_text) / TOKEN_CHARS / args.tokens_per_second
+        
+        serial, _ = run_serial(provider, args.step_seconds)
+        streamed, overlap = run_streamed(provider, args.step_seconds)
+        print(f"{steps:>5} {plan_seconds:>8.2f} {serial:>9.2f} {streamed:>11.2f} {overlap:>10.2f} "
+              f"{(serial - streamed) / serial:>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Browser Shard Scaling Benchmark
+
+Runs the same batch of concurrent browsing tasks against browser pools with different
+shard counts and reports the task throughput of each.
+
+Usage:
+    python benchmarks/shard_scaling.py [--shards 1 2 4 8] [--tasks 64] [--concurrency 16]
+
+Each task navigates to a locally served page, waits for a short script to finish
+and extracts the page text, so the work is dominated by the browser, not the network.
+"""
+
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.browser.engine import PlaywrightBrowser
+from src.browser.shards import ShardPool
+
+# Builds a sizeable DOM with a script, to give each renderer some work
+TEST_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Shard benchmark</title></head>
+<body><main id="items"></main>
+<script>
+const main = document.getElementById('items');
+for (let i = 0; i < 3000; i++) {
+  const item = document.createElement('article');
+  item.textContent = 'Item ' + i + ' ' + Math.sqrt(i).toFixed(4);
+  main.appendChild(item);
+}
+</script></body></html>"""
+
+
+class TestPageHandler(SimpleHTTPRequestHandler):
+    """Serves the same page for every request."""
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(TEST_PAGE)))
+        self.end_headers()
+        self.wfile.write(TEST_PAGE)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def run_task(pool, url):
+    """Run one task on the least loaded shard."""
+    shard = pool.acquire()
+    try:
+        shard.browser.navigate(url)
+        return len(shard.browser.get_content() or "")
+    finally:
+        pool.release(shard)
+
+
+def run_batch(shard_count, url, tasks, concurrency):
+    """Launch a pool, run the batch on it and return the tasks per second."""
+    pool = ShardPool(lambda: PlaywrightBrowser(headless=True), shard_count)
+    pool.start()
+    try:
+        # Warm up every shard so launch time is not part of the measurement
+        for shard in pool.shards:
+            shard.worker.wait_until_ready()
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda _: run_task(pool, url), range(tasks)))
+        return tasks / (time.perf_counter() - started)
+    finally:
+        pool.stop()
+
+
+def main():
+    """Run the benchmark for every shard count."""
+    parser = argparse.ArgumentParser(description="Benchmark task throughput against browser shard count")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4], help="shard counts to compare")
+    parser.add_argument("--tasks", type=int, default=64, help="tasks per batch")
+    parser.add_argument("--concurrency", type=int, default=16, help="tasks running at the same time")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TestPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    
+    print(f"{'shards':>6} {'tasks/s':>9} {'speedup':>8}")
+    baseline = None
+    try:
+        for shard_count in args.shards:
+            throughput = run_batch(shard_count, url, args.tasks, args.concurrency)
+            baseline = baseline or throughput
+            print(f"{shard_count:>6} {throughput:>9.2f} {throughput / baseline:>7.2f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -53,7 +53,8 @@ def load_config(config_path: Path, logger: logging.Logger) -> Dict[str, Any]:
                 }
             },
             "browserAgent": {"headless": True, "defaultTimeout": 30000},
-            "termux": {"enabled": False, "webView": True, "chromeHeadless": True}
+            "termux": {"enabled": False, "webView": True, "chromeHeadless": True, "lowResource": True},
+            "lowResource": {"enabled": False}
         }
 
 def check_api_keys(config: Dict[str, Any], logger: logging.Logger) -> bool:
@@ -93,6 +94,11 @@ def adjust_for_termux(config: Dict[str, Any], logger: logging.Logger) -> Dict[st
     # Ensure browser is set to headless mode
     if config.get('termux', {}).get('chromeHeadless', True):
         config['browserAgent']['headless'] = True
+    
+    # Phones rarely have the memory for full Chromium sessions
+    if config.get('termux', {}).get('lowResource', True):
+        config.setdefault('lowResource', {})['enabled'] = True
+        logger.info("Low-resource mode enabled for Termux")
         
     return config
 
@@ -0,0 +1,71 @@
+"""
+Async Call Runner
+
+This module runs provider coroutines on one shared event loop in a background thread.
+Sync code such as the Flask request handlers and the browser workers can submit async
+provider calls to it, so many LLM calls are in flight at once without holding a thread
+each. The async httpx client of the shared HTTP transport belongs to this loop.
+"""
+
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import Future
+
+_loop = None
+_loop_thread = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """Return the shared event loop, starting its thread on first use."""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="ai-async-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def submit(coro):
+    """
+    Schedule a coroutine on the shared loop and return a concurrent.futures.Future for it.
+    
+    The coroutine runs in a copy of the caller's context, so that what it logs and records,
+    such as the task log and the providers that served its calls, reaches the caller's task.
+    """
+    loop = get_loop()
+    future = Future()
+    
+    def copy_outcome(task):
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+    
+    def start():
+        # Tasks take the context that is current when they are created, here the copied one
+        loop.create_task(coro).add_done_callback(copy_outcome)
+    
+    loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+    return future
+
+
+def run_sync(coro, timeout=None):
+    """
+    Run a coroutine on the shared loop and wait for its result.
+    
+    Args:
+        coro: The coroutine, e.g. provider.agenerate_response(prompt)
+        timeout: Seconds to wait before giving up (None waits indefinitely)
+    
+    Returns:
+        The coroutine's result
+    """
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the shared event loop; await the coroutine instead")
+    return submit(coro).result(timeout)
@@ -2,24 +2,336 @@
 Base AI Provider Interface
 
 This module defines the base interface that all AI providers must implement.
+Providers implement _complete(), a single model call, and usually _acomplete() with
+their SDK's async client and _stream() with its stream mode; the planning, answering
+and content processing methods and their async and streaming counterparts are built
+on top of them here.
 """
 
+import re
+import json
+import asyncio
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from src.utils.logger import log_ai, log_error
+from src.ai.plan_stream import IncrementalPlanParser
+
+# Content beyond this many characters is cut before it is sent to a model
+MAX_CONTENT_LENGTH = 15000
+
+# System message used with chat models for action plans
+PLANNER_SYSTEM_PROMPT = "You are a browser automation assistant. Respond only with valid JSON."
+
+# Added to the plan prompt in fused mode, so that direct questions are answered in the planning call
+INLINE_ANSWER_INSTRUCTIONS = """
+If the request can be answered without browsing, return a single "answer_directly" action and write your
+complete answer for the user in its "answer" field, so that no further call is needed:
+{"actions": [{"type": "answer_directly", "question": "What is the capital of France?", "answer": "The capital of France is Paris."}]}
+Escape quotes and line breaks in the answer as JSON requires. Plans that browse have no "answer" field.
+"""
+
+
+# Dict of call type to the provider that served it, for the task running in the current context
+_task_routes = ContextVar("task_routes", default=None)
+
+
+@contextmanager
+def record_routes(routes):
+    """Record in routes which provider served each call type inside the block, e.g. during one task."""
+    token = _task_routes.set(routes)
+    try:
+        yield routes
+    finally:
+        _task_routes.reset(token)
+
+
+def note_route(purpose, provider_name):
+    """Record that a provider served a call, for wrappers that choose between providers."""
+    routes = _task_routes.get()
+    if routes is not None:
+        routes[purpose] = provider_name
+
+
 class BaseAIProvider:
     """Base class for all AI providers."""
     
+    # Name used in log messages
+    provider_name = "AI provider"
+    
     def __init__(self, api_key, **kwargs):
         """Initialize the AI provider with API key and additional configuration."""
         self.api_key = api_key
         self.config = kwargs
     
-    def create_action_plan(self, user_input):
-        """Create an action plan based on the user's input."""
-        raise NotImplementedError("Subclasses must implement create_action_plan()")
+    def build_action_plan_prompt(self, user_input, inline_answers=False):
+        """Build the prompt that asks the model for a JSON action plan, optionally with inline answers."""
+        prompt = f"""
+You are an AI browser agent that helps users perform tasks on the web.
+Your task is to analyze the user's request and break it down into a series of browsing actions.
+
+User Request: "{user_input}"
+
+Create a JSON action plan that contains a list of steps to accomplish this task. Return ONLY the JSON object.
+Each action must be one of these types:
+
+1. "answer_directly": For questions that can be answered without browsing. 
+   Example: {{"type": "answer_directly", "question": "What is the capital of France?"}}
+
+2. "browse": For navigating to a URL. 
+   Example: {{"type": "browse", "url": "https://example.com"}}
+
+3. "extract_content": For extracting content from the current page. 
+   Example: {{"type": "extract_content", "processing_goal": "Summarize the article"}}
+   Add "source": "network" to use the JSON data the page loaded from its APIs instead of the rendered text,
+   which is usually faster and more accurate for listings, prices and search results.
+
+4. "click": For clicking on an element on the page. 
+   Example: {{"type": "click", "target": {{"role": "button", "name": "Sign in"}}}}
+   Prefer a "target" over a CSS "selector". A target is one of {{"text": "visible text"}},
+   {{"role": "ARIA role", "name": "accessible name"}} or {{"label": "form field label"}}.
+   A "selector" such as "button.submit" can be added as a fallback.
+
+5. "type": For typing text into an input field. 
+   Example: {{"type": "type", "target": {{"label": "Search"}}, "text": "browser automation"}}
+   Use a "selector" such as "input#search" only when the field has no label, placeholder or name.
+
+6. "clarify": For when the request needs clarification.
+   Example: {{"type": "clarify", "message": "Could you specify which website you want me to search on?"}}
+
+7. "scroll_collect": For feeds, search results and other pages that load more items as you scroll.
+   Scrolls the current page, collects the newly loaded text and processes it like "extract_content".
+   Example: {{"type": "scroll_collect", "processing_goal": "List every product name and price", "max_items": 100}}
+
+Return the plan as a JSON object with an "actions" array containing the sequence of actions:
+{{
+  "actions": [
+    // Array of action objects
+  ]
+}}
+
+For complex requests, break them down into multiple steps. For example, "search for browser automation on Google" might become:
+1. Browse to Google
+2. Type search query
+3. Extract content from search results
+
+Only generate a JSON response with properly formatted field names. JSON properties must be enclosed in double quotes.
+"""
+        return prompt + INLINE_ANSWER_INSTRUCTIONS if inline_answers else prompt
+    
+    def build_content_prompt(self, content, user_input, processing_goal):
+        """Build the prompt that asks the model to process page content for a goal."""
+        truncated_content = content[:MAX_CONTENT_LENGTH]
+        
+        if len(content) > MAX_CONTENT_LENGTH:
+            log_ai(f"Content truncated from {len(content)} to {MAX_CONTENT_LENGTH} characters")
+        
+        return f"""
+User Request: "{user_input}"
+Processing Goal: "{processing_goal}"
+
+Content from the website:
+--- CONTENT START ---
+{truncated_content}
+--- CONTENT END ---
+
+Based on the user's request and the processing goal, analyze the content and provide a relevant response.
+If the content is too large or complex, focus on the most relevant parts to address the processing goal.
+"""
+    
+    def parse_action_plan(self, response_text):
+        """
+        Parse the JSON action plan out of a model response.
+        
+        Raises:
+            json.JSONDecodeError: If the response holds no valid JSON plan
+        """
+        # Extract JSON from the response (in case it's wrapped in markdown or other text)
+        json_match = re.search(r'```(?:json)?\s*({.*?})\s*```', response_text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(1)
+        else:
+            json_str = response_text
+            
+        # Remove any comments, but not the // of URLs inside strings
+        json_str = re.sub(r'("(?:\\.|[^"\\])*")|//[^\n]*', lambda match: match.group(1) or '', json_str)
+        
+        action_plan = json.loads(json_str.strip())
+        log_ai(f"Action plan created with {len(action_plan.get('actions', []))} steps")
+        return action_plan
+    
+    def is_valid_reply(self, text, purpose):
+        """Check that a reply is usable: non-empty, and a parsable plan for plan calls."""
+        if not text or not text.strip():
+            return False
+        if purpose == "plan":
+            try:
+                self.parse_action_plan(text)
+            except ValueError:
+                return False
+        return True
+    
+    def fallback_plan(self, user_input):
+        """Plan used when no valid plan could be created: answer the request directly."""
+        # Marked so that the plan cache does not keep it
+        return {"actions": [{"type": "answer_directly", "question": user_input}], "fallback": True}
+    
+    def _complete(self, prompt, system=None, purpose="response"):
+        """
+        Send one prompt to the model and return the reply text.
+        
+        Args:
+            prompt: The user prompt
+            system: Optional system instruction
+            purpose: "plan", "response" or "content", for providers with a separate planner model
+                and for caches and routers that treat the call types differently
+        
+        Returns:
+            The reply text
+        """
+        raise NotImplementedError("Subclasses must implement _complete()")
+    
+    async def _acomplete(self, prompt, system=None, purpose="response"):
+        """Async counterpart of _complete(); runs it in a worker thread unless overridden."""
+        return await asyncio.to_thread(self._complete, prompt, system, purpose)
+    
+    def _stream(self, prompt, system=None, purpose="response"):
+        """Yield the reply text in chunks as the model produces it; one chunk unless overridden."""
+        yield self._complete(prompt, system, purpose)
+    
+    def _plan_failed(self, error, response_text, user_input):
+        """Log why no plan could be created and return the fallback plan."""
+        if isinstance(error, json.JSONDecodeError):
+            log_error(f"Failed to parse action plan JSON: {str(error)}")
+            log_error(f"Response was: {response_text[:500]}...")
+        else:
+            log_error(f"Error creating action plan: {str(error)}")
+            log_error(traceback.format_exc())
+        return self.fallback_plan(user_input)
+    
+    def create_action_plan(self, user_input, inline_answers=False):
+        """
+        Create an action plan based on the user's input.
+        
+        Args:
+            user_input: The user's command
+            inline_answers: Ask the model to put the answer to direct questions in the plan's "answer" field
+        """
+        log_ai(f"Creating action plan using {self.provider_name} for: {user_input[:100]}...")
+        response_text = ""
+        
+        try:
+            response_text = self._complete(self.build_action_plan_prompt(user_input, inline_answers),
+                                           system=PLANNER_SYSTEM_PROMPT, purpose="plan")
+            return self.parse_action_plan(response_text)
+        except Exception as e:
+            return self._plan_failed(e, response_text, user_input)
     
     def generate_response(self, prompt):
         """Generate a direct response to a prompt."""
-        raise NotImplementedError("Subclasses must implement generate_response()")
+        log_ai(f"Generating response using {self.provider_name} for: {prompt[:100]}...")
+        
+        try:
+            return self._complete(prompt)
+        except Exception as e:
+            log_error(f"Error generating response: {str(e)}")
+            return f"I was unable to generate a response due to an error: {str(e)}"
     
     def process_content(self, content, user_input, processing_goal):
         """Process web content based on the user's input and processing goal."""
-        raise NotImplementedError("Subclasses must implement process_content()")
+        log_ai(f"Processing content with {self.provider_name}. Goal: {processing_goal}")
+        
+        try:
+            return self._complete(self.build_content_prompt(content, user_input, processing_goal), purpose="content")
+        except Exception as e:
+            log_error(f"Error processing content: {str(e)}")
+            return f"I was unable to process the content due to an error: {str(e)}"
+    
+    async def acreate_action_plan(self, user_input, inline_answers=False):
+        """Async counterpart of create_action_plan()."""
+        log_ai(f"Creating action plan using {self.provider_name} for: {user_input[:100]}...")
+        response_text = ""
+        
+        try:
+            response_text = await self._acomplete(self.build_action_plan_prompt(user_input, inline_answers),
+                                                  system=PLANNER_SYSTEM_PROMPT, purpose="plan")
+            return self.parse_action_plan(response_text)
+        except Exception as e:
+            return self._plan_failed(e, response_text, user_input)
+    
+    async def agenerate_response(self, prompt):
+        """Async counterpart of generate_response()."""
+        log_ai(f"Generating response using {self.provider_name} for: {prompt[:100]}...")
+        
+        try:
+            return await self._acomplete(prompt)
+        except Exception as e:
+            log_error(f"Error generating response: {str(e)}")
+            return f"I was unable to generate a response due to an error: {str(e)}"
+    
+    async def aprocess_content(self, content, user_input, processing_goal):
+        """Async counterpart of process_content()."""
+        log_ai(f"Processing content with {self.provider_name}. Goal: {processing_goal}")
+        
+        try:
+            return await self._acomplete(self.build_content_prompt(content, user_input, processing_goal),
+                                         purpose="content")
+        except Exception as e:
+            log_error(f"Error processing content: {str(e)}")
+            return f"I was unable to process the content due to an error: {str(e)}"
+    
+    def stream_action_plan(self, user_input, inline_answers=False):
+        """
+        Streaming counterpart of create_action_plan(); yields each action as soon as the model has completed it.
+        
+        Returns:
+            True once the whole plan was read, None if the stream broke off or the fallback plan was used
+        """
+        log_ai(f"Streaming action plan using {self.provider_name} for: {user_input[:100]}...")
+        parser = IncrementalPlanParser()
+        streamed = 0
+        
+        try:
+            for chunk in self._stream(self.build_action_plan_prompt(user_input, inline_answers),
+                                      system=PLANNER_SYSTEM_PROMPT, purpose="plan"):
+                for action in parser.feed(chunk):
+                    streamed += 1
+                    yield action
+        except Exception as e:
+            if streamed:
+                log_error(f"Plan stream broke off after {streamed} steps: {str(e)}")
+                return
+            yield from self._plan_failed(e, parser.text, user_input)["actions"]
+            return
+        
+        if streamed:
+            log_ai(f"Action plan streamed with {streamed} steps")
+            return True
+        
+        # No actions array came through: parse the whole reply the usual way
+        try:
+            yield from self.parse_action_plan(parser.text).get("actions", [])
+            return True
+        except Exception as e:
+            yield from self._plan_failed(e, parser.text, user_input)["actions"]
+    
+    def stream_response(self, prompt):
+        """Streaming counterpart of generate_response(); yields text chunks."""
+        log_ai(f"Streaming response using {self.provider_name} for: {prompt[:100]}...")
+        
+        try:
+            yield from self._stream(prompt)
+        except Exception as e:
+            log_error(f"Error generating response: {str(e)}")
+            yield f"I was unable to generate a response due to an error: {str(e)}"
+    
+    def stream_process_content(self, content, user_input, processing_goal):
+        """Streaming counterpart of process_content(); yields text chunks."""
+        log_ai(f"Streaming content processing with {self.provider_name}. Goal: {processing_goal}")
+        
+        try:
+            yield from self._stream(self.build_content_prompt(content, user_input, processing_goal), purpose="content")
+        except Exception as e:
+            log_error(f"Error processing content: {str(e)}")
+            yield f"I was unable to process the content due to an error: {str(e)}"
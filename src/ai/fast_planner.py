@@ -0,0 +1,179 @@
+"""
+Rule-Based Fast-Path Planner
+
+This module plans common command shapes without a model call: commands that name a
+single URL or domain, search commands and self-contained questions. Commands that also
+ask to click, type or log in, that name several sites, or that need current information
+return None and go to the model planner as before.
+"""
+
+import re
+import threading
+from urllib.parse import quote_plus
+
+# Search URLs by engine name; the query is appended URL-encoded
+SEARCH_ENGINES = {
+    "google": "https://www.google.com/search?q=",
+    "bing": "https://www.bing.com/search?q=",
+    "duckduckgo": "https://duckduckgo.com/html/?q=",
+    "ddg": "https://duckduckgo.com/html/?q=",
+    "youtube": "https://www.youtube.com/results?search_query=",
+    "wikipedia": "https://en.wikipedia.org/w/index.php?search="
+}
+
+# Top-level domains accepted for domains written without a scheme, so that "node.js" or "config.json" are not URLs
+COMMON_TLDS = {
+    "com", "org", "net", "io", "dev", "ai", "app", "edu", "gov", "co", "uk", "us", "de", "fr", "es", "it",
+    "nl", "ca", "au", "in", "jp", "info", "me", "tv", "news", "blog", "site", "xyz"
+}
+
+URL_PATTERN = re.compile(r'(?<![\w@.])((?:https?://)?(?:[a-z0-9-]+\.)+([a-z]{2,})(?::\d+)?(?:/[^\s"\'<>]*)?)', re.I)
+
+NAVIGATION_WORDS = re.compile(
+    r'\b(?:please|open|go to|goto|visit|browse(?: to)?|navigate to|load|take me to|show me|pull up|the|site|'
+    r'website|page|homepage|web ?page|url|and|then|me)\b', re.I)
+
+# Anything that needs a click, typing or other interaction is left to the model planner
+INTERACTIONS = (r'click|press|tap|type|enter|fill|submit|log ?in|sign ?in|sign ?up|register|select|choose|'
+                r'buy|order|add to cart|checkout|book|download|upload|scroll|next page')
+INTERACTIVE_WORDS = re.compile(rf'\b(?:{INTERACTIONS})\b', re.I)
+
+# Search queries are free text, so there only a follow-up step counts, as in "search X and click the first result"
+FOLLOW_UP_INTERACTION = re.compile(rf'\b(?:and|then)\b.*\b(?:{INTERACTIONS}|open|go to|visit|navigate)\b', re.I)
+
+SEARCH_COMMAND = re.compile(
+    r'^(?:please\s+)?(?:search|look up|lookup|google)\s+(?:for\s+|up\s+)?(?P<query>.+?)'
+    r'(?:\s+(?:on|using|with|in|via)\s+(?P<engine>' + "|".join(SEARCH_ENGINES) + r'))?\s*[.!]?$', re.I)
+
+QUESTION_START = re.compile(
+    r'^(?:what|who|whom|whose|when|where|why|how|which|define|explain|describe|tell me about)\b', re.I)
+
+# Yes/no questions and other text ending in "?" also need this many words, as "is this correct?" needs context
+MIN_QUESTION_WORDS = 4
+
+# "Can you ...?" asks the agent to do something rather than to answer
+REQUEST_START = re.compile(r'^(?:please\s+)?(?:can|could|would|will)\s+you\b', re.I)
+
+# Questions about changing facts or the current page need browsing or context: relative times, prices,
+# office-holders and results, and explicit years
+NEEDS_BROWSING = re.compile(
+    r'\b(?:today|tonight|now|current(?:ly)?|latest|recent(?:ly)?|news|price|prices|cost|costs|weather|forecast|'
+    r'rain(?:ing|y)?|snow(?:ing|y)?|temperature|time is it|'
+    r'(?:last|this|next) (?:night|week|weekend|month|year|season)|yesterday|tomorrow|'
+    r'how much|cheap(?:est)?|fare|fares|population|'
+    r'president|prime minister|chancellor|ceo|governor|mayor|king|queen|pope|leader|chairman|'
+    r'who won|winner|winners|champion|champions|standings|election|'
+    r'(?:19|20)\d{2}|'
+    r'score|scores|stock|live|trending|open now|'
+    r'this page|the page|this site|website|web ?site|it say|above|previous)\b', re.I)
+
+fast_planner_stats = {"tasks": 0, "handled": 0, "rules": {"url": 0, "search": 0, "question": 0},
+                      "model_plans": 0, "model_plan_seconds": 0.0}
+_stats_lock = threading.Lock()
+
+
+def find_urls(user_input):
+    """Return the URLs and domains named in a command, with https:// added where the scheme is missing."""
+    urls = []
+    for match in URL_PATTERN.finditer(user_input):
+        url, tld = match.group(1).rstrip(".,;:!?)"), match.group(2).lower()
+        if not url.lower().startswith(("http://", "https://")):
+            if tld not in COMMON_TLDS:
+                continue
+            url = "https://" + url
+        urls.append(url)
+    return urls
+
+
+def plan_url_command(user_input):
+    """Plan "open example.com" and "open example.com and summarize it" style commands."""
+    urls = find_urls(user_input)
+    # Several sites usually mean a comparison, which the model plans better
+    if len(urls) != 1 or INTERACTIVE_WORDS.search(user_input) or SEARCH_COMMAND.match(user_input):
+        return None
+    
+    actions = [{"type": "browse", "url": urls[0]}]
+    # Whatever remains besides the URL and navigation words is what to do with the page
+    remainder = NAVIGATION_WORDS.sub(" ", URL_PATTERN.sub(" ", user_input))
+    if re.search(r'\w', remainder):
+        actions.append({"type": "extract_content", "processing_goal": user_input})
+    return {"actions": actions}
+
+
+def plan_search_command(user_input, search_engine="google"):
+    """Plan "search X on Google" and "look up X" style commands."""
+    match = SEARCH_COMMAND.match(user_input.strip())
+    if match is None or FOLLOW_UP_INTERACTION.search(match.group("query")):
+        return None
+    
+    query = match.group("query").strip().strip('"\'“”')
+    if not query or find_urls(query):
+        return None
+    
+    engine = (match.group("engine") or search_engine).lower()
+    search_url = SEARCH_ENGINES.get(engine, SEARCH_ENGINES["google"]) + quote_plus(query)
+    return {"actions": [
+        {"type": "browse", "url": search_url},
+        {"type": "extract_content", "processing_goal": f"Summarize the search results for: {query}"}
+    ]}
+
+
+def plan_question(user_input):
+    """Plan self-contained questions, which are answered without browsing."""
+    question = user_input.strip()
+    if not QUESTION_START.match(question):
+        if not question.endswith("?") or len(question.split()) < MIN_QUESTION_WORDS:
+            return None
+        if REQUEST_START.match(question):
+            return None
+    if find_urls(question) or NEEDS_BROWSING.search(question):
+        return None
+    return {"actions": [{"type": "answer_directly", "question": question}]}
+
+
+def plan_command(user_input, search_engine="google"):
+    """
+    Plan a command with the rules, without a model call.
+    
+    Args:
+        user_input: The user's command
+        search_engine: Engine used by search commands that do not name one
+    
+    Returns:
+        (rule, plan) for commands one of the rules handles, otherwise None
+    """
+    with _stats_lock:
+        fast_planner_stats["tasks"] += 1
+    
+    for rule, planner in (("url", plan_url_command),
+                          ("search", lambda command: plan_search_command(command, search_engine)),
+                          ("question", plan_question)):
+        plan = planner(user_input)
+        if plan is not None:
+            with _stats_lock:
+                fast_planner_stats["handled"] += 1
+                fast_planner_stats["rules"][rule] += 1
+            return rule, plan
+    return None
+
+
+def record_model_plan(seconds):
+    """Record the duration of a plan made by the model, to estimate the time the rules save."""
+    with _stats_lock:
+        fast_planner_stats["model_plans"] += 1
+        fast_planner_stats["model_plan_seconds"] += seconds
+
+
+def fast_planner_snapshot():
+    """Return the share of tasks planned by the rules and the planner time they saved."""
+    with _stats_lock:
+        stats = {"tasks": fast_planner_stats["tasks"], "handled": fast_planner_stats["handled"],
+                 "rules": dict(fast_planner_stats["rules"])}
+        model_plans = fast_planner_stats["model_plans"]
+        mean_plan_seconds = fast_planner_stats["model_plan_seconds"] / model_plans if model_plans else 0.0
+    
+    stats["handled_share"] = round(stats["handled"] / stats["tasks"], 3) if stats["tasks"] else 0.0
+    stats["mean_model_plan_seconds"] = round(mean_plan_seconds, 3)
+    # Each handled task skipped one planner call of average duration
+    stats["estimated_seconds_saved"] = round(stats["handled"] * mean_plan_seconds, 3)
+    return stats
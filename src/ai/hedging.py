@@ -0,0 +1,228 @@
+"""
+Hedged Provider Requests
+
+This module races two providers for latency-sensitive calls. The request goes to the
+primary provider first; if no valid reply has arrived after a delay taken from a
+percentile of the primary's recent latencies, the same request goes to the secondary
+provider. The first valid reply wins and the other call is cancelled. Statistics per
+provider pair show how often the secondary was needed, how often it won, the extra
+calls this cost, and the tail latency with and without hedging.
+
+A cancelled primary call leaves its latency unknown, which would hide exactly the slow
+calls hedging removes. A small fraction of the primary calls that lose is therefore
+left to finish, and each of those stands in for the cancelled ones when the primary's
+latency percentiles are computed.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+
+from src.utils.logger import log_ai, log_error
+from src.ai.base_provider import BaseAIProvider, note_route
+from src.ai.async_runner import run_sync
+
+# Latency samples kept per provider pair for the hedge delay and the percentiles
+LATENCY_WINDOW = 200
+
+hedging_stats = {}  # "Primary -> Secondary" -> counters and latency samples
+_stats_lock = threading.Lock()
+
+
+def percentile(samples, fraction):
+    """Return the value below which the given fraction of the (value, weight) samples lie."""
+    ordered = sorted(samples)
+    threshold = fraction * sum(weight for _, weight in ordered)
+    running = 0.0
+    for value, weight in ordered:
+        running += weight
+        if running >= threshold:
+            return value
+    return ordered[-1][0]
+
+
+def _pair_stats(pair):
+    """Return the statistics of a provider pair, creating them on first use."""
+    if pair not in hedging_stats:
+        hedging_stats[pair] = {
+            "calls": 0, "hedged": 0, "secondary_wins": 0, "primary_failures": 0, "failures": 0,
+            "extra_prompt_chars": 0, "measured_losers": 0,
+            "primary_seconds": deque(maxlen=LATENCY_WINDOW), "hedged_seconds": deque(maxlen=LATENCY_WINDOW)
+        }
+    return hedging_stats[pair]
+
+
+class HedgedProvider(BaseAIProvider):
+    """Wraps a primary provider and sends slow plan and short answer calls to a secondary provider as well."""
+    
+    def __init__(self, primary, secondary, percentile=0.9, initial_delay_seconds=2.0, min_samples=10,
+                 purposes=("plan", "response"), max_prompt_chars=4000, measure_fraction=0.1):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            primary: The provider that receives every call
+            secondary: The provider that receives calls the primary has not answered in time
+            percentile: Fraction of primary calls expected to finish before the secondary is asked
+            initial_delay_seconds: Hedge delay used until min_samples primary latencies are known
+            min_samples: Primary latencies needed before the percentile is used
+            purposes: Call types that are hedged; other calls only go to the primary
+            max_prompt_chars: Longer prompts are not hedged, as a second call would be expensive
+            measure_fraction: Share of losing primary calls left to finish to measure the primary's tail
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.providers = {primary.provider_name: primary, secondary.provider_name: secondary}
+        self.provider_name = primary.provider_name
+        self.percentile = percentile
+        self.initial_delay_seconds = initial_delay_seconds
+        self.min_samples = min_samples
+        self.purposes = set(purposes)
+        self.max_prompt_chars = max_prompt_chars
+        self.measure_fraction = measure_fraction
+        self.pair = f"{primary.provider_name} -> {secondary.provider_name}"
+        with _stats_lock:
+            _pair_stats(self.pair)
+    
+    def __getattr__(self, name):
+        """Expose the primary provider's settings, such as its model and temperature."""
+        if name.startswith("_") or name in ("primary", "secondary", "providers"):
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+    
+    def hedge_delay(self):
+        """Seconds to wait for the primary before asking the secondary."""
+        with _stats_lock:
+            samples = list(hedging_stats[self.pair]["primary_seconds"])
+        if len(samples) < self.min_samples:
+            return self.initial_delay_seconds
+        return percentile(samples, self.percentile)
+    
+    def _hedges(self, prompt, purpose):
+        """Check whether a call is raced against the secondary."""
+        return purpose in self.purposes and len(prompt) <= self.max_prompt_chars
+    
+    async def _race(self, prompt, system, purpose):
+        """Ask the primary, add the secondary after the hedge delay, and return the first valid reply."""
+        started = time.perf_counter()
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self.primary._acomplete(prompt, system, purpose))
+        calls = {primary: "primary"}
+        pending = {primary}
+        first_error = None
+        
+        try:
+            while pending:
+                # Until the secondary runs, only wait for the primary up to the hedge delay
+                timeout = max(0.0, delay - (time.perf_counter() - started)) if len(calls) == 1 else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                for call in done:
+                    elapsed = time.perf_counter() - started
+                    if call.exception() is not None:
+                        first_error = first_error or call.exception()
+                        if call is primary:
+                            self._count("primary_failures")
+                        log_error(f"Hedged {calls[call]} call failed after {elapsed:.2f} s: {str(call.exception())}")
+                        continue
+                    if call is primary:
+                        self._add_sample("primary_seconds", elapsed)
+                    if self.is_valid_reply(call.result(), purpose):
+                        if call is not primary and primary in pending and random.random() < self.measure_fraction:
+                            # Let this losing primary finish so that its latency is known
+                            pending.discard(primary)
+                            self._measure_loser(primary, started)
+                        self._record(len(calls) > 1, calls[call], elapsed, len(prompt))
+                        # Credit the reply to the provider that wrote it, e.g. for the plan cache
+                        winner = self.primary if call is primary else self.secondary
+                        note_route(purpose, winner.provider_name)
+                        return call.result()
+                
+                if len(calls) == 1:
+                    # The primary is slow or failed: race the secondary against it
+                    log_ai(f"No valid reply from {self.primary.provider_name} after "
+                           f"{time.perf_counter() - started:.2f} s, also asking {self.secondary.provider_name}")
+                    secondary = asyncio.ensure_future(self.secondary._acomplete(prompt, system, purpose))
+                    calls[secondary] = "secondary"
+                    pending.add(secondary)
+        finally:
+            for call in pending:
+                call.cancel()
+        
+        self._record(len(calls) > 1, None, time.perf_counter() - started, len(prompt))
+        if first_error is not None:
+            raise first_error
+        raise ValueError(f"Neither {self.primary.provider_name} nor {self.secondary.provider_name} returned a valid reply")
+    
+    def _measure_loser(self, primary, started):
+        """Record the latency of a losing primary call once it finishes."""
+        weight = 1 / self.measure_fraction
+        
+        def finished(call):
+            if not call.cancelled() and call.exception() is None:
+                self._add_sample("primary_seconds", time.perf_counter() - started, weight)
+                self._count("measured_losers")
+        
+        primary.add_done_callback(finished)
+    
+    def _count(self, counter):
+        """Increment one of the provider pair's counters."""
+        with _stats_lock:
+            hedging_stats[self.pair][counter] += 1
+    
+    def _add_sample(self, name, seconds, weight=1.0):
+        """Add a weighted latency sample to the provider pair's statistics."""
+        with _stats_lock:
+            hedging_stats[self.pair][name].append((seconds, weight))
+    
+    def _record(self, hedged, winner, seconds, prompt_chars):
+        """Record the outcome of a call in the provider pair's statistics."""
+        with _stats_lock:
+            stats = hedging_stats[self.pair]
+            stats["calls"] += 1
+            stats["hedged"] += hedged
+            stats["secondary_wins"] += winner == "secondary"
+            stats["failures"] += winner is None
+            # The secondary call repeats the whole prompt, which is most of the cost of a call
+            stats["extra_prompt_chars"] += prompt_chars if hedged else 0
+            stats["hedged_seconds"].append((seconds, 1.0))
+        if winner == "secondary":
+            log_ai(f"{self.secondary.provider_name} answered first after {seconds:.2f} s")
+    
+    def _complete(self, prompt, system=None, purpose="response"):
+        """Return the first valid reply of the two providers, or the primary's reply for calls that are not hedged."""
+        if not self._hedges(prompt, purpose):
+            note_route(purpose, self.primary.provider_name)
+            return self.primary._complete(prompt, system, purpose)
+        return run_sync(self._race(prompt, system, purpose))
+    
+    async def _acomplete(self, prompt, system=None, purpose="response"):
+        """Async counterpart of _complete()."""
+        if not self._hedges(prompt, purpose):
+            note_route(purpose, self.primary.provider_name)
+            return await self.primary._acomplete(prompt, system, purpose)
+        return await self._race(prompt, system, purpose)
+    
+    def _stream(self, prompt, system=None, purpose="response"):
+        """Stream from the primary; streams are not hedged, as their first chunk already arrives early."""
+        note_route(purpose, self.primary.provider_name)
+        yield from self.primary._stream(prompt, system, purpose)
+
+
+def hedging_snapshot():
+    """Return the counters of each provider pair and its tail latencies with and without hedging."""
+    snapshot = {}
+    with _stats_lock:
+        for pair, stats in hedging_stats.items():
+            entry = {key: value for key, value in stats.items() if not isinstance(value, deque)}
+            entry["extra_call_share"] = round(stats["hedged"] / stats["calls"], 3) if stats["calls"] else 0.0
+            for name in ("primary_seconds", "hedged_seconds"):
+                if stats[name]:
+                    entry[name] = {f"p{round(fraction * 100)}": round(percentile(stats[name], fraction), 3)
+                                   for fraction in (0.5, 0.9, 0.99)}
+            if "primary_seconds" in entry and "hedged_seconds" in entry:
+                entry["p99_saved_seconds"] = round(entry["primary_seconds"]["p99"] - entry["hedged_seconds"]["p99"], 3)
+            snapshot[pair] = entry
+    return snapshot
@@ -0,0 +1,256 @@
+"""
+Shared HTTP Transport
+
+This module provides one pooled HTTP transport for the OpenAI-compatible chat
+endpoints (OpenAI, Groq, OpenRouter). Connections are kept alive and reused across
+calls and providers, so an LLM call does not pay a new TCP and TLS handshake, and
+every request gets explicit connect and read timeouts. Both the requests session and
+the httpx clients open at most max_connections_per_host connections to each host. The async client is bound to
+the event loop it is first used on; provider coroutines run on the shared loop of
+src.ai.async_runner.
+"""
+
+import json
+import asyncio
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.logger import logger
+
+
+class HttpTransport:
+    """Keep-alive connection pools with per-host limits and timeouts."""
+    
+    def __init__(self, max_connections_per_host=10, max_connections=100, connect_timeout=5.0,
+                 read_timeout=60.0, keepalive_seconds=30.0):
+        """
+        Initialize the transport. Pools are created on first use.
+        
+        Args:
+            max_connections_per_host: Connections open at once to each host; further calls wait for one
+            max_connections: Upper bound for all connections, and the number of hosts the requests session keeps a pool for
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for response data
+            keepalive_seconds: How long idle httpx connections are kept
+        """
+        self.max_connections_per_host = max_connections_per_host
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keepalive_seconds = keepalive_seconds
+        
+        self._lock = threading.Lock()
+        self._session = None
+        self._httpx_client = None
+        self._httpx_async_client = None
+    
+    @property
+    def session(self):
+        """The shared requests session, with a pool per host."""
+        with self._lock:
+            if self._session is None:
+                # pool_block makes calls beyond the per-host limit wait for a free connection, instead of
+                # opening extra connections that are thrown away afterwards
+                adapter = HTTPAdapter(pool_connections=self.max_connections,
+                                      pool_maxsize=self.max_connections_per_host, pool_block=True)
+                self._session = requests.Session()
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+            return self._session
+    
+    def post_json(self, url, headers, payload, stream=False):
+        """POST a JSON payload on a pooled connection and return the response."""
+        response = self.session.post(url, headers=headers, json=payload, stream=stream,
+                                     timeout=(self.connect_timeout, self.read_timeout))
+        response.raise_for_status()
+        return response
+    
+    def chat_completion(self, url, headers, payload):
+        """Call an OpenAI-compatible chat completions endpoint and return the message text."""
+        response_data = self.post_json(url, headers, payload).json()
+        return response_data["choices"][0]["message"]["content"]
+    
+    def stream_chat_completion(self, url, headers, payload):
+        """Call a chat completions endpoint in stream mode and yield the text deltas."""
+        with self.post_json(url, headers, dict(payload, stream=True), stream=True) as response:
+            # chunk_size=None hands over each chunk as it arrives instead of filling a buffer first
+            for raw_line in response.iter_lines(chunk_size=None):
+                line = raw_line.decode("utf-8")
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                text = choices[0].get("delta", {}).get("content")
+                if text:
+                    yield text
+    
+    async def achat_completion(self, url, headers, payload):
+        """Async counterpart of chat_completion(), on the shared async httpx client."""
+        response = await self.httpx_async_client().post(url, headers=headers, json=payload)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+    
+    def _httpx_limits(self):
+        """Pool limits shared by the sync and async httpx clients; httpx itself only limits the total."""
+        return httpx.Limits(max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                            keepalive_expiry=self.keepalive_seconds)
+    
+    def _httpx_timeout(self):
+        """Timeouts shared by the sync and async httpx clients."""
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+    
+    def httpx_client(self):
+        """Return the shared httpx client, for SDKs that accept an http_client."""
+        with self._lock:
+            if self._httpx_client is None:
+                transport = HostLimitedTransport(httpx.HTTPTransport(limits=self._httpx_limits()),
+                                                 self.max_connections_per_host)
+                self._httpx_client = httpx.Client(transport=transport, timeout=self._httpx_timeout())
+            return self._httpx_client
+    
+    def httpx_async_client(self):
+        """Return the shared async httpx client, for async SDK clients and direct async calls."""
+        with self._lock:
+            if self._httpx_async_client is None:
+                transport = AsyncHostLimitedTransport(httpx.AsyncHTTPTransport(limits=self._httpx_limits()),
+                                                      self.max_connections_per_host)
+                self._httpx_async_client = httpx.AsyncClient(transport=transport, timeout=self._httpx_timeout())
+            return self._httpx_async_client
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that gives back its host slot when it is closed."""
+    
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+    
+    def __iter__(self):
+        yield from self._stream
+    
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    """Async counterpart of _ReleasingStream."""
+    
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+    
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+    
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+def _release_once(slot):
+    """Return a function that releases a semaphore on its first call only."""
+    released = []
+    
+    def release():
+        if not released:
+            released.append(True)
+            slot.release()
+    
+    return release
+
+
+class HostLimitedTransport(httpx.BaseTransport):
+    """httpx transport that lets at most max_per_host requests use each host at once; further ones wait."""
+    
+    def __init__(self, transport, max_per_host):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._slots = {}
+        self._lock = threading.Lock()
+    
+    def _slot(self, url):
+        """The semaphore of a request's host and port."""
+        key = (url.scheme, url.host, url.port)
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self._max_per_host)
+            return self._slots[key]
+    
+    def handle_request(self, request):
+        slot = self._slot(request.url)
+        slot.acquire()
+        release = _release_once(slot)
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            release()
+            raise
+        # The connection stays in use until the body is read or the response is closed
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+    
+    def close(self):
+        self._transport.close()
+
+
+class AsyncHostLimitedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of HostLimitedTransport, for clients used on a single event loop."""
+    
+    def __init__(self, transport, max_per_host):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._slots = {}
+    
+    async def handle_async_request(self, request):
+        key = (request.url.scheme, request.url.host, request.url.port)
+        if key not in self._slots:
+            # Created on first use, so each semaphore belongs to the loop the client runs on
+            self._slots[key] = asyncio.Semaphore(self._max_per_host)
+        slot = self._slots[key]
+        await slot.acquire()
+        release = _release_once(slot)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _AsyncReleasingStream(response.stream, release)
+        return response
+    
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_transport = HttpTransport()
+
+
+def configure_transport(http_config):
+    """Replace the shared transport with one built from the ai.http config section."""
+    global _transport
+    _transport = HttpTransport(
+        max_connections_per_host=http_config.get('maxConnectionsPerHost', 10),
+        max_connections=http_config.get('maxConnections', 100),
+        connect_timeout=http_config.get('connectTimeout', 5.0),
+        read_timeout=http_config.get('readTimeout', 60.0),
+        keepalive_seconds=http_config.get('keepaliveSeconds', 30.0)
+    )
+    logger.info(f"HTTP transport configured: {_transport.max_connections_per_host} connections per host, "
+                f"{_transport.read_timeout}s read timeout")
+    return _transport
+
+
+def get_transport():
+    """Return the shared transport used by all providers."""
+    return _transport
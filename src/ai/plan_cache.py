@@ -0,0 +1,226 @@
+"""
+Action Plan Cache
+
+This module reuses action plans for commands that were planned before, so repeated
+commands skip the planner LLM call. Commands are normalized into a key: case, runs of
+whitespace and trailing punctuation are ignored, and quoted literals become slots.
+When every literal of a command appears in its plan, the plan is stored as a template
+and serves the same command with other literals, e.g. a search for "cats" also plans
+a search for "dogs". Only plans that validate are stored, each with the provider and
+model that produced it and an expiry time.
+"""
+
+import re
+import json
+import time
+import threading
+from pathlib import Path
+from urllib.parse import quote, quote_plus
+
+from cachetools import TLRUCache
+
+from src.utils.logger import logger, log_error
+
+# Action types a cached plan may contain
+VALID_ACTION_TYPES = {"answer_directly", "browse", "extract_content", "click", "type", "clarify", "scroll_collect"}
+
+# Literals in double quotes, typographic quotes, or single quotes that are not apostrophes
+QUOTED_LITERAL = re.compile(r'"([^"]+)"|“([^”]+)”|(?<!\w)\'([^\']+)\'(?!\w)')
+
+# Values that are URLs; the literals filled into them are URL-encoded
+URL_START = re.compile(r'https?://', re.I)
+
+
+def normalize_command(command):
+    """
+    Split a command into its normalized shape and its quoted literals.
+    
+    Returns:
+        (shape, literals), e.g. ('search <1> on google', ['Browser Automation'])
+    """
+    literals = []
+    
+    def to_slot(match):
+        literals.append(next(group for group in match.groups() if group is not None))
+        return f"<{len(literals)}>"
+    
+    shape = QUOTED_LITERAL.sub(to_slot, command)
+    shape = " ".join(shape.lower().split()).rstrip(".!?")
+    return shape, literals
+
+
+def is_valid_plan(plan):
+    """Check that a plan is worth caching: a non-empty list of known actions, not a fallback."""
+    if not isinstance(plan, dict) or plan.get("fallback"):
+        return False
+    actions = plan.get("actions")
+    if not isinstance(actions, list) or not actions:
+        return False
+    return all(isinstance(action, dict) and action.get("type") in VALID_ACTION_TYPES for action in actions)
+
+
+def _map_values(plan, transform):
+    """Apply transform to every string value of a plan except the action types."""
+    if isinstance(plan, dict):
+        return {key: value if key == "type" else _map_values(value, transform) for key, value in plan.items()}
+    if isinstance(plan, list):
+        return [_map_values(value, transform) for value in plan]
+    if isinstance(plan, str):
+        return transform(plan)
+    return plan
+
+
+def _literal_forms(index, literal):
+    """The forms a literal takes in a plan, with their slot markers: verbatim and URL-encoded."""
+    forms = [(f"{{{{{index}}}}}", literal)]
+    if quote_plus(literal) != literal:
+        forms.append((f"{{{{{index}+}}}}", quote_plus(literal)))
+    return forms
+
+
+def make_template(plan, literals):
+    """Replace the literals in a plan with slot markers, or return None if one of them does not appear."""
+    found = set()
+    
+    def to_markers(text):
+        for index, literal in enumerate(literals, 1):
+            for marker, form in _literal_forms(index, literal):
+                # Whole words only, so that a short literal does not match inside other words
+                text, count = re.subn(rf"(?<!\w){re.escape(form)}(?!\w)", lambda match: marker, text)
+                if count:
+                    found.add(index)
+        return text
+    
+    template = _map_values(plan, to_markers)
+    return template if len(found) == len(literals) else None
+
+
+def _fill_markers(text, literals, encode):
+    """Replace the slot markers in text, putting verbatim markers through encode."""
+    for index, literal in enumerate(literals, 1):
+        text = text.replace(f"{{{{{index}}}}}", encode(literal)).replace(f"{{{{{index}+}}}}", quote_plus(literal))
+    return text
+
+
+def fill_template(template, literals):
+    """
+    Put a command's literals into the slot markers of a plan template.
+    
+    Literals inside a URL are always URL-encoded: a template learned from a literal that
+    needed no encoding, such as "cats", has verbatim markers in its URLs as well.
+    """
+    def from_markers(text):
+        if not URL_START.match(text):
+            return _fill_markers(text, literals, lambda literal: literal)
+        path, separator, query = text.partition("?")
+        return (_fill_markers(path, literals, lambda literal: quote(literal, safe="/:@")) + separator +
+                _fill_markers(query, literals, quote_plus))
+    
+    return _map_values(template, from_markers)
+
+
+class PlanCache:
+    """LRU cache of validated action plans with expiry, persisted to a JSON file."""
+    
+    def __init__(self, file_path=None, max_entries=1000, ttl_seconds=24 * 60 * 60):
+        """
+        Initialize the cache and load the plans saved by earlier runs.
+        
+        Args:
+            file_path: JSON file the plans are saved to (None keeps them in memory only)
+            max_entries: Number of plans kept
+            ttl_seconds: How long a plan is reused
+        """
+        self.file_path = Path(file_path) if file_path else None
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = TLRUCache(maxsize=max_entries, ttu=lambda key, entry, now: entry["expires_at"],
+                                  timer=time.time)
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "rejected": 0}
+        
+        if self.file_path and self.file_path.exists():
+            try:
+                for key, entry in json.loads(self.file_path.read_text()):
+                    if entry["expires_at"] > time.time():
+                        self._entries[key] = entry
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                log_error(f"Could not load the plan cache: {str(e)}")
+            logger.info(f"Plan cache loaded {len(self._entries)} plans from {self.file_path}")
+    
+    def lookup(self, command):
+        """
+        Return the cached plan for a command, or None.
+        
+        Returns:
+            (plan, entry) where entry holds the provider, model, age and hit count of the plan
+        """
+        shape, literals = normalize_command(command)
+        with self._lock:
+            for key in (shape, self._exact_key(shape, literals)):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["hits"] += 1
+                    self.stats["hits"] += 1
+                    break
+            else:
+                self.stats["misses"] += 1
+                return None
+        
+        plan = fill_template(entry["plan"], literals) if key == shape else json.loads(json.dumps(entry["plan"]))
+        return plan, dict(entry, age_seconds=round(time.time() - entry["stored_at"]))
+    
+    def store(self, command, plan, provider=None, model=None):
+        """Cache a plan for a command if it validates. Returns True if it was stored."""
+        if not is_valid_plan(plan):
+            with self._lock:
+                self.stats["rejected"] += 1
+            return False
+        
+        # Inline answers are not kept; answers are cached by the response cache with their own lifetime
+        plan = {"actions": [{key: value for key, value in action.items() if key != "answer"}
+                            for action in plan["actions"]]}
+        shape, literals = normalize_command(command)
+        template = make_template(plan, literals) if literals else plan
+        # A plan that does not contain the literals only serves the exact same command
+        key = shape if template is not None else self._exact_key(shape, literals)
+        now = time.time()
+        entry = {
+            "plan": template if template is not None else plan,
+            "provider": provider,
+            "model": model,
+            "stored_at": now,
+            "expires_at": now + self.ttl_seconds,
+            "hits": 0
+        }
+        
+        with self._lock:
+            self._entries[key] = entry
+            self.stats["stored"] += 1
+        self._save()
+        return True
+    
+    def _exact_key(self, shape, literals):
+        """Key of a plan that is only reused for the same literals."""
+        return f"{shape}\n{json.dumps(literals)}"
+    
+    def _save(self):
+        """Write the cached plans to the cache file."""
+        if not self.file_path:
+            return
+        with self._lock:
+            entries = [[key, self._entries[key]] for key in list(self._entries.keys())]
+        try:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.file_path.with_suffix(".tmp")
+            temporary_path.write_text(json.dumps(entries))
+            temporary_path.replace(self.file_path)
+        except OSError as e:
+            log_error(f"Could not save the plan cache: {str(e)}")
+    
+    def snapshot(self):
+        """Return the counters, the hit rate and the number of cached plans."""
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,179 @@
+"""
+Streaming Action Plans
+
+This module parses an action plan while the model is still generating it. The
+incremental parser hands over each action object as soon as its closing brace
+arrives, and PlanStream reads the plan on a background thread so the first steps
+can run while the rest of the plan is generated.
+"""
+
+import re
+import json
+import time
+import queue
+import threading
+import contextvars
+
+from src.utils.logger import log_error
+
+# Opening of the actions array, e.g. '"actions": ['
+ACTIONS_START = re.compile(r'"actions"\s*:\s*\[')
+
+
+class IncrementalPlanParser:
+    """Extracts complete action objects from a plan that arrives in chunks."""
+    
+    def __init__(self):
+        """Initialize an empty parser."""
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._in_actions = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._current = []
+    
+    def feed(self, chunk):
+        """
+        Add the next chunk of model output.
+        
+        Returns:
+            The action objects completed by this chunk
+        """
+        self.text += chunk
+        actions = []
+        
+        while self._pos < len(self.text) and not self.done:
+            if not self._in_actions:
+                match = ACTIONS_START.search(self.text, self._pos)
+                if not match:
+                    break
+                self._pos = match.end()
+                self._in_actions = True
+                continue
+            
+            char = self.text[self._pos]
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == "/" and self._pos == len(self.text) - 1:
+                # Could be the start of a comment; wait for the next chunk
+                break
+            elif char == "/" and self.text.startswith("//", self._pos):
+                # Models sometimes copy the comments of the prompt's example; skip to the end of the line
+                line_end = self.text.find("\n", self._pos)
+                if line_end == -1:
+                    break
+                self._pos = line_end
+                continue
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._current.append(char)
+                    action = self._parse_action("".join(self._current))
+                    if action is not None:
+                        actions.append(action)
+                    self._current = []
+                    self._pos += 1
+                    continue
+            elif char == "]" and self._depth == 0:
+                self.done = True
+            
+            if self._depth > 0:
+                self._current.append(char)
+            self._pos += 1
+        
+        return actions
+    
+    def _parse_action(self, object_text):
+        """Parse one action object, or return None if it is not valid JSON."""
+        try:
+            action = json.loads(object_text)
+        except json.JSONDecodeError as e:
+            log_error(f"Skipping unparsable action in streamed plan: {str(e)}")
+            return None
+        return action if isinstance(action, dict) else None
+
+
+_END = object()
+
+
+class PlanStream:
+    """Reads a streamed action plan on a background thread and yields its actions in order."""
+    
+    def __init__(self, provider, user_input, inline_answers=False):
+        """
+        Start reading the plan.
+        
+        Args:
+            provider: The AI provider, which must have stream_action_plan()
+            user_input: The user's command
+            inline_answers: Ask for the answer to direct questions inside the plan
+        """
+        self.started = time.perf_counter()
+        self.first_action_at = None
+        self.first_taken_at = None
+        self.finished_at = None
+        self.actions = []
+        self.complete = False
+        self._queue = queue.Queue()
+        # The reader runs in a copy of the caller's context, so that its log entries reach the caller's task log
+        self._thread = threading.Thread(target=contextvars.copy_context().run,
+                                        args=(self._read, provider, user_input, inline_answers),
+                                        name="plan-stream", daemon=True)
+        self._thread.start()
+    
+    def _read(self, provider, user_input, inline_answers):
+        """Move the streamed actions into the queue as they are completed."""
+        try:
+            plan = provider.stream_action_plan(user_input, inline_answers)
+            while True:
+                try:
+                    action = next(plan)
+                except StopIteration as end:
+                    self.complete = bool(end.value)
+                    break
+                if self.first_action_at is None:
+                    self.first_action_at = time.perf_counter()
+                self.actions.append(dict(action))
+                self._queue.put(action)
+        except Exception as e:
+            log_error(f"Error reading streamed plan: {str(e)}")
+        finally:
+            self.finished_at = time.perf_counter()
+            self._queue.put(_END)
+    
+    def __iter__(self):
+        """Yield the actions, waiting for each one to be generated."""
+        while True:
+            action = self._queue.get()
+            if action is _END:
+                return
+            if self.first_taken_at is None:
+                self.first_taken_at = time.perf_counter()
+            yield action
+    
+    def timing(self):
+        """
+        Summarize the plan stream once it has finished.
+        
+        Returns:
+            The planning time, the time to the first action and how long steps ran while the plan was still being generated
+        """
+        finished_at = self.finished_at or time.perf_counter()
+        overlap = finished_at - self.first_taken_at if self.first_taken_at is not None else 0
+        return {
+            "seconds": round(finished_at - self.started, 3),
+            "first_action_seconds": round((self.first_action_at or finished_at) - self.started, 3),
+            "overlap_seconds": round(max(0.0, overlap), 3)
+        }
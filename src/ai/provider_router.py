@@ -0,0 +1,272 @@
+"""
+Latency-Aware Provider Router
+
+This module spreads model calls over all available providers. For each provider it
+keeps an exponentially weighted moving average (EWMA) of the latency and of the error
+rate, and a circuit breaker that takes a failing provider out of rotation for a cool-down
+period and then lets one probe call through. Each call type (plan, response, content)
+goes to the first healthy provider in its configured preferences, otherwise to the
+healthy provider with the lowest expected latency, and a call that fails or returns an
+unusable reply is retried on the next provider, so callers never see a single
+provider's outage.
+"""
+
+import time
+import threading
+
+from src.utils.logger import log_ai, log_error
+from src.ai.base_provider import BaseAIProvider, note_route
+
+CALL_TYPES = ("plan", "response", "content")
+
+# How strongly the error rate inflates a provider's expected latency; a failed call costs a retry elsewhere
+ERROR_PENALTY = 4
+
+
+class ProviderHealth:
+    """Latency and error EWMAs and the circuit breaker of one provider."""
+    
+    def __init__(self, alpha=0.3, failure_threshold=3, error_rate_threshold=0.5, min_calls=5,
+                 cooldown_seconds=30):
+        """
+        Initialize a healthy, unmeasured provider.
+        
+        Args:
+            alpha: Weight of the newest call in the EWMAs
+            failure_threshold: Consecutive failures that open the breaker
+            error_rate_threshold: Error rate EWMA that opens the breaker, after min_calls calls
+            min_calls: Calls needed before the error rate can open the breaker
+            cooldown_seconds: How long an open breaker keeps the provider out of rotation
+        """
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.latency_ewma = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.opened_at = None
+        self.last_call_at = None
+        self.probing = False
+    
+    def available(self, now):
+        """Check whether a call may go to the provider, moving an open breaker to half-open after its cool-down."""
+        if self.state == "open" and now - self.opened_at >= self.cooldown_seconds:
+            self.state = "half_open"
+        # A half-open breaker lets a single probe call through at a time
+        return self.state == "closed" or self.state == "half_open" and not self.probing
+    
+    def decayed_error_rate(self, now):
+        """The error rate EWMA, halved for every cool-down period without calls."""
+        if self.last_call_at is None:
+            return self.error_rate
+        # A provider with errors gets fewer calls, so without decay its error rate would never recover
+        return self.error_rate * 0.5 ** ((now - self.last_call_at) / self.cooldown_seconds)
+    
+    def score(self, now):
+        """Expected cost of a call: the latency EWMA inflated by the error rate; unmeasured providers go first."""
+        if self.state == "half_open" or self.latency_ewma is None:
+            # A probe after the cool-down has to go first, or it would never be sent
+            return 0.0
+        return self.latency_ewma * (1 + ERROR_PENALTY * self.decayed_error_rate(now))
+    
+    def record(self, seconds, success):
+        """Update the EWMAs and the breaker with the outcome of a call."""
+        now = time.monotonic()
+        self.error_rate = self.decayed_error_rate(now)
+        self.last_call_at = now
+        self.calls += 1
+        self.probing = False
+        self.error_rate += self.alpha * ((0.0 if success else 1.0) - self.error_rate)
+        
+        if success:
+            self.latency_ewma = seconds if self.latency_ewma is None else \
+                self.latency_ewma + self.alpha * (seconds - self.latency_ewma)
+            self.consecutive_failures = 0
+            self.state = "closed"
+            return
+        
+        self.failures += 1
+        self.consecutive_failures += 1
+        # A provider that fails before it ever answered has no latency to score; it waits for a probe instead
+        if (self.state == "half_open" or self.latency_ewma is None or
+                self.consecutive_failures >= self.failure_threshold or
+                self.calls >= self.min_calls and self.error_rate >= self.error_rate_threshold):
+            self.state = "open"
+            self.opened_at = now
+    
+    def snapshot(self, now):
+        """Return the health figures for the router state."""
+        snapshot = {
+            "state": self.state,
+            "latency_ewma_seconds": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "error_rate": round(self.decayed_error_rate(now), 3),
+            "calls": self.calls,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures
+        }
+        if self.state == "open":
+            snapshot["retry_in_seconds"] = round(max(0.0, self.cooldown_seconds - (now - self.opened_at)), 1)
+        return snapshot
+
+
+class ProviderRouter(BaseAIProvider):
+    """Routes each call to the best healthy provider and fails over to the next one."""
+    
+    provider_name = "Router"
+    
+    def __init__(self, providers, preferences=None, default=None, alpha=0.3, failure_threshold=3,
+                 error_rate_threshold=0.5, cooldown_seconds=30):
+        """
+        Initialize the router.
+        
+        Args:
+            providers: Dict of provider name to provider instance
+            preferences: Dict of call type ("plan", "response", "content") to provider names tried first, in order
+            default: Provider that wins ties between equally scored providers, such as unmeasured ones
+            alpha: Weight of the newest call in the latency and error EWMAs
+            failure_threshold: Consecutive failures that open a provider's breaker
+            error_rate_threshold: Error rate EWMA that opens a provider's breaker
+            cooldown_seconds: How long an open breaker keeps a provider out of rotation
+        """
+        self.providers = dict(providers)
+        self.preferences = {call_type: [name for name in (preferences or {}).get(call_type, []) if name in providers]
+                            for call_type in CALL_TYPES}
+        self.default = default
+        self.health = {name: ProviderHealth(alpha=alpha, failure_threshold=failure_threshold,
+                                            error_rate_threshold=error_rate_threshold,
+                                            cooldown_seconds=cooldown_seconds)
+                       for name in self.providers}
+        self.last_routes = {}
+        self._lock = threading.Lock()
+    
+    def __getattr__(self, name):
+        """Expose the settings of the provider that answers direct questions, such as its model."""
+        if name.startswith("_") or name in ("providers", "health", "preferences", "default"):
+            raise AttributeError(name)
+        return getattr(self.providers[self.route("response")[0]], name)
+    
+    def prefer(self, name):
+        """Put a provider first for every call type, e.g. after a manual provider switch."""
+        with self._lock:
+            for call_type in CALL_TYPES:
+                self.preferences[call_type] = [name] + [other for other in self.preferences[call_type] if other != name]
+    
+    def route(self, purpose):
+        """
+        Order the providers for a call type.
+        
+        Returns:
+            Provider names: healthy preferred providers in preference order, then the other healthy providers by
+            score, the default provider first among equal scores, then providers with open breakers, soonest to
+            close first, as a last resort
+        """
+        now = time.monotonic()
+        preferred = self.preferences.get(purpose, [])
+        with self._lock:
+            healthy = [name for name in self.providers if self.health[name].available(now)]
+            broken = [name for name in self.providers if name not in healthy]
+            healthy.sort(key=lambda name: (preferred.index(name) if name in preferred else len(preferred),
+                                           self.health[name].score(now), name != self.default))
+            broken.sort(key=lambda name: self.health[name].opened_at or now)
+        return healthy + broken
+    
+    def _start(self, name, purpose):
+        """Mark a call to a provider as started, claiming the probe slot of a half-open breaker."""
+        with self._lock:
+            health = self.health[name]
+            if health.state == "half_open":
+                health.probing = True
+            self.last_routes[purpose] = name
+        note_route(purpose, name)
+        return time.perf_counter()
+    
+    def _finish(self, name, started, success, error=None):
+        """Record the outcome of a call to a provider."""
+        with self._lock:
+            health = self.health[name]
+            was_open = health.state == "open"
+            health.record(time.perf_counter() - started, success)
+            opened = health.state == "open" and not was_open
+        if not success:
+            log_error(f"Provider {name} failed{': ' + str(error) if error else ' with an unusable reply'}, failing over")
+        if opened:
+            log_error(f"Circuit breaker opened for provider {name}")
+    
+    def _complete(self, prompt, system=None, purpose="response"):
+        """Send the call to the best provider, failing over until one returns a usable reply."""
+        last_error = None
+        for name in self.route(purpose):
+            started = self._start(name, purpose)
+            try:
+                text = self.providers[name]._complete(prompt, system, purpose)
+            except Exception as e:
+                self._finish(name, started, False, e)
+                last_error = e
+                continue
+            if self.is_valid_reply(text, purpose):
+                self._finish(name, started, True)
+                return text
+            self._finish(name, started, False)
+        raise last_error or ValueError("No provider returned a usable reply")
+    
+    async def _acomplete(self, prompt, system=None, purpose="response"):
+        """Async counterpart of _complete()."""
+        last_error = None
+        for name in self.route(purpose):
+            started = self._start(name, purpose)
+            try:
+                text = await self.providers[name]._acomplete(prompt, system, purpose)
+            except Exception as e:
+                self._finish(name, started, False, e)
+                last_error = e
+                continue
+            if self.is_valid_reply(text, purpose):
+                self._finish(name, started, True)
+                return text
+            self._finish(name, started, False)
+        raise last_error or ValueError("No provider returned a usable reply")
+    
+    def _stream(self, prompt, system=None, purpose="response"):
+        """Stream from the best provider; before its first chunk, a failing provider is replaced by the next."""
+        last_error = None
+        for name in self.route(purpose):
+            started = self._start(name, purpose)
+            streamed = False
+            try:
+                for chunk in self.providers[name]._stream(prompt, system, purpose):
+                    streamed = True
+                    yield chunk
+            except GeneratorExit:
+                # The caller stopped reading; the provider itself did not fail
+                self._finish(name, started, True)
+                raise
+            except Exception as e:
+                self._finish(name, started, False, e)
+                if streamed:
+                    # Part of the reply has been shown already; a second provider would repeat it
+                    raise
+                last_error = e
+                continue
+            self._finish(name, started, streamed)
+            if streamed:
+                return
+        raise last_error or ValueError("No provider returned a usable reply")
+    
+    def state(self):
+        """Return the health of every provider and the provider each call type goes to next."""
+        now = time.monotonic()
+        with self._lock:
+            providers = {name: health.snapshot(now) for name, health in self.health.items()}
+            last_routes = dict(self.last_routes)
+            preferences = {call_type: list(names) for call_type, names in self.preferences.items()}
+        return {
+            "providers": providers,
+            "preferences": preferences,
+            "routes": {call_type: self.route(call_type)[0] for call_type in CALL_TYPES},
+            "last_used": last_routes
+        }
@@ -0,0 +1,281 @@
+"""
+LLM Response Cache
+
+This module caches model replies for direct answers and content processing, keyed by
+a hash of the provider, model, temperature and whitespace-normalized prompt. Replies
+are kept in a memory tier with a lifetime per call type and in a size-bounded disk tier
+that survives restarts. CachedProvider puts the cache in front of any provider, and a
+single request can skip it with bypass_cache().
+"""
+
+import json
+import time
+import hashlib
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import OrderedDict
+from pathlib import Path
+
+from cachetools import TLRUCache
+
+from src.utils.logger import logger, log_ai, log_error
+from src.ai.base_provider import BaseAIProvider
+
+# Cached call types and how long their replies stay valid, in seconds. Plans are not
+# cached here: they depend on the page state at planning time.
+DEFAULT_TTL_SECONDS = {"response": 24 * 60 * 60, "content": 60 * 60}
+
+_bypass = contextvars.ContextVar("response_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache():
+    """Send the model calls made inside the block to the provider, without reading or filling the cache."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so that prompts differing only in formatting share an entry."""
+    return " ".join(prompt.split())
+
+
+def model_name(provider, purpose):
+    """Return the model a provider uses for a call type."""
+    if getattr(provider, "model", None):
+        return provider.model
+    if purpose == "plan":
+        return getattr(provider, "planner_model", None)
+    return getattr(provider, "processor_model", None)
+
+
+class ResponseCache:
+    """Memory and disk cache of model replies with per-call-type lifetimes."""
+    
+    def __init__(self, directory, memory_entries=512, disk_bytes=64 * 1024 * 1024, ttl_seconds=None):
+        """
+        Initialize the cache and index any entries already stored on disk.
+        
+        Args:
+            directory: Directory for the disk tier
+            memory_entries: Number of replies kept in memory
+            disk_bytes: Upper bound for the size of the disk tier
+            ttl_seconds: Lifetime per call type ("response", "content"); 0 disables caching of that type
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.disk_bytes = disk_bytes
+        self.ttl_seconds = dict(DEFAULT_TTL_SECONDS, **(ttl_seconds or {}))
+        
+        self._lock = threading.Lock()
+        self._memory = TLRUCache(maxsize=memory_entries, ttu=lambda key, entry, now: entry["expires_at"],
+                                 timer=time.time)
+        self._disk = OrderedDict()  # key -> size in bytes
+        self._disk_size = 0
+        
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stored": 0, "bypassed": 0}
+        
+        for entry_path in sorted(self.directory.glob("*.json"), key=lambda path: path.stat().st_mtime):
+            size = entry_path.stat().st_size
+            self._disk[entry_path.stem] = size
+            self._disk_size += size
+        
+        logger.info(f"Response cache ready at {self.directory} ({len(self._disk)} entries on disk)")
+    
+    def caches(self, purpose):
+        """Check whether replies of a call type are cached."""
+        return self.ttl_seconds.get(purpose, 0) > 0
+    
+    def key(self, provider, purpose, prompt, system=None):
+        """Build the cache key of a call from everything that influences the reply."""
+        request = {
+            "provider": provider.provider_name,
+            "model": model_name(provider, purpose),
+            "temperature": getattr(provider, "temperature", None),
+            "purpose": purpose,
+            "system": system,
+            "prompt": normalize_prompt(prompt)
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def count(self, outcome):
+        """Increment one of the counters."""
+        with self._lock:
+            self.stats[outcome] += 1
+    
+    def get(self, key):
+        """Return the cached reply for a key, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self.stats["memory_hits"] += 1
+                return entry["text"]
+            on_disk = key in self._disk
+            if on_disk:
+                self._disk.move_to_end(key)
+        
+        entry = self._read_disk(key) if on_disk else None
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._memory[key] = entry
+            self.stats["disk_hits"] += 1
+        return entry["text"]
+    
+    def put(self, key, purpose, text):
+        """Store a reply in both tiers, evicting the oldest disk entries beyond the size limit."""
+        if not text or not self.caches(purpose):
+            return
+        entry = {"purpose": purpose, "expires_at": time.time() + self.ttl_seconds[purpose], "text": text}
+        with self._lock:
+            self._memory[key] = entry
+            self.stats["stored"] += 1
+        
+        data = json.dumps(entry)
+        if len(data) > self.disk_bytes:
+            return
+        try:
+            (self.directory / f"{key}.json").write_text(data)
+        except OSError as e:
+            log_error(f"Response cache write failed: {str(e)}")
+            return
+        
+        evicted = []
+        with self._lock:
+            self._disk_size += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_size -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._delete_file(old_key)
+    
+    def _read_disk(self, key):
+        """Read an entry from disk, dropping it if it is unreadable or expired."""
+        try:
+            entry = json.loads((self.directory / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            entry = None
+        
+        if entry is None or entry.get("expires_at", 0) <= time.time():
+            with self._lock:
+                self._disk_size -= self._disk.pop(key, 0)
+            self._delete_file(key)
+            return None
+        return entry
+    
+    def _delete_file(self, key):
+        """Delete the file that backs a disk entry."""
+        try:
+            (self.directory / f"{key}.json").unlink()
+        except FileNotFoundError:
+            pass
+    
+    def snapshot(self):
+        """Return the counters, the hit rate and the size of both tiers."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = len(self._disk)
+            stats["disk_bytes"] = self._disk_size
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+class CachedProvider(BaseAIProvider):
+    """Wraps a provider so that repeated answers and content processing are served from the cache."""
+    
+    def __init__(self, provider, cache):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            provider: The provider that answers cache misses
+            cache: The ResponseCache to use
+        """
+        self.provider = provider
+        self.cache = cache
+        self.provider_name = provider.provider_name
+    
+    def __getattr__(self, name):
+        """Expose the wrapped provider's settings, such as its model and temperature."""
+        return getattr(self.provider, name)
+    
+    def _cache_key(self, prompt, system, purpose):
+        """Return the cache key of a call, or None if the call goes straight to the provider."""
+        if not self.cache.caches(purpose):
+            return None
+        if _bypass.get():
+            self.cache.count("bypassed")
+            return None
+        return self.cache.key(self.provider, purpose, prompt, system)
+    
+    def _cached(self, key):
+        """Look up a reply, logging hits."""
+        text = self.cache.get(key)
+        if text is not None:
+            log_ai(f"Response cache hit ({len(text)} characters)")
+        return text
+    
+    def _complete(self, prompt, system=None, purpose="response"):
+        """Return the cached reply, or ask the wrapped provider and cache its reply."""
+        key = self._cache_key(prompt, system, purpose)
+        if key is None:
+            return self.provider._complete(prompt, system, purpose)
+        
+        text = self._cached(key)
+        if text is None:
+            text = self.provider._complete(prompt, system, purpose)
+            self.cache.put(key, purpose, text)
+        return text
+    
+    async def _acomplete(self, prompt, system=None, purpose="response"):
+        """Async counterpart of _complete()."""
+        key = self._cache_key(prompt, system, purpose)
+        if key is None:
+            return await self.provider._acomplete(prompt, system, purpose)
+        
+        text = self._cached(key)
+        if text is None:
+            text = await self.provider._acomplete(prompt, system, purpose)
+            self.cache.put(key, purpose, text)
+        return text
+    
+    def _stream(self, prompt, system=None, purpose="response"):
+        """Yield a cached reply in one chunk, or stream from the wrapped provider and cache the full reply."""
+        key = self._cache_key(prompt, system, purpose)
+        if key is None:
+            yield from self.provider._stream(prompt, system, purpose)
+            return
+        
+        text = self._cached(key)
+        if text is not None:
+            yield text
+            return
+        
+        parts = []
+        for chunk in self.provider._stream(prompt, system, purpose):
+            parts.append(chunk)
+            yield chunk
+        self.cache.put(key, purpose, "".join(parts))
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache(directory, memory_entries=512, disk_bytes=64 * 1024 * 1024, ttl_seconds=None):
+    """Return the process-wide response cache, creating it on first use."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(directory, memory_entries=memory_entries, disk_bytes=disk_bytes,
+                                          ttl_seconds=ttl_seconds)
+        return _shared_cache
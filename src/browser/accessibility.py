@@ -0,0 +1,133 @@
+"""
+Accessibility Tree Formatting
+
+This module turns a Playwright accessibility snapshot into a compact, indented
+role/name outline that can be sent to an AI provider instead of flattened page text.
+"""
+
+# Roles that only group other nodes and carry no meaning of their own
+TRANSPARENT_ROLES = {"generic", "none", "presentation", "group", "Section", "LineBreak", "WebArea", "RootWebArea"}
+
+# Landmarks that usually hold site chrome rather than page content
+CHROME_ROLES = {"navigation", "banner", "contentinfo", "complementary"}
+
+# Roles whose descendant text is folded into a single line
+INLINE_ROLES = {"paragraph", "text", "StaticText", "cell", "columnheader", "rowheader", "caption"}
+
+# Rough characters-per-token ratio used for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in a piece of text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _collect_text(node):
+    """Collect the text of a node and all of its descendants into one string."""
+    parts = []
+    name = (node.get("name") or "").strip()
+    if name:
+        parts.append(name)
+    for child in node.get("children") or []:
+        child_text = _collect_text(child)
+        if child_text and child_text != name:
+            parts.append(child_text)
+    return " ".join(parts)
+
+
+def _describe(node):
+    """Build the outline label for a single node."""
+    role = node.get("role", "")
+    name = (node.get("name") or "").strip()
+    
+    if role in ("text", "StaticText"):
+        return name
+    
+    label = role
+    if role in INLINE_ROLES:
+        text = _collect_text(node)
+        return f"{role}: {text}" if text else None
+    if name:
+        label += f' "{name}"'
+    
+    attributes = []
+    if node.get("level"):
+        attributes.append(f"level={node['level']}")
+    if node.get("checked") is not None:
+        attributes.append(f"checked={str(node['checked']).lower()}")
+    if node.get("value") not in (None, ""):
+        attributes.append(f"value={node['value']}")
+    if attributes:
+        label += f" [{', '.join(attributes)}]"
+    return label
+
+
+def _render(node, depth, lines, collapse_chrome):
+    """Append outline lines for a node and its children."""
+    role = node.get("role", "")
+    name = (node.get("name") or "").strip()
+    children = node.get("children") or []
+    
+    if role in TRANSPARENT_ROLES and not (name and role not in ("WebArea", "RootWebArea")):
+        for child in children:
+            _render(child, depth, lines, collapse_chrome)
+        return
+    
+    label = _describe(node)
+    if not label:
+        return
+    
+    if collapse_chrome and role in CHROME_ROLES:
+        lines.append(f"{'  ' * depth}- {label} ({len(children)} items omitted)")
+        return
+    
+    lines.append(f"{'  ' * depth}- {label}")
+    
+    if role in INLINE_ROLES:
+        return
+    
+    for child in children:
+        # Skip text children that only repeat the parent's accessible name
+        if child.get("role") in ("text", "StaticText") and (child.get("name") or "").strip() == name:
+            continue
+        _render(child, depth + 1, lines, collapse_chrome)
+
+
+def format_accessibility_tree(snapshot, max_tokens=3000):
+    """
+    Format an accessibility snapshot as a pruned, indented outline within a token budget.
+    
+    Args:
+        snapshot: The dict returned by Playwright's accessibility.snapshot()
+        max_tokens: Approximate token budget for the formatted outline
+    
+    Returns:
+        The outline as a string, or an empty string if the snapshot is empty
+    """
+    if not snapshot:
+        return ""
+    
+    lines = []
+    _render(snapshot, 0, lines, collapse_chrome=False)
+    outline = "\n".join(lines)
+    if not max_tokens or estimate_tokens(outline) <= max_tokens:
+        return outline
+    
+    # Over budget: drop navigation and other chrome before cutting page content
+    lines = []
+    _render(snapshot, 0, lines, collapse_chrome=True)
+    outline = "\n".join(lines)
+    if estimate_tokens(outline) <= max_tokens:
+        return outline
+    
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    kept = []
+    used = 0
+    for line in lines:
+        if used + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    kept.append(f"... ({len(lines) - len(kept)} more lines truncated)")
+    return "\n".join(kept)
@@ -0,0 +1,158 @@
+"""
+Overlay and Dialog Dismissal
+
+This module clears the things that block page interaction: JavaScript dialogs are
+answered as soon as they open, and after each navigation a ruleset of known consent
+frameworks and modal overlay patterns is checked in a single in-page script. Every
+rule reports how often it fired, what dismissing cost and an estimate of the time it
+saved, counted as one blocked action timing out.
+"""
+
+import time
+import threading
+
+from src.utils.logger import log_browser, log_error
+
+# Consent frameworks and overlays, with the elements that dismiss them. "frameUrl"
+# rules run inside frames whose URL contains the given text instead of the main frame,
+# and "shadowHost" rules look inside the open shadow root of that element.
+DISMISSAL_RULES = [
+    {"name": "onetrust", "click": ["#onetrust-accept-btn-handler", "#accept-recommended-btn-handler"]},
+    {"name": "cookiebot", "click": ["#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll",
+                                    "#CybotCookiebotDialogBodyButtonAccept"]},
+    {"name": "didomi", "click": ["#didomi-notice-agree-button"]},
+    {"name": "quantcast", "click": [".qc-cmp2-summary-buttons button[mode='primary']"]},
+    {"name": "trustarc", "click": ["#truste-consent-button"]},
+    {"name": "usercentrics", "shadowHost": "#usercentrics-root", "click": ["[data-testid='uc-accept-all-button']"]},
+    {"name": "osano", "click": [".osano-cm-accept-all"]},
+    {"name": "cookieyes", "click": [".cky-btn-accept"]},
+    {"name": "complianz", "click": [".cmplz-btn.cmplz-accept"]},
+    {"name": "google-funding-choices", "click": [".fc-cta-consent"]},
+    {"name": "cookie-notice", "click": ["#cn-accept-cookie"]},
+    {"name": "borlabs", "click": ["#BorlabsCookieBox ._brlbs-btn-accept-all"]},
+    {"name": "sourcepoint", "frameUrl": "sp_message_iframe", "click": ["button.sp_choice_type_11",
+                                                                      "button[title='Accept']"]},
+    {"name": "modal-close", "click": ["[role='dialog'][aria-modal='true'] button[aria-label*='close' i]",
+                                      "[role='dialog'][aria-modal='true'] button[aria-label*='dismiss' i]"]},
+]
+
+# Clicks the first visible match of each rule and returns the names of the rules that fired
+DISMISS_SCRIPT = """
+(rules) => {
+    const visible = (element) => {
+        const rect = element.getBoundingClientRect();
+        const style = getComputedStyle(element);
+        return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    const fired = [];
+    for (const rule of rules) {
+        let root = document;
+        if (rule.shadowHost) {
+            const host = document.querySelector(rule.shadowHost);
+            if (!host || !host.shadowRoot) continue;
+            root = host.shadowRoot;
+        }
+        for (const selector of rule.click) {
+            let element = null;
+            try {
+                element = root.querySelector(selector);
+            } catch (e) {
+                continue;
+            }
+            if (element && visible(element)) {
+                element.click();
+                fired.push(rule.name);
+                break;
+            }
+        }
+    }
+    // Overlays often lock scrolling on the body and leave it locked after closing
+    if (fired.length) {
+        for (const element of [document.documentElement, document.body]) {
+            if (element && getComputedStyle(element).overflow === 'hidden') element.style.overflow = 'auto';
+        }
+    }
+    return fired;
+}
+"""
+
+# Shared by every browser in the process, so /metrics can report them without calling
+# into the browser threads
+dismissal_stats = {"rules": {}, "dialogs": {}}
+_stats_lock = threading.Lock()
+
+
+class DismissalLayer:
+    """Answers dialogs and runs the dismissal rules for a browser."""
+    
+    def __init__(self, dialog_policy="accept", extra_rules=None, blocked_action_seconds=30):
+        """
+        Initialize the layer.
+        
+        Args:
+            dialog_policy: "accept" or "dismiss" for confirm dialogs; alerts are always accepted
+            extra_rules: Additional rules in the format of DISMISSAL_RULES
+            blocked_action_seconds: Time a blocked action would have waited, used for the saved-time estimate
+        """
+        self.dialog_policy = dialog_policy
+        self.rules = DISMISSAL_RULES + list(extra_rules or [])
+        self.blocked_action_seconds = blocked_action_seconds
+        self._page_rules = [rule for rule in self.rules if not rule.get("frameUrl")]
+        self._frame_rules = [rule for rule in self.rules if rule.get("frameUrl")]
+    
+    def attach(self, context):
+        """Answer the dialogs of every page in a browser context."""
+        context.on("dialog", self._on_dialog)
+    
+    def _on_dialog(self, dialog):
+        """Answer a dialog so it cannot block the page."""
+        with _stats_lock:
+            dialog_counts = dismissal_stats["dialogs"]
+            dialog_counts[dialog.type] = dialog_counts.get(dialog.type, 0) + 1
+        log_browser(f"Answering {dialog.type} dialog: {dialog.message[:200]}")
+        try:
+            if dialog.type == "prompt" or (dialog.type == "confirm" and self.dialog_policy == "dismiss"):
+                dialog.dismiss()
+            else:
+                dialog.accept()
+        except Exception as e:
+            log_error(f"Could not answer dialog: {str(e)}")
+    
+    def run(self, page):
+        """
+        Dismiss known consent banners and overlays on a page.
+        
+        Returns:
+            The names of the rules that fired
+        """
+        started = time.perf_counter()
+        fired = []
+        try:
+            fired += page.evaluate(DISMISS_SCRIPT, self._page_rules)
+            for frame in page.frames[1:]:
+                frame_rules = [rule for rule in self._frame_rules if rule["frameUrl"] in frame.url]
+                if frame_rules:
+                    fired += frame.evaluate(DISMISS_SCRIPT, frame_rules)
+        except Exception as e:
+            log_error(f"Error dismissing overlays: {str(e)}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        if fired:
+            log_browser(f"Dismissed overlays: {', '.join(fired)}")
+            with _stats_lock:
+                for name in fired:
+                    stats = dismissal_stats["rules"].setdefault(
+                        name, {"fired": 0, "ms": 0.0, "estimated_saved_seconds": 0})
+                    stats["fired"] += 1
+                    stats["ms"] = round(stats["ms"] + elapsed_ms / len(fired), 1)
+                    stats["estimated_saved_seconds"] += self.blocked_action_seconds
+        return fired
+
+
+def dismissal_snapshot():
+    """Return a copy of the rule and dialog counters."""
+    with _stats_lock:
+        return {
+            "rules": {name: dict(stats) for name, stats in dismissal_stats["rules"].items()},
+            "dialogs": dict(dismissal_stats["dialogs"])
+        }
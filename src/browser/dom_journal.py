@@ -0,0 +1,84 @@
+"""
+DOM Change Journal
+
+This module holds the in-page script that records which regions of a page changed
+since the last content snapshot, so extraction after a click can skip unchanged text.
+"""
+
+# Elements that are treated as a self-contained region of the page
+REGION_SELECTOR = "li, tr, article, section, form, dialog, details, table, ul, ol, aside, nav, main, [role]"
+
+# Installed with add_init_script so every document in the context keeps a journal
+JOURNAL_SCRIPT = """
+(() => {
+    if (window.__browserAgentJournal) return;
+    
+    const REGION_SELECTOR = %s;
+    let changed = new Set();
+    
+    const regionFor = (node) => {
+        const element = node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement;
+        if (!element) return null;
+        return element.closest(REGION_SELECTOR) || element;
+    };
+    
+    const observer = new MutationObserver((records) => {
+        for (const record of records) {
+            const region = regionFor(record.target);
+            if (region) changed.add(region);
+        }
+    });
+    observer.observe(document, {
+        childList: true,
+        subtree: true,
+        characterData: true,
+        attributes: true,
+        attributeFilter: ["hidden", "open", "aria-hidden", "aria-expanded"]
+    });
+    
+    const describe = (element) => {
+        let label = element.tagName.toLowerCase();
+        if (element.id) label += "#" + element.id;
+        const role = element.getAttribute("role");
+        if (role) label += "[role=" + role + "]";
+        return label;
+    };
+    
+    window.__browserAgentJournal = {
+        reset() {
+            changed = new Set();
+        },
+        take() {
+            // Keep only the outermost changed regions that are still attached
+            const roots = [...changed].filter((element) => element.isConnected);
+            const outermost = roots.filter(
+                (element) => !roots.some((other) => other !== element && other.contains(element))
+            );
+            changed = new Set();
+            
+            const regions = [];
+            let changedChars = 0;
+            for (const element of outermost) {
+                const text = (element.innerText || "").trim();
+                if (!text) continue;
+                regions.push({ label: describe(element), text });
+                changedChars += text.length;
+            }
+            return {
+                url: location.href,
+                regions,
+                changedChars,
+                pageChars: document.body ? document.body.innerText.length : 0
+            };
+        }
+    };
+})();
+""" % repr(REGION_SELECTOR)
+
+
+def format_changed_regions(regions):
+    """Format the changed regions reported by the journal as extraction text."""
+    sections = ["Only the parts of the page that changed since the previous extraction are shown."]
+    for region in regions:
+        sections.append(f"[Changed region: {region['label']}]\n{region['text']}")
+    return "\n\n".join(sections)
@@ -0,0 +1,163 @@
+"""
+Playwright Driver Metrics
+
+This module counts the messages exchanged with the Playwright driver and measures their
+round-trip latency, grouped by the high-level operation that caused them.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class DriverMetrics:
+    """Process-wide counters and latency histograms for Playwright driver round trips."""
+    
+    def __init__(self):
+        """Initialize empty metrics."""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = {}  # (connection key, message id) -> (start, operation, open records)
+        self._operations = {}
+    
+    def instrument(self, connection):
+        """Wrap the transport of a Playwright connection to observe every message."""
+        transport = connection._transport
+        if getattr(transport, '_browser_agent_instrumented', False):
+            return
+        transport._browser_agent_instrumented = True
+        
+        connection_key = id(connection)
+        send = transport.send
+        on_message = transport.on_message
+        
+        def send_with_metrics(message):
+            self._on_send(connection_key, message)
+            send(message)
+        
+        def on_message_with_metrics(message):
+            self._on_receive(connection_key, message)
+            on_message(message)
+        
+        transport.send = send_with_metrics
+        transport.on_message = on_message_with_metrics
+        
+        # Requests still in flight when the connection closes never get a reply
+        connection.on("close", lambda *args: self._forget_connection(connection_key))
+    
+    @contextmanager
+    def operation(self, name, record=None):
+        """
+        Attribute driver messages sent inside this block to the named operation.
+        
+        Operations can be nested. Messages count towards every open record, while the
+        per-operation histograms use the innermost operation. If a record dict is given,
+        it receives the wall time, message count and driver time of the block on exit.
+        """
+        record = record if record is not None else {}
+        record.update({"driver_messages": 0, "driver_ms": 0.0})
+        stack = self._stack()
+        stack.append((name, record))
+        with self._lock:
+            self._stats_for(name)["calls"] += 1
+        
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            stack.pop()
+            record["seconds"] = round(time.perf_counter() - started, 3)
+            record["driver_ms"] = round(record["driver_ms"], 1)
+    
+    def snapshot(self):
+        """Return a copy of the per-operation statistics."""
+        with self._lock:
+            result = {}
+            for name, stats in self._operations.items():
+                result[name] = {
+                    "calls": stats["calls"],
+                    "messages": stats["messages"],
+                    "events": stats["events"],
+                    "messages_per_call": round(stats["messages"] / stats["calls"], 1) if stats["calls"] else 0,
+                    "total_ms": round(stats["total_ms"], 1),
+                    "avg_ms": round(stats["total_ms"] / stats["messages"], 2) if stats["messages"] else 0,
+                    "histogram_ms": dict(zip([str(bound) for bound in LATENCY_BUCKETS_MS] + ["+Inf"],
+                                             stats["buckets"]))
+                }
+            return result
+    
+    def _stack(self):
+        """Return the operation stack of the current thread."""
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+    
+    def _stats_for(self, name):
+        """Return the statistics of an operation, creating them if needed. Callers hold the lock."""
+        if name not in self._operations:
+            self._operations[name] = {
+                "calls": 0,
+                "messages": 0,
+                "events": 0,
+                "total_ms": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            }
+        return self._operations[name]
+    
+    def _on_send(self, connection_key, message):
+        """Remember when a request left for the driver and which operation sent it."""
+        stack = self._stack()
+        name = stack[-1][0] if stack else "other"
+        records = [record for _, record in stack]
+        with self._lock:
+            self._pending[(connection_key, message.get("id"))] = (time.perf_counter(), name, records)
+    
+    def _forget_connection(self, connection_key):
+        """Drop the pending requests of a closed connection."""
+        with self._lock:
+            for key in [key for key in self._pending if key[0] == connection_key]:
+                del self._pending[key]
+    
+    def _on_receive(self, connection_key, message):
+        """Record the latency of a reply, or count an event pushed by the driver."""
+        message_id = message.get("id")
+        with self._lock:
+            if not message_id:
+                stack = self._stack()
+                self._stats_for(stack[-1][0] if stack else "other")["events"] += 1
+                return
+            
+            pending = self._pending.pop((connection_key, message_id), None)
+            if not pending:
+                return
+            started, name, records = pending
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            
+            stats = self._stats_for(name)
+            stats["messages"] += 1
+            stats["total_ms"] += elapsed_ms
+            bucket = next((index for index, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                          len(LATENCY_BUCKETS_MS))
+            stats["buckets"][bucket] += 1
+        
+        for record in records:
+            record["driver_messages"] += 1
+            record["driver_ms"] += elapsed_ms
+
+
+@contextmanager
+def timed_operation(record=None):
+    """Measure the wall time of a block for browsers that have no driver to instrument."""
+    record = record if record is not None else {}
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - started, 3)
+
+
+# Shared by every PlaywrightBrowser in the process
+driver_metrics = DriverMetrics()
@@ -3,6 +3,8 @@ import sys
 from pathlib import Path
 import traceback
 import time
+import json
+import hashlib
 from datetime import datetime
 import requests
 from bs4 import BeautifulSoup
@@ -12,6 +14,16 @@ if __name__ == "__main__":
     sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
 from src.utils.logger import logger, log_step, log_error, log_browser
+from src.browser.accessibility import format_accessibility_tree
+from src.browser.dom_journal import JOURNAL_SCRIPT, format_changed_regions
+from src.browser.response_capture import JsonResponseRecorder
+from src.browser.driver_metrics import driver_metrics, timed_operation
+from src.browser.launch_profiles import get_launch_args
+from src.browser.tab_cache import TabCache
+from src.browser.dismissal import DismissalLayer
+from src.browser.locators import TARGET_ATTRIBUTE, TARGET_INDEX_SCRIPT, describe_target, fallback_locator
+from src.browser.scrolling import (DEFAULT_ITEM_SELECTOR, SETTLE_SCRIPT, SCROLL_SCRIPT, COLLECT_SCRIPT,
+                                   MARK_COLLECTED_SCRIPT)
 
 class BaseBrowser:
     """Base class for browser interactions."""
@@ -28,18 +40,58 @@ class BaseBrowser:
         """Get the content of the current page."""
         raise NotImplementedError("Subclasses must implement get_content()")
     
-    def click(self, selector):
-        """Click an element on the page."""
+    def get_content_changes(self, max_changed_ratio=0.5):
+        """Get the content that changed since the last extraction, or the full content."""
+        return {"incremental": False, "content": self.get_content()}
+    
+    def get_accessibility_tree(self, max_tokens=3000):
+        """Get a compact accessibility outline of the current page."""
+        raise NotImplementedError("Subclasses must implement get_accessibility_tree()")
+    
+    def get_json_responses(self):
+        """Get the JSON payloads the current page loaded from its APIs."""
+        raise NotImplementedError("Subclasses must implement get_json_responses()")
+    
+    def click(self, selector=None, target=None):
+        """Click an element found by CSS selector or by a text, role or label target."""
         raise NotImplementedError("Subclasses must implement click()")
     
-    def type(self, selector, text):
-        """Type text into an input field."""
+    def type(self, selector, text, target=None):
+        """Type text into an input field found by CSS selector or by a text, role or label target."""
         raise NotImplementedError("Subclasses must implement type()")
     
+    def scroll_collect(self, item_selector=None, max_items=200, max_bytes=50000, max_seconds=30, max_scrolls=30):
+        """Scroll through the page and collect the text of lazily loaded items."""
+        raise NotImplementedError("Subclasses must implement scroll_collect()")
+    
     def take_screenshot(self, file_path=None):
         """Take a screenshot of the current page."""
         raise NotImplementedError("Subclasses must implement take_screenshot()")
     
+    def track_operation(self, name, record=None):
+        """Return a context manager that times a high-level operation into record."""
+        return timed_operation(record)
+    
+    def begin_task(self):
+        """Prepare the browser for a new task."""
+        pass
+    
+    def end_task(self):
+        """Release what the browser reserved for the task that just finished."""
+        pass
+    
+    def start_tracing(self):
+        """Start recording a trace of browser activity. Returns True if tracing started."""
+        return False
+    
+    def stop_tracing(self, file_path):
+        """Stop recording and save the trace. Returns the trace path, or None."""
+        return None
+    
+    def is_healthy(self):
+        """Check whether the browser can still be used."""
+        return True
+    
     def close(self):
         """Close the browser."""
         pass
@@ -48,13 +100,46 @@ class BaseBrowser:
 class PlaywrightBrowser(BaseBrowser):
     """Browser implementation using Playwright for full browser automation."""
     
-    def __init__(self, headless=True, user_agent=None, viewport_size=None, timeout=30000):
+    def __init__(self, headless=True, user_agent=None, viewport_size=None, timeout=30000, track_changes=False,
+                 subresource_cache=None, json_capture=None, launch_profile="default", max_pages=None,
+                 endpoint_registry=None, tab_cache=None, auto_dismiss=None):
         """Initialize the Playwright browser."""
         super().__init__()
         
+        self.endpoint_registry = endpoint_registry
+        self.endpoint = None  # Endpoint of the current context
+        self.task_endpoint = None  # Endpoint slot reserved for the running task
+        self._connections = {}  # Endpoint URL -> connected remote browser
+        self._local_browser = None
+        self.timeout = timeout
+        
+        # Keep recently used pages alive for repeat visits, within the page limit
+        self.tab_cache = None
+        if tab_cache is not None:
+            max_entries = tab_cache.get("max_entries", 4)
+            if max_pages:
+                max_entries = min(max_entries, max_pages - 1)
+            if max_entries > 0:
+                self.tab_cache = TabCache(**{**tab_cache, "max_entries": max_entries})
+        self._page_loaded_at = None
+        self._page_dirty = False
+        self._target_token = 0
+        
+        self.dismissal = None
+        if auto_dismiss is not None:
+            self.dismissal = DismissalLayer(blocked_action_seconds=(timeout or 30000) / 1000, **auto_dismiss)
+        
+        self.json_recorder = JsonResponseRecorder(**json_capture) if json_capture is not None else None
+        
+        self.track_changes = track_changes
+        self._journal_url = None
+        
         try:
             from playwright.sync_api import sync_playwright
             self.playwright = sync_playwright().start()
+            
+            # Count driver round trips and their latency for every operation
+            driver_metrics.instrument(self.playwright._impl_obj._connection)
         except ImportError as e:
             log_error(f"Failed to import playwright: {str(e)}")
             raise ImportError("Playwright is required for the PlaywrightBrowser. Install it with 'pip install playwright'.")
@@ -67,27 +152,37 @@ class PlaywrightBrowser(BaseBrowser):
             if not viewport_size:
                 viewport_size = {"width": 1280, "height": 800}
             
-            # Launch the browser
-            self.browser = self.playwright.chromium.launch(headless=headless)
-            
-            # Create a browser context with custom options
-            context_options = {
+            # Create browser contexts with custom options
+            self._context_options = {
                 "viewport": viewport_size,
                 "accept_downloads": True,
             }
             
             if user_agent:
-                context_options["user_agent"] = user_agent
-                
-            self.context = self.browser.new_context(**context_options)
+                self._context_options["user_agent"] = user_agent
+            self._subresource_cache = subresource_cache
+            self._max_pages = max_pages
             
-            # Create a new page
-            self.page = self.context.new_page()
+            # Prefer a remote browser server, launching locally only when none is available
+            self.browser = None
+            if endpoint_registry:
+                self.endpoint, self.browser = self._connect_remote()
+                if self.endpoint:
+                    # Endpoint slots are held by running tasks; begin_task() reserves one per task
+                    endpoint_registry.release(self.endpoint)
+            if not self.browser:
+                if endpoint_registry:
+                    logger.info("No remote browser available, launching a local browser")
+                # Launch the browser with the Chromium arguments of the selected profile
+                self._local_browser = self.playwright.chromium.launch(headless=headless,
+                                                                      args=get_launch_args(launch_profile))
+                self.browser = self._local_browser
+            
+            self.context = self._new_context(self.browser)
             
-            # Set default timeout
-            if timeout:
-                self.page.set_default_navigation_timeout(timeout)
-                self.page.set_default_timeout(timeout)
+            # Create a new page
+            self.page = None
+            self._activate_page(self.context.new_page())
             
             logger.info("Playwright browser initialized successfully")
         except Exception as e:
@@ -95,6 +190,172 @@ class PlaywrightBrowser(BaseBrowser):
             log_error(f"Failed to initialize Playwright browser: {str(e)}")
             raise
     
+    def _new_context(self, browser):
+        """Create a browser context with the configured options and handlers."""
+        context = browser.new_context(**self._context_options)
+        
+        # Record DOM mutations in every page so extraction can return only what changed
+        if self.track_changes:
+            context.add_init_script(JOURNAL_SCRIPT)
+        
+        # Serve static assets from the cache shared by all contexts in this process
+        if self._subresource_cache:
+            self._subresource_cache.attach(context)
+        
+        # Answer alert, confirm and prompt dialogs before they block the page
+        if self.dismissal:
+            self.dismissal.attach(context)
+        
+        # Close popups and other extra pages beyond the allowed number
+        if self._max_pages:
+            context.on("page", lambda page: page.close() if len(context.pages) > self._max_pages else None)
+        return context
+    
+    def _connect(self, endpoint):
+        """Return the connection to a remote endpoint, connecting on first use."""
+        browser = self._connections.get(endpoint.url)
+        if browser is not None and browser.is_connected():
+            return browser
+        
+        if endpoint.type == "cdp":
+            browser = self.playwright.chromium.connect_over_cdp(endpoint.url)
+        else:
+            browser = self.playwright.chromium.connect(endpoint.url)
+        
+        # Playwright servers use their own connection, which needs its own instrumentation
+        driver_metrics.instrument(browser._impl_obj._connection)
+        self._connections[endpoint.url] = browser
+        logger.info(f"Connected to remote browser {endpoint.url}")
+        return browser
+    
+    def _connect_remote(self):
+        """
+        Reserve a slot on the least loaded remote endpoint and connect to it.
+        
+        Returns:
+            (endpoint, browser), or (None, None) if no endpoint can be reached
+        """
+        while True:
+            endpoint = self.endpoint_registry.acquire()
+            if endpoint is None:
+                return None, None
+            
+            try:
+                return endpoint, self._connect(endpoint)
+            except Exception as e:
+                self.endpoint_registry.mark_down(endpoint, e)
+    
+    def begin_task(self):
+        """
+        Reserve a slot on the least loaded remote endpoint for a task, moving to a new context there if the
+        current context is on another endpoint. Without remote endpoints this does nothing.
+        """
+        if not self.endpoint_registry:
+            return
+        
+        endpoint, browser = self._connect_remote()
+        self.task_endpoint = endpoint
+        if endpoint is None:
+            log_browser("No remote browser has room for the task, keeping the current context")
+            return
+        if endpoint is self.endpoint:
+            # The current context is already on the least loaded endpoint
+            return
+        
+        try:
+            context = self._new_context(browser)
+        except Exception as e:
+            log_error(f"Could not open a context on remote browser {endpoint.url}: {str(e)}")
+            self.endpoint_registry.release(endpoint)
+            self.task_endpoint = None
+            return
+        
+        old_context = self.context
+        self.browser, self.context, self.endpoint = browser, context, endpoint
+        if self.tab_cache:
+            # Cached pages belong to the old context, which is closed below
+            self.tab_cache.clear()
+        self._activate_page(context.new_page())
+        self._page_loaded_at = None
+        self._page_dirty = False
+        old_context.close()
+        log_browser(f"Task placed on remote browser {endpoint.url}")
+    
+    def end_task(self):
+        """Free the remote endpoint slot reserved by begin_task()."""
+        if self.task_endpoint is not None:
+            self.endpoint_registry.release(self.task_endpoint)
+            self.task_endpoint = None
+    
+    def _activate_page(self, page):
+        """Make a page the one used by all browser methods."""
+        if self.json_recorder:
+            if self.page is not None and not self.page.is_closed():
+                self.json_recorder.detach(self.page)
+            self.json_recorder.attach(page)
+        
+        if page is not self.page and self.timeout:
+            page.set_default_navigation_timeout(self.timeout)
+            page.set_default_timeout(self.timeout)
+        
+        self.page = page
+        self._journal_url = None
+    
+    def _switch_to_cached_page(self, url):
+        """
+        Park the current page in the tab cache and switch to the best page for a URL.
+        
+        Returns:
+            True if the page already shows the URL, False if it still has to navigate
+        """
+        cached = self.tab_cache.take(url)
+        current = self.page
+        # The current page's recorded JSON responses stay with it, for when it is reused
+        saved_responses = self.json_recorder.save() if self.json_recorder else None
+        
+        # Pages changed by clicks or typing are not reused for later visits
+        if self._page_loaded_at and not self._page_dirty and current.url.startswith(('http://', 'https://')):
+            try:
+                memory = self.page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : 0")
+            except Exception:
+                memory = 0
+            evicted = self.tab_cache.put(current, self._page_loaded_at, memory, requested_url=self.current_url,
+                                         data=saved_responses)
+        else:
+            evicted = [current]
+        
+        if cached:
+            page, loaded_at, action, cached_responses = cached
+        else:
+            page = evicted.pop() if evicted else None
+            if page is None and len(self.tab_cache) >= self.tab_cache.max_entries:
+                page = self.tab_cache.pop_oldest()
+            if page is None:
+                page = self.context.new_page()
+            loaded_at, action = None, "navigate"
+        
+        for old_page in evicted:
+            if old_page is not page:
+                old_page.close()
+        
+        self._activate_page(page)
+        self._page_dirty = False
+        if action == "navigate":
+            return False
+        
+        if self.json_recorder:
+            # A reloaded page records its responses again
+            self.json_recorder.restore(cached_responses if action == "reuse" else None)
+        if action == "reload":
+            log_browser(f"Reloading cached page for {url}")
+            page.reload(wait_until="domcontentloaded")
+            loaded_at = time.time()
+        else:
+            log_browser(f"Reusing cached page for {url}")
+        page.bring_to_front()
+        self._page_loaded_at = loaded_at
+        return True
+    
     def navigate(self, url):
         """Navigate to a URL."""
         try:
@@ -103,11 +364,24 @@ class PlaywrightBrowser(BaseBrowser):
                 url = 'https://' + url
                 
             log_browser(f"Navigating to URL: {url}")
+            if self.tab_cache and self._switch_to_cached_page(url):
+                self.current_url = url
+                return {"success": True, "cached": True}
+            
+            if self.json_recorder:
+                self.json_recorder.reset()
+            
             response = self.page.goto(url, wait_until="domcontentloaded")
             self.current_url = url
             
             # Wait for page to be fully loaded
             self.page.wait_for_load_state("networkidle", timeout=30000)
+            self._page_loaded_at = time.time()
+            self._page_dirty = False
+            
+            # Clear consent banners and overlays before anything tries to interact
+            if self.dismissal:
+                self.dismissal.run(self.page)
             
             return {"success": True}
         except Exception as e:
@@ -133,13 +407,126 @@ class PlaywrightBrowser(BaseBrowser):
             # Get the text content
             text_content = soup.get_text(separator='\n', strip=True)
             
+            if self.track_changes:
+                self._reset_change_journal()
+            
             return text_content
         except Exception as e:
             log_error(f"Error getting content: {str(e)}")
             return None
     
-    def click(self, selector):
+    def get_json_responses(self):
+        """
+        Get the JSON payloads the current page loaded through XHR and fetch calls.
+        
+        Returns:
+            A list of dicts with "url", "status" and "data", empty if capture is disabled
+        """
+        if not self.json_recorder:
+            log_browser("JSON response capture is not enabled")
+            return []
+        
+        payloads = self.json_recorder.collect()
+        log_browser(f"Collected {len(payloads)} JSON responses")
+        return payloads
+    
+    def get_content_changes(self, max_changed_ratio=0.5):
+        """
+        Get only the regions of the current page that changed since the last extraction.
+        
+        Falls back to a full extraction when there is no earlier snapshot of this page,
+        when nothing changed, or when so much changed that a full extraction is cheaper.
+        
+        Returns:
+            A dict with the extracted "content" and whether it is "incremental"
+        """
+        if not self.track_changes or self._journal_url != self.page.url:
+            return {"incremental": False, "content": self.get_content()}
+        
+        try:
+            changes = self.page.evaluate(
+                "() => window.__browserAgentJournal ? window.__browserAgentJournal.take() : null"
+            )
+        except Exception as e:
+            log_error(f"Error reading change journal: {str(e)}")
+            changes = None
+        
+        if not changes or not changes['regions'] or changes['url'] != self._journal_url:
+            return {"incremental": False, "content": self.get_content()}
+        
+        if changes['pageChars'] and changes['changedChars'] > changes['pageChars'] * max_changed_ratio:
+            log_browser("Most of the page changed, using full extraction")
+            return {"incremental": False, "content": self.get_content()}
+        
+        log_browser(f"{len(changes['regions'])} changed regions "
+                    f"({changes['changedChars']} of {changes['pageChars']} characters)")
+        return {"incremental": True, "content": format_changed_regions(changes['regions'])}
+    
+    def _reset_change_journal(self):
+        """Mark the current page state as the baseline for the next incremental extraction."""
+        try:
+            installed = self.page.evaluate(
+                "() => window.__browserAgentJournal ? (window.__browserAgentJournal.reset(), true) : false"
+            )
+            if not installed:
+                self.page.evaluate(JOURNAL_SCRIPT)
+            self._journal_url = self.page.url
+        except Exception as e:
+            log_error(f"Error resetting change journal: {str(e)}")
+            self._journal_url = None
+    
+    def get_accessibility_tree(self, max_tokens=3000):
+        """Get a compact accessibility outline of the current page."""
+        try:
+            # Wait for content to stabilize
+            self.page.wait_for_load_state("networkidle", timeout=10000)
+            
+            snapshot = self.page.accessibility.snapshot(interesting_only=True)
+            
+            if self.track_changes:
+                self._reset_change_journal()
+            
+            return format_accessibility_tree(snapshot, max_tokens=max_tokens)
+        except Exception as e:
+            log_error(f"Error getting accessibility tree: {str(e)}")
+            return None
+    
+    def _locate(self, target):
+        """Return a locator for a text, role or label target, matched with one in-page lookup."""
+        self._target_token += 1
+        token = str(self._target_token)
+        match = self.page.evaluate(TARGET_INDEX_SCRIPT, {"target": target, "attribute": TARGET_ATTRIBUTE, "token": token})
+        if match:
+            log_browser(f"Matched {describe_target(target)} to {match['role'] or 'element'} '{match['name']}'")
+            return self.page.locator(f'[{TARGET_ATTRIBUTE}="{token}"]')
+        
+        log_browser(f"No indexed match for {describe_target(target)}, waiting for a Playwright locator")
+        return fallback_locator(self.page, target)
+    
+    def _click_target(self, target):
+        """Click the element matching a text, role or label target."""
+        try:
+            locator = self._locate(target)
+            try:
+                locator.click()
+            except Exception:
+                if not self.dismissal or not self.dismissal.run(self.page):
+                    raise
+                locator.click()
+            
+            # Let a navigation started by the click begin rendering
+            self.page.wait_for_load_state("domcontentloaded")
+            return {"success": True}
+        except Exception as e:
+            log_error(f"Click error: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    def click(self, selector=None, target=None):
         """Click an element on the page."""
+        self._page_dirty = True
+        if target:
+            return self._click_target(target)
+        
         try:
             # Try to scroll the element into view first
             try:
@@ -154,8 +541,13 @@ class PlaywrightBrowser(BaseBrowser):
             # Wait for the element to be visible
             self.page.wait_for_selector(selector, state="visible")
             
-            # Click the element
-            self.page.click(selector)
+            # Click the element, retrying once if an overlay that appeared late was in the way
+            try:
+                self.page.click(selector)
+            except Exception:
+                if not self.dismissal or not self.dismissal.run(self.page):
+                    raise
+                self.page.click(selector)
             
             # Wait for any potential navigation or page changes
             time.sleep(2)
@@ -165,8 +557,115 @@ class PlaywrightBrowser(BaseBrowser):
             log_error(f"Click error: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def type(self, selector, text):
+    def wait_for_settle(self, quiet_ms=500, timeout_ms=5000):
+        """
+        Wait until the page has stopped changing.
+        
+        The page is considered settled once no DOM mutations happened for quiet_ms.
+        Returns True if it settled before timeout_ms, False otherwise.
+        """
+        try:
+            result = self.page.evaluate(SETTLE_SCRIPT, {"quietMs": quiet_ms, "timeoutMs": timeout_ms})
+            return result['settled']
+        except Exception as e:
+            log_error(f"Error waiting for page to settle: {str(e)}")
+            return False
+    
+    def scroll_collect(self, item_selector=None, max_items=200, max_bytes=50000, max_seconds=30, max_scrolls=30):
+        """
+        Scroll through the page and collect the text of lazily loaded items.
+        
+        Text blocks are deduplicated by hash. Collection stops when the item, byte or time
+        budget is used up, or when scrolling no longer loads anything new.
+        
+        Returns:
+            A dict with the collected "content" as one document and collection statistics
+        """
+        selector = item_selector or DEFAULT_ITEM_SELECTOR
+        self._page_dirty = True
+        started = time.monotonic()
+        seen = set()
+        blocks = []
+        total_bytes = 0
+        idle_scrolls = 0
+        scrolls = 0
+        stop_reason = None
+        
+        try:
+            while True:
+                added = 0
+                texts = self.page.evaluate(COLLECT_SCRIPT, selector)
+                consumed = len(texts)
+                for index, text in enumerate(texts):
+                    normalized = " ".join(text.split())
+                    key = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+                    if key in seen:
+                        continue
+                    
+                    size = len(normalized.encode('utf-8'))
+                    if len(blocks) >= max_items:
+                        stop_reason = "max_items"
+                        consumed = index
+                        break
+                    if total_bytes + size > max_bytes:
+                        stop_reason = "max_bytes"
+                        consumed = index
+                        break
+                    
+                    seen.add(key)
+                    blocks.append(normalized)
+                    total_bytes += size
+                    added += 1
+                else:
+                    stop_reason = None
+                
+                # Blocks cut by the budget stay uncollected, so a later collection on the page still returns them
+                self.page.evaluate(MARK_COLLECTED_SCRIPT, consumed)
+                if stop_reason:
+                    break
+                if time.monotonic() - started >= max_seconds:
+                    stop_reason = "max_seconds"
+                    break
+                if scrolls >= max_scrolls:
+                    stop_reason = "max_scrolls"
+                    break
+                
+                # Two scrolls at the bottom without new items means the feed is exhausted
+                idle_scrolls = idle_scrolls + 1 if added == 0 else 0
+                at_bottom = self.page.evaluate(SCROLL_SCRIPT)
+                if at_bottom and idle_scrolls >= 2:
+                    stop_reason = "end_of_content"
+                    break
+                
+                scrolls += 1
+                remaining_ms = int((max_seconds - (time.monotonic() - started)) * 1000)
+                self.wait_for_settle(timeout_ms=max(0, min(5000, remaining_ms)))
+            
+            log_browser(f"Collected {len(blocks)} items ({total_bytes} bytes) in {scrolls} scrolls, "
+                        f"stopped by {stop_reason}")
+            return {
+                "success": True,
+                "content": "\n\n".join(blocks),
+                "items": len(blocks),
+                "bytes": total_bytes,
+                "scrolls": scrolls,
+                "stop_reason": stop_reason
+            }
+        except Exception as e:
+            log_error(f"Scroll collect error: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    def type(self, selector, text, target=None):
         """Type text into an input field."""
+        self._page_dirty = True
+        if target:
+            try:
+                self._locate(target).fill(text)
+                return {"success": True}
+            except Exception as e:
+                log_error(f"Type error: {str(e)}")
+                return {"success": False, "error": str(e)}
+        
         try:
             # Wait for the element to be visible
             self.page.wait_for_selector(selector, state="visible")
@@ -211,11 +710,55 @@ class PlaywrightBrowser(BaseBrowser):
             log_error(f"Screenshot error: {str(e)}")
             return None
     
+    def track_operation(self, name, record=None):
+        """Return a context manager that attributes driver round trips to an operation."""
+        return driver_metrics.operation(name, record)
+    
+    def start_tracing(self):
+        """Start recording a Playwright trace with DOM snapshots and screenshots."""
+        try:
+            self.context.tracing.start(screenshots=True, snapshots=True)
+            log_browser("Trace recording started")
+            return True
+        except Exception as e:
+            log_error(f"Error starting trace: {str(e)}")
+            return False
+    
+    def stop_tracing(self, file_path):
+        """Stop the current trace recording and save it as a zip archive."""
+        try:
+            file_path = Path(file_path)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            self.context.tracing.stop(path=str(file_path))
+            log_browser(f"Trace saved to {file_path}")
+            return file_path
+        except Exception as e:
+            log_error(f"Error saving trace: {str(e)}")
+            return None
+    
+    def is_healthy(self):
+        """Check that the browser is still connected and the page is open."""
+        try:
+            return self.browser.is_connected() and not self.page.is_closed()
+        except Exception:
+            return False
+    
     def close(self):
         """Close the browser."""
         try:
-            if hasattr(self, 'browser') and self.browser:
-                self.browser.close()
+            self.end_task()
+            if self.endpoint:
+                # Closing a connected browser only disconnects, so close our context explicitly
+                if getattr(self, 'context', None):
+                    self.context.close()
+                self.endpoint = None
+            
+            for connection in self._connections.values():
+                connection.close()
+            self._connections = {}
+            
+            if self._local_browser:
+                self._local_browser.close()
                 
             if hasattr(self, 'playwright') and self.playwright:
                 self.playwright.stop()
@@ -228,10 +771,13 @@ class PlaywrightBrowser(BaseBrowser):
 class RequestsBrowser(BaseBrowser):
     """Simple browser implementation using Requests and BeautifulSoup for basic web scraping."""
     
-    def __init__(self, user_agent=None):
+    def __init__(self, user_agent=None, max_download_bytes=None):
         """Initialize the Requests browser."""
         super().__init__()
         
+        # Pages larger than this are cut off while downloading instead of being read in full
+        self.max_download_bytes = max_download_bytes
+        
         if not user_agent:
             user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36 BrowserAGENT/1.0.0"
         
@@ -252,17 +798,40 @@ class RequestsBrowser(BaseBrowser):
                 url = 'https://' + url
                 
             log_browser(f"Navigating to URL: {url}")
-            response = self.session.get(url, timeout=30)
+            response = self.session.get(url, timeout=30, stream=bool(self.max_download_bytes))
             response.raise_for_status()
             
+            if self.max_download_bytes:
+                html = self._read_capped(response)
+            else:
+                html = response.text
+            
             self.current_url = url
             self.current_response = response
+            self.current_html = html
             
             return {"success": True}
         except Exception as e:
             log_error(f"RequestsBrowser navigation error: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    def _read_capped(self, response):
+        """Read a streamed response body up to max_download_bytes and decode it."""
+        chunks = []
+        received = 0
+        try:
+            for chunk in response.iter_content(chunk_size=16384):
+                chunks.append(chunk)
+                received += len(chunk)
+                if received >= self.max_download_bytes:
+                    log_browser(f"Page truncated at {self.max_download_bytes} bytes")
+                    break
+        finally:
+            response.close()
+        
+        body = b''.join(chunks)[:self.max_download_bytes]
+        return body.decode(response.encoding or 'utf-8', errors='replace')
+    
     def get_content(self):
         """Get the content of the current page."""
         if not hasattr(self, 'current_response'):
@@ -271,7 +840,7 @@ class RequestsBrowser(BaseBrowser):
         
         try:
             # Create BeautifulSoup object
-            soup = BeautifulSoup(self.current_response.text, 'html.parser')
+            soup = BeautifulSoup(self.current_html, 'html.parser')
             
             # Remove script and style elements
             for script in soup(["script", "style", "noscript", "iframe", "svg"]):
@@ -285,16 +854,40 @@ class RequestsBrowser(BaseBrowser):
             log_error(f"RequestsBrowser content extraction error: {str(e)}")
             return None
     
-    def click(self, selector):
+    def get_json_responses(self):
+        """Return the current response itself if the navigated URL served JSON."""
+        if not hasattr(self, 'current_response'):
+            return []
+        
+        if 'json' not in self.current_response.headers.get('Content-Type', ''):
+            return []
+        
+        try:
+            data = json.loads(self.current_html)
+        except ValueError:
+            return []
+        return [{"url": self.current_url, "status": self.current_response.status_code, "data": data}]
+    
+    def get_accessibility_tree(self, max_tokens=3000):
+        """Accessibility snapshots need a rendering engine."""
+        log_error("RequestsBrowser does not support accessibility snapshots. Use PlaywrightBrowser for this feature.")
+        return None
+    
+    def click(self, selector=None, target=None):
         """Simulate clicking an element by following the href if it's a link."""
         log_error("RequestsBrowser does not support clicking elements. Use PlaywrightBrowser for this feature.")
         return {"success": False, "error": "RequestsBrowser does not support clicking elements"}
     
-    def type(self, selector, text):
+    def type(self, selector, text, target=None):
         """Simulate typing text into an input field."""
         log_error("RequestsBrowser does not support typing text. Use PlaywrightBrowser for this feature.")
         return {"success": False, "error": "RequestsBrowser does not support typing text"}
     
+    def scroll_collect(self, item_selector=None, max_items=200, max_bytes=50000, max_seconds=30, max_scrolls=30):
+        """Scrolling needs a rendering engine."""
+        log_error("RequestsBrowser does not support scrolling. Use PlaywrightBrowser for this feature.")
+        return {"success": False, "error": "RequestsBrowser does not support scrolling"}
+    
     def take_screenshot(self, file_path=None):
         """Take a screenshot of the current page."""
         log_error("RequestsBrowser does not support taking screenshots. Use PlaywrightBrowser for this feature.")
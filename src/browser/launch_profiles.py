@@ -0,0 +1,50 @@
+"""
+Chromium Launch Profiles
+
+This module defines named sets of Chromium arguments that trade optional browser
+features for lower startup time and memory use.
+"""
+
+from src.utils.logger import logger
+
+# Background services and features the agent never uses
+LEAN_ARGS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-client-side-phishing-detection",
+    "--disable-domain-reliability",
+    "--disable-hang-monitor",
+    "--disable-gpu",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+]
+
+# Also caps renderer processes and turns off site isolation. Site isolation protects
+# pages from each other, so this profile is meant for trusted or disposable browsing.
+ULTRA_LEAN_ARGS = LEAN_ARGS + [
+    "--disable-software-rasterizer",
+    "--disable-site-isolation-trials",
+    "--renderer-process-limit=2",
+    "--disable-dev-shm-usage",
+    "--js-flags=--max-old-space-size=256",
+]
+
+LAUNCH_PROFILES = {
+    "default": [],
+    "lean": LEAN_ARGS,
+    "ultra-lean": ULTRA_LEAN_ARGS,
+}
+
+
+def get_launch_args(profile):
+    """Return the Chromium arguments for a launch profile, using the default for unknown names."""
+    if profile not in LAUNCH_PROFILES:
+        logger.warning(f"Unknown launch profile '{profile}', using 'default'")
+        profile = "default"
+    return list(LAUNCH_PROFILES[profile])
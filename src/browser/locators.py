@@ -0,0 +1,135 @@
+"""
+Text and Role Targeting
+
+This module resolves plan targets given as visible text, ARIA role plus accessible
+name, or form label, instead of CSS selectors. A single in-page script indexes the
+candidate elements, picks the best match and tags it so a Playwright locator can act
+on it. When the index finds nothing, Playwright's own text, role and label locators
+are used, which also wait for elements that have not been rendered yet.
+"""
+
+# Attribute used to hand the matched element over to a Playwright locator
+TARGET_ATTRIBUTE = "data-browser-agent-target"
+
+# Indexes candidate elements once and returns the best match for the target, tagged
+# with TARGET_ATTRIBUTE, or null. Exact name matches beat prefix matches, which beat
+# substring matches; visible, interactive elements and shorter names win ties.
+TARGET_INDEX_SCRIPT = """
+({ target, attribute, token }) => {
+    const normalize = (text) => (text || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const implicitRoles = {
+        a: 'link', button: 'button', select: 'combobox', textarea: 'textbox', summary: 'button',
+        h1: 'heading', h2: 'heading', h3: 'heading', h4: 'heading', h5: 'heading', h6: 'heading',
+        img: 'img', li: 'listitem', option: 'option', nav: 'navigation', main: 'main', form: 'form'
+    };
+    const inputRoles = {
+        checkbox: 'checkbox', radio: 'radio', button: 'button', submit: 'button', reset: 'button',
+        range: 'slider', search: 'searchbox', number: 'spinbutton'
+    };
+    const roleOf = (element) => {
+        const explicit = element.getAttribute('role');
+        if (explicit) return explicit.split(' ')[0];
+        const tag = element.tagName.toLowerCase();
+        if (tag === 'input') return inputRoles[(element.type || 'text').toLowerCase()] || 'textbox';
+        if (tag === 'a' && !element.hasAttribute('href')) return null;
+        return implicitRoles[tag] || null;
+    };
+    const labelOf = (element) => {
+        const parts = [];
+        if (element.labels) for (const label of element.labels) parts.push(label.innerText);
+        const labelledBy = element.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            for (const id of labelledBy.split(' ')) {
+                const label = document.getElementById(id);
+                if (label) parts.push(label.innerText);
+            }
+        }
+        parts.push(element.getAttribute('aria-label'), element.getAttribute('placeholder'));
+        return normalize(parts.filter(Boolean).join(' '));
+    };
+    const nameOf = (element) => normalize(
+        element.getAttribute('aria-label') || labelOf(element) || element.innerText || element.value
+        || element.getAttribute('alt') || element.getAttribute('title'));
+    const visible = (element) => {
+        const rect = element.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(element).visibility !== 'hidden';
+    };
+    const score = (text, wanted) => {
+        if (!text || !wanted) return 0;
+        if (text === wanted) return 3;
+        if (text.startsWith(wanted)) return 2;
+        if (text.includes(wanted)) return 1;
+        return 0;
+    };
+    
+    const better = (rank, other) => {
+        for (let index = 0; index < rank.length; index++) {
+            if (rank[index] !== other[index]) return rank[index] > other[index];
+        }
+        return false;
+    };
+    
+    const candidates = new Set(document.querySelectorAll(
+        'a, button, input, select, textarea, summary, label, option, [role], [onclick], [tabindex]'));
+    if (target.text) {
+        // Plain elements only qualify through a text node that contains the wanted text
+        const wanted = normalize(target.text);
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            if (node.parentElement && normalize(node.textContent).includes(wanted)) {
+                candidates.add(node.parentElement);
+            }
+        }
+    }
+    
+    let best = null;
+    for (const element of candidates) {
+        let matched = 0;
+        let name = '';
+        if (target.label) {
+            name = labelOf(element);
+            matched = score(name, normalize(target.label));
+        } else if (target.role) {
+            if (roleOf(element) !== target.role) continue;
+            name = nameOf(element);
+            matched = target.name ? score(name, normalize(target.name)) : 1;
+        } else if (target.text) {
+            name = normalize(element.innerText || element.value);
+            matched = score(name, normalize(target.text));
+        }
+        if (!matched) continue;
+        
+        const rank = [matched, visible(element) ? 1 : 0, roleOf(element) ? 1 : 0, -name.length];
+        if (!best || better(rank, best.rank)) best = { element, rank, name };
+    }
+    if (!best) return null;
+    
+    best.element.setAttribute(attribute, token);
+    return { role: roleOf(best.element), name: best.name.slice(0, 80) };
+}
+"""
+
+
+def describe_target(target):
+    """Return a short human-readable description of a target for logs."""
+    if target.get("label"):
+        return f"field labelled '{target['label']}'"
+    if target.get("role"):
+        return f"{target['role']} '{target['name']}'" if target.get("name") else target["role"]
+    return f"text '{target.get('text', '')}'"
+
+
+def is_valid_target(target):
+    """Check that a target has one of the supported forms."""
+    return isinstance(target, dict) and any(target.get(key) for key in ("text", "role", "label"))
+
+
+def fallback_locator(page, target):
+    """Build the equivalent Playwright locator, used when the in-page index finds no match."""
+    if target.get("label"):
+        return page.get_by_label(target["label"]).first
+    if target.get("role"):
+        if target.get("name"):
+            return page.get_by_role(target["role"], name=target["name"]).first
+        return page.get_by_role(target["role"]).first
+    return page.get_by_text(target["text"]).first
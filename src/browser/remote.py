@@ -0,0 +1,142 @@
+"""
+Remote Browser Endpoints
+
+This module keeps track of browser servers that PlaywrightBrowser can connect to
+instead of launching its own Chromium: Playwright browser servers (ws:// endpoints
+started with `playwright run-server` or `launchServer`) and Chromium instances that
+expose the DevTools protocol (CDP). Each task goes to the endpoint with the lowest
+current load, and endpoints that fail to connect are skipped for a while.
+"""
+
+import time
+import threading
+from urllib.parse import urlparse, urlunparse
+
+import requests
+
+from src.utils.logger import logger, log_error
+
+ENDPOINT_TYPES = {"playwright", "cdp"}
+
+
+class BrowserEndpoint:
+    """A remote browser server and the tasks this process is running on it."""
+    
+    def __init__(self, url, endpoint_type="playwright", max_contexts=8):
+        """
+        Initialize the endpoint.
+        
+        Args:
+            url: ws:// URL of a Playwright server, or http(s):// or ws:// URL of a CDP endpoint
+            endpoint_type: "playwright" or "cdp"
+            max_contexts: Number of contexts the endpoint is sized for
+        """
+        self.url = url
+        self.type = endpoint_type
+        self.max_contexts = max(1, max_contexts)
+        self.active = 0
+        self.failures = 0
+        self.down_until = 0
+    
+    def devtools_url(self):
+        """Return the HTTP base URL of a CDP endpoint."""
+        parsed = urlparse(self.url)
+        scheme = {"ws": "http", "wss": "https"}.get(parsed.scheme, parsed.scheme)
+        return urlunparse((scheme, parsed.netloc, "", "", "", ""))
+
+
+class EndpointRegistry:
+    """Chooses the least loaded remote endpoint for each task."""
+    
+    def __init__(self, endpoints, retry_seconds=30, probe_timeout=1.0):
+        """
+        Initialize the registry.
+        
+        Args:
+            endpoints: List of endpoint dicts with "url", optional "type" and "maxContexts"
+            retry_seconds: How long an endpoint that failed to connect is skipped
+            probe_timeout: Timeout for load queries against CDP endpoints, in seconds
+        """
+        self.retry_seconds = retry_seconds
+        self.probe_timeout = probe_timeout
+        self.endpoints = []
+        self._lock = threading.Lock()
+        
+        for entry in endpoints:
+            endpoint_type = entry.get("type", "playwright")
+            if not entry.get("url") or endpoint_type not in ENDPOINT_TYPES:
+                logger.warning(f"Ignoring invalid remote browser endpoint: {entry}")
+                continue
+            self.endpoints.append(BrowserEndpoint(entry["url"], endpoint_type, entry.get("maxContexts", 8)))
+    
+    def current_load(self, endpoint):
+        """
+        Estimate how busy an endpoint is, as a fraction of its capacity.
+        
+        CDP endpoints are asked for their open pages, which includes pages opened by
+        other processes. Playwright servers have no such query, so only the tasks
+        run by this process are counted.
+        """
+        load = endpoint.active
+        if endpoint.type == "cdp":
+            try:
+                targets = requests.get(f"{endpoint.devtools_url()}/json/list", timeout=self.probe_timeout).json()
+                load = max(load, sum(1 for target in targets if target.get("type") == "page"))
+            except (requests.RequestException, ValueError):
+                pass
+        return load / endpoint.max_contexts
+    
+    def acquire(self):
+        """Reserve a task slot on the least loaded available endpoint, or return None."""
+        now = time.time()
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.down_until <= now]
+        if not candidates:
+            return None
+        
+        loads = {id(endpoint): self.current_load(endpoint) for endpoint in candidates}
+        with self._lock:
+            candidates = [endpoint for endpoint in candidates if endpoint.active < endpoint.max_contexts]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda candidate: loads[id(candidate)])
+            endpoint.active += 1
+        return endpoint
+    
+    def release(self, endpoint):
+        """Free the task slot reserved on an endpoint."""
+        with self._lock:
+            endpoint.active = max(0, endpoint.active - 1)
+    
+    def mark_down(self, endpoint, error):
+        """Release a slot after a failed connection and skip the endpoint for a while."""
+        log_error(f"Remote browser {endpoint.url} unavailable: {str(error)}")
+        with self._lock:
+            endpoint.active = max(0, endpoint.active - 1)
+            endpoint.failures += 1
+            endpoint.down_until = time.time() + self.retry_seconds
+    
+    def snapshot(self):
+        """Return the state of every endpoint."""
+        now = time.time()
+        with self._lock:
+            return [{
+                "url": endpoint.url,
+                "type": endpoint.type,
+                "active": endpoint.active,
+                "max_contexts": endpoint.max_contexts,
+                "failures": endpoint.failures,
+                "available": endpoint.down_until <= now
+            } for endpoint in self.endpoints]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_endpoint_registry(endpoints, retry_seconds=30):
+    """Return the process-wide endpoint registry, creating it on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = EndpointRegistry(endpoints, retry_seconds=retry_seconds)
+        return _registry
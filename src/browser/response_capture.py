@@ -0,0 +1,107 @@
+"""
+JSON Response Capture
+
+This module records the JSON responses a page receives from its XHR and fetch calls,
+so the structured data can be used directly instead of scraping the rendered page.
+"""
+
+import json
+import fnmatch
+
+from src.utils.logger import log_browser, log_error
+
+# Request types that carry API data rather than documents or assets
+API_RESOURCE_TYPES = {"xhr", "fetch"}
+
+
+class JsonResponseRecorder:
+    """Records JSON API responses for a page, bounded by count and size limits."""
+    
+    def __init__(self, url_patterns=None, max_response_bytes=1024 * 1024, max_total_bytes=4 * 1024 * 1024,
+                 max_responses=50):
+        """
+        Initialize the recorder.
+        
+        Args:
+            url_patterns: Glob patterns a response URL must match (all URLs if empty)
+            max_response_bytes: Responses larger than this are skipped
+            max_total_bytes: Upper bound for the combined size of collected payloads
+            max_responses: Upper bound for the number of responses kept per page
+        """
+        self.url_patterns = url_patterns or []
+        self.max_response_bytes = max_response_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_responses = max_responses
+        self._responses = []
+    
+    def attach(self, page):
+        """Start recording the responses of a page."""
+        page.on("response", self._on_response)
+    
+    def detach(self, page):
+        """Stop recording the responses of a page."""
+        page.remove_listener("response", self._on_response)
+    
+    def reset(self):
+        """Forget the responses recorded so far."""
+        self._responses = []
+    
+    def save(self):
+        """Return the responses recorded so far, e.g. to keep them with a page parked for later reuse."""
+        return list(self._responses)
+    
+    def restore(self, responses):
+        """Continue with responses saved earlier, for a page that is reused."""
+        self._responses = list(responses or [])
+    
+    def _on_response(self, response):
+        """Keep a reference to matching responses; bodies are only read when collected."""
+        if len(self._responses) >= self.max_responses:
+            return
+        if response.request.resource_type not in API_RESOURCE_TYPES:
+            return
+        
+        headers = response.headers
+        if "json" not in headers.get("content-type", ""):
+            return
+        if self.url_patterns and not any(fnmatch.fnmatch(response.url, pattern) for pattern in self.url_patterns):
+            return
+        
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_response_bytes:
+            return
+        
+        self._responses.append(response)
+    
+    def collect(self):
+        """
+        Read and parse the recorded responses.
+        
+        Returns:
+            A list of dicts with the "url", "status" and parsed "data" of each response
+        """
+        payloads = []
+        total_bytes = 0
+        
+        for response in self._responses:
+            try:
+                body = response.body()
+            except Exception as e:
+                log_error(f"Could not read response body for {response.url}: {str(e)}")
+                continue
+            
+            if len(body) > self.max_response_bytes:
+                continue
+            if total_bytes + len(body) > self.max_total_bytes:
+                log_browser(f"JSON capture size limit reached after {len(payloads)} responses")
+                break
+            
+            try:
+                data = json.loads(body)
+            except ValueError:
+                continue
+            
+            payloads.append({"url": response.url, "status": response.status, "data": data})
+            total_bytes += len(body)
+        
+        return payloads
@@ -0,0 +1,70 @@
+"""
+Scrolling and Settle Detection
+
+This module holds the in-page scripts used to wait for a page to stop changing and
+to collect text blocks from feeds and lazily loaded lists while scrolling.
+"""
+
+# Elements collected as individual blocks when no item selector is given
+DEFAULT_ITEM_SELECTOR = "article, li, tr, [role=article], [role=listitem], p, h1, h2, h3, h4"
+
+# Resolves once the DOM has had no mutations for quietMs, or after timeoutMs
+SETTLE_SCRIPT = """
+({ quietMs, timeoutMs }) => new Promise((resolve) => {
+    const started = performance.now();
+    let timer = null;
+    const finish = (settled) => {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(deadline);
+        resolve({ settled, waitedMs: Math.round(performance.now() - started) });
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(() => finish(true), quietMs);
+    });
+    observer.observe(document, { childList: true, subtree: true, characterData: true });
+    timer = setTimeout(() => finish(true), quietMs);
+    const deadline = setTimeout(() => finish(false), timeoutMs);
+})
+"""
+
+# Scrolls one step down and reports whether the page was already at the bottom
+SCROLL_SCRIPT = """
+() => {
+    const scroller = document.scrollingElement || document.documentElement;
+    const atBottom = scroller.scrollTop + window.innerHeight >= scroller.scrollHeight - 2;
+    window.scrollBy(0, Math.round(window.innerHeight * 0.9));
+    return atBottom;
+}
+"""
+
+# Returns the text of matching blocks that were not collected before, outermost first; the
+# blocks stay pending until MARK_COLLECTED_SCRIPT marks the ones the caller kept
+COLLECT_SCRIPT = """
+(selector) => {
+    const matches = [...document.querySelectorAll(selector)];
+    const pending = [];
+    const blocks = [];
+    for (const element of matches) {
+        if (element.hasAttribute("data-browser-agent-collected")) continue;
+        if (element.parentElement && element.parentElement.closest(selector)) continue;
+        const text = (element.innerText || "").trim();
+        if (!text) continue;
+        pending.push(element);
+        blocks.push(text);
+    }
+    window.__browserAgentPending = pending;
+    return blocks;
+}
+"""
+
+# Marks the first count blocks of the last COLLECT_SCRIPT call as collected
+MARK_COLLECTED_SCRIPT = """
+(count) => {
+    for (const element of (window.__browserAgentPending || []).slice(0, count)) {
+        element.setAttribute("data-browser-agent-collected", "");
+    }
+    window.__browserAgentPending = [];
+}
+"""
@@ -0,0 +1,188 @@
+"""
+Browser Shards
+
+This module runs several browsers side by side, each on its own worker thread, so that
+concurrent tasks are not limited by a single Chromium browser process. Each browser has
+one page, so a shard runs one task at a time: a task goes to the idle shard that has
+run the fewest tasks, or waits for a shard to become free. A shard whose browser fails
+is drained: it receives no new tasks and is restarted once its current task finishes,
+without affecting the other shards.
+"""
+
+import os
+import time
+import threading
+
+from src.utils.logger import logger, log_error
+from src.browser.worker import BrowserWorker, BrowserProxy
+
+
+def resolve_shard_count(setting):
+    """Turn the shard setting into a count; "auto" uses one shard per four CPU cores."""
+    if setting == "auto":
+        return max(1, (os.cpu_count() or 1) // 4)
+    try:
+        return max(1, int(setting))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid browser shard count '{setting}', using 1")
+        return 1
+
+
+class BrowserShard:
+    """One browser worker and the tasks currently placed on it."""
+    
+    def __init__(self, index, factory):
+        """Initialize the shard with a worker that is not started yet."""
+        self.index = index
+        self.factory = factory
+        self.active = 0
+        self.tasks = 0
+        self.restarts = 0
+        self.draining = False
+        self.retry_at = 0
+        self._new_worker()
+    
+    def _new_worker(self):
+        """Replace the worker and its proxy with fresh ones."""
+        self.worker = BrowserWorker(self.factory, name=f"browser-shard-{self.index}")
+        self.browser = BrowserProxy(self.worker)
+    
+    @property
+    def launch_failed(self):
+        """Whether the browser of this shard failed to launch."""
+        return self.worker.ready.done() and self.worker.ready.exception() is not None
+    
+    def is_healthy(self):
+        """Check that the shard's browser is still usable."""
+        if self.launch_failed:
+            return False
+        if not self.worker.ready.done():
+            return True
+        try:
+            return self.browser.is_healthy()
+        except Exception:
+            return False
+
+
+class ShardPool:
+    """Places tasks on idle browser shards, one task per shard at a time."""
+    
+    def __init__(self, factory, shard_count=1, retry_seconds=30):
+        """
+        Initialize the pool without launching any browser.
+        
+        Args:
+            factory: Callable that creates a browser, run on the shard's worker thread
+            shard_count: Number of browsers to run
+            retry_seconds: Delay before relaunching a shard whose browser failed to start
+        """
+        self.retry_seconds = retry_seconds
+        self.shards = [BrowserShard(index, factory) for index in range(max(1, shard_count))]
+        self._lock = threading.Condition()
+        self._started = False
+    
+    def start(self):
+        """Launch every shard's browser in the background."""
+        self._started = True
+        for shard in self.shards:
+            shard.worker.start()
+    
+    @property
+    def started(self):
+        """Whether any shard has started launching its browser."""
+        return any(shard.worker.started for shard in self.shards)
+    
+    @property
+    def ready(self):
+        """Whether at least one shard has a running browser."""
+        return any(shard.worker.ready.done() and not shard.launch_failed for shard in self.shards)
+    
+    def acquire(self):
+        """
+        Place a task on an idle shard and wait for its browser, blocking while every shard is busy.
+        
+        Returns:
+            The shard, whose browser attribute is the browser to use
+        
+        Raises:
+            RuntimeError if no shard has a browser that can be started
+        """
+        tried = set()
+        while True:
+            with self._lock:
+                now = time.time()
+                for shard in self.shards:
+                    if shard.launch_failed and shard.active == 0 and shard.retry_at <= now:
+                        self._restart(shard)
+                candidates = [shard for shard in self.shards if shard.index not in tried
+                              and not shard.draining and not shard.launch_failed]
+                if not candidates:
+                    raise RuntimeError("No browser shard available")
+                idle = [shard for shard in candidates if shard.active == 0]
+                if not idle:
+                    self._lock.wait()
+                    continue
+                shard = min(idle, key=lambda candidate: candidate.tasks)
+                shard.active += 1
+                shard.tasks += 1
+            
+            try:
+                shard.worker.wait_until_ready()
+                return shard
+            except Exception as e:
+                log_error(f"Browser shard {shard.index} failed to launch: {str(e)}")
+                tried.add(shard.index)
+                with self._lock:
+                    shard.active -= 1
+                    shard.retry_at = time.time() + self.retry_seconds
+                    self._lock.notify_all()
+    
+    def release(self, shard):
+        """End a task on a shard, restarting the shard if its browser failed and it is now idle."""
+        healthy = shard.is_healthy()
+        with self._lock:
+            shard.active -= 1
+            if not healthy and not shard.draining:
+                logger.warning(f"Browser shard {shard.index} failed, draining it")
+                shard.draining = True
+            if shard.draining and shard.active == 0:
+                self._restart(shard)
+            self._lock.notify_all()
+    
+    def _restart(self, shard):
+        """Replace a shard's worker with a new one. Callers hold the lock."""
+        old_worker = shard.worker
+        shard._new_worker()
+        shard.draining = False
+        shard.restarts += 1
+        logger.info(f"Restarting browser shard {shard.index}")
+        
+        # Closing a crashed browser can block, so it happens off the caller's thread
+        threading.Thread(target=self._stop_worker, args=(old_worker,), daemon=True).start()
+        if self._started:
+            shard.worker.start()
+    
+    def _stop_worker(self, worker):
+        """Close a replaced worker, ignoring errors from a browser that already died."""
+        try:
+            worker.stop()
+        except Exception as e:
+            logger.warning(f"Error closing replaced browser shard: {str(e)}")
+    
+    def stop(self):
+        """Close every shard's browser."""
+        for shard in self.shards:
+            self._stop_worker(shard.worker)
+    
+    def snapshot(self):
+        """Return the state of every shard."""
+        with self._lock:
+            return [{
+                "shard": shard.index,
+                "active": shard.active,
+                "tasks": shard.tasks,
+                "restarts": shard.restarts,
+                "draining": shard.draining,
+                "ready": shard.worker.ready.done() and not shard.launch_failed,
+                "launch_seconds": shard.worker.launch_seconds
+            } for shard in self.shards]
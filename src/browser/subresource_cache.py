@@ -0,0 +1,275 @@
+"""
+Shared Subresource Cache
+
+This module provides a process-wide cache for static subresources (scripts, stylesheets,
+fonts and images) that is shared by every browser context through request routing.
+Only responses that a shared HTTP cache may store are kept, so nothing tied to a
+context's cookies or credentials is ever served to another context.
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from src.utils.logger import logger, log_error
+
+# Request types that are worth caching across contexts
+CACHEABLE_RESOURCE_TYPES = {"script", "stylesheet", "font", "image"}
+
+# Headers that describe the transfer rather than the resource and must not be replayed
+HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+# Upper bound for heuristic freshness when a response has no explicit lifetime
+MAX_HEURISTIC_FRESHNESS = 24 * 60 * 60
+
+
+def _parse_cache_control(value):
+    """Parse a Cache-Control header into a dict of lower-cased directives."""
+    directives = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, argument = part.partition("=")
+        directives[name.strip().lower()] = argument.strip().strip('"')
+    return directives
+
+
+def _parse_http_date(value):
+    """Parse an HTTP date header into a timestamp, or None if it is missing or invalid."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers):
+    """Compute how many seconds a response may be served without revalidation."""
+    directives = _parse_cache_control(headers.get("cache-control"))
+    if "no-cache" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except ValueError:
+                return 0
+    
+    date = _parse_http_date(headers.get("date")) or time.time()
+    expires = _parse_http_date(headers.get("expires"))
+    if expires is not None:
+        return max(0, int(expires - date))
+    
+    # Heuristic freshness: 10% of the time since the resource was last modified
+    last_modified = _parse_http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        return min(MAX_HEURISTIC_FRESHNESS, max(0, int((date - last_modified) / 10)))
+    return 0
+
+
+def is_storable(request_headers, status, headers):
+    """Check whether a shared cache may store this response."""
+    if status != 200:
+        return False
+    directives = _parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives or "private" in directives:
+        return False
+    if "set-cookie" in headers:
+        return False
+    # Responses to requests with credentials may be personalized, unless marked public
+    if ("authorization" in request_headers or "cookie" in request_headers) and "public" not in directives:
+        return False
+    vary = {field.strip().lower() for field in headers.get("vary", "").split(",") if field.strip()}
+    if vary - {"accept-encoding"}:
+        return False
+    # Without a lifetime or a validator the entry could never be reused
+    return freshness_lifetime(headers) > 0 or "etag" in headers or "last-modified" in headers
+
+
+class SubresourceCache:
+    """Size-bounded memory and disk cache for static subresources."""
+    
+    def __init__(self, directory, memory_bytes=64 * 1024 * 1024, disk_bytes=512 * 1024 * 1024):
+        """Initialize the cache and index any entries already stored on disk."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (meta, body)
+        self._memory_size = 0
+        self._disk = OrderedDict()  # key -> size in bytes
+        self._disk_size = 0
+        
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "bytes_served": 0}
+        
+        for meta_path in sorted(self.directory.glob("*.json"), key=lambda path: path.stat().st_mtime):
+            body_path = meta_path.with_suffix(".body")
+            if body_path.exists():
+                size = body_path.stat().st_size
+                self._disk[meta_path.stem] = size
+                self._disk_size += size
+        
+        logger.info(f"Subresource cache ready at {self.directory} ({len(self._disk)} entries on disk)")
+    
+    def attach(self, context):
+        """Route the cacheable requests of a browser context through the cache."""
+        context.route("**/*", self._handle_route)
+    
+    def _handle_route(self, route):
+        """Serve a request from the cache, revalidating or fetching it when needed."""
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+            route.fallback()
+            return
+        
+        request_headers = request.headers
+        # request.headers leaves out the cookie header, which only all_headers() includes
+        sent_headers = request.all_headers()
+        key = hashlib.sha256(request.url.encode("utf-8")).hexdigest()
+        entry = self._get(key)
+        
+        if entry and time.time() - entry[0]["stored_at"] < entry[0]["lifetime"]:
+            self._fulfill(route, entry, "hits")
+            return
+        
+        fetch_headers = None
+        if entry:
+            fetch_headers = dict(request_headers)
+            if entry[0]["headers"].get("etag"):
+                fetch_headers["if-none-match"] = entry[0]["headers"]["etag"]
+            if entry[0]["headers"].get("last-modified"):
+                fetch_headers["if-modified-since"] = entry[0]["headers"]["last-modified"]
+        
+        try:
+            response = route.fetch(headers=fetch_headers)
+        except Exception as e:
+            log_error(f"Subresource cache fetch failed for {request.url}: {str(e)}")
+            route.fallback()
+            return
+        
+        if response.status == 304 and entry:
+            meta, body = entry
+            meta["stored_at"] = time.time()
+            meta["lifetime"] = freshness_lifetime({**meta["headers"], **response.headers})
+            self._put(key, meta, body)
+            self._fulfill(route, entry, "revalidated")
+            return
+        
+        body = response.body()
+        with self._lock:
+            self.stats["misses"] += 1
+        
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in HOP_HEADERS}
+        if is_storable(sent_headers, response.status, response.headers):
+            meta = {
+                "url": request.url,
+                "status": response.status,
+                "headers": headers,
+                "stored_at": time.time(),
+                "lifetime": freshness_lifetime(response.headers),
+            }
+            self._put(key, meta, body)
+        
+        route.fulfill(status=response.status, headers=headers, body=body)
+    
+    def _fulfill(self, route, entry, outcome):
+        """Answer a routed request with a cached entry."""
+        meta, body = entry
+        with self._lock:
+            self.stats[outcome] += 1
+            self.stats["bytes_served"] += len(body)
+        route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+    
+    def _get(self, key):
+        """Look up an entry in memory, then on disk."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        
+        try:
+            meta = json.loads((self.directory / f"{key}.json").read_text())
+            body = (self.directory / f"{key}.body").read_bytes()
+        except (OSError, ValueError):
+            self._remove_from_disk(key)
+            return None
+        
+        with self._lock:
+            self._store_in_memory(key, meta, body)
+        return meta, body
+    
+    def _put(self, key, meta, body):
+        """Store an entry in both tiers, evicting the least recently used entries."""
+        with self._lock:
+            self._store_in_memory(key, meta, body)
+            self.stats["stored"] += 1
+        
+        if len(body) > self.disk_bytes:
+            return
+        try:
+            (self.directory / f"{key}.body").write_bytes(body)
+            (self.directory / f"{key}.json").write_text(json.dumps(meta))
+        except OSError as e:
+            log_error(f"Subresource cache write failed: {str(e)}")
+            return
+        
+        evicted = []
+        with self._lock:
+            self._disk_size += len(body) - self._disk.pop(key, 0)
+            self._disk[key] = len(body)
+            while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_size -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._delete_files(old_key)
+    
+    def _store_in_memory(self, key, meta, body):
+        """Add an entry to the memory tier. Callers must hold the lock."""
+        if len(body) > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key)[1])
+        self._memory[key] = (meta, body)
+        self._memory_size += len(body)
+        while self._memory_size > self.memory_bytes:
+            _, (_, old_body) = self._memory.popitem(last=False)
+            self._memory_size -= len(old_body)
+    
+    def _remove_from_disk(self, key):
+        """Forget a disk entry and delete its files."""
+        with self._lock:
+            self._disk_size -= self._disk.pop(key, 0)
+        self._delete_files(key)
+    
+    def _delete_files(self, key):
+        """Delete the files that back a disk entry."""
+        for suffix in (".json", ".body"):
+            try:
+                (self.directory / f"{key}{suffix}").unlink()
+            except FileNotFoundError:
+                pass
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache(directory, memory_bytes=64 * 1024 * 1024, disk_bytes=512 * 1024 * 1024):
+    """Return the process-wide subresource cache, creating it on first use."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SubresourceCache(directory, memory_bytes=memory_bytes, disk_bytes=disk_bytes)
+        return _shared_cache
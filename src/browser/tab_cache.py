@@ -0,0 +1,162 @@
+"""
+Hot Tab Cache
+
+This module keeps recently used pages alive after a task moves on, keyed by URL or by
+origin, so that a later visit can reuse a page that is already rendered instead of
+paying for a cold navigation. Entries expire after a maximum age, can be refreshed
+with a cheap reload after a shorter age, and are evicted when the cache exceeds its
+entry or memory limits.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, urlunparse
+
+KEY_MODES = {"url", "origin"}
+
+# Shared by every tab cache in the process, so /metrics can report them without
+# calling into the browser threads
+tab_cache_stats = {"hits": 0, "reloads": 0, "expired": 0, "misses": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(outcome):
+    """Increment one of the shared counters."""
+    with _stats_lock:
+        tab_cache_stats[outcome] += 1
+
+
+class TabCache:
+    """LRU cache of live pages with per-entry staleness and memory limits."""
+    
+    def __init__(self, max_entries=4, key_by="url", max_age_seconds=300, reload_after_seconds=60,
+                 max_memory_bytes=256 * 1024 * 1024):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Number of pages kept besides the one in use
+            key_by: "url" reuses a page only for the same URL, "origin" for any URL on the same origin
+            max_age_seconds: Pages older than this are navigated again instead of reused
+            reload_after_seconds: Pages older than this are reloaded before reuse (None to never reload)
+            max_memory_bytes: Upper bound for the combined JS heap of cached pages
+        """
+        self.max_entries = max_entries
+        self.key_by = key_by if key_by in KEY_MODES else "url"
+        self.max_age_seconds = max_age_seconds
+        self.reload_after_seconds = reload_after_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self._entries = OrderedDict()  # key -> (page, loaded_at, memory bytes, URLs the page shows, data)
+        self._aliases = {}  # key of a requested URL -> key of the entry for the page it led to
+        self._memory = 0
+    
+    @staticmethod
+    def normalize(url):
+        """Return a URL without its fragment and with an empty path written as "/", as pages report it."""
+        parsed = urlparse(url)
+        return urlunparse(parsed._replace(path=parsed.path or "/", fragment=""))
+    
+    def key(self, url):
+        """Return the cache key of a URL; fragments and a missing "/" path never make a difference."""
+        if self.key_by == "origin":
+            parsed = urlparse(url)
+            return f"{parsed.scheme}://{parsed.netloc}"
+        return self.normalize(url)
+    
+    def _remove(self, key):
+        """Remove an entry and the aliases that lead to it, and return it."""
+        entry = self._entries.pop(key)
+        self._memory -= entry[2]
+        for alias in [alias for alias, target in self._aliases.items() if target == key]:
+            del self._aliases[alias]
+        return entry
+    
+    def take(self, url):
+        """
+        Remove and return the cached page for a URL.
+        
+        Returns:
+            (page, loaded_at, action, data) where action is "reuse", "reload" or "navigate" and data is what was
+            kept with the page, or None on a miss
+        """
+        key = self.key(url)
+        if key not in self._entries:
+            # The URL may have been requested before and redirected to the page's URL
+            key = self._aliases.get(key)
+        if key is None:
+            _count("misses")
+            return None
+        
+        page, loaded_at, _, urls, data = self._remove(key)
+        age = time.time() - loaded_at
+        
+        if page.is_closed():
+            _count("misses")
+            return None
+        if age > self.max_age_seconds:
+            _count("expired")
+            return page, loaded_at, "navigate", None
+        if self.normalize(url) not in urls:
+            # Same origin but another URL: the page still saves the process and connection setup
+            _count("hits")
+            return page, loaded_at, "navigate", None
+        if self.reload_after_seconds is not None and age > self.reload_after_seconds:
+            _count("reloads")
+            return page, loaded_at, "reload", data
+        _count("hits")
+        return page, loaded_at, "reuse", data
+    
+    def put(self, page, loaded_at, memory_bytes=0, requested_url=None, data=None):
+        """
+        Keep a page for later reuse under its current URL and the URL that was requested for it.
+        
+        Args:
+            page: The page to keep
+            loaded_at: When the page was loaded
+            memory_bytes: JS heap size of the page
+            requested_url: URL navigated to, which may differ from the page's URL after redirects
+            data: Anything to keep with the page, returned by take()
+        
+        Returns:
+            Pages evicted to stay within the limits; the caller reuses or closes them
+        """
+        key = self.key(page.url)
+        urls = {self.normalize(page.url)}
+        evicted = []
+        if key in self._entries:
+            evicted.append(self._remove(key)[0])
+        
+        self._entries[key] = (page, loaded_at, memory_bytes, urls, data)
+        self._memory += memory_bytes
+        if requested_url:
+            urls.add(self.normalize(requested_url))
+            if self.key(requested_url) != key:
+                self._aliases[self.key(requested_url)] = key
+        
+        while self._entries and (len(self._entries) > self.max_entries or self._memory > self.max_memory_bytes):
+            evicted.append(self._remove(next(iter(self._entries)))[0])
+            _count("evictions")
+        return evicted
+    
+    def pop_oldest(self):
+        """Remove and return the least recently used page, or None if the cache is empty."""
+        if not self._entries:
+            return None
+        page = self._remove(next(iter(self._entries)))[0]
+        _count("evictions")
+        return page
+    
+    def clear(self):
+        """Forget every cached page, e.g. after their context was closed."""
+        self._entries.clear()
+        self._aliases.clear()
+        self._memory = 0
+    
+    def pages(self):
+        """Return the cached pages."""
+        return [entry[0] for entry in self._entries.values()]
+    
+    def __len__(self):
+        """Number of cached pages."""
+        return len(self._entries)
@@ -0,0 +1,141 @@
+"""
+Browser Worker Thread
+
+This module runs a browser on a dedicated thread. Playwright's sync API only works on
+the thread that started it, so the worker launches the browser in the background and
+executes every browser call on that thread, while callers on other threads wait for
+the result. Launching in the background lets the server start without waiting for
+Chromium; callers that need the browser wait on the readiness future instead.
+"""
+
+import sys
+import time
+import queue
+import threading
+import contextvars
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from src.utils.logger import logger
+
+
+class BrowserWorker:
+    """Owns a browser created by a factory and runs calls on it from a single thread."""
+    
+    def __init__(self, factory, name="browser-worker"):
+        """
+        Initialize the worker without starting it.
+        
+        Args:
+            factory: Callable that creates the browser, run on the worker thread
+            name: Name of the worker thread
+        """
+        self.factory = factory
+        self.name = name
+        self.ready = Future()
+        self.launch_seconds = None
+        self._browser = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def start(self):
+        """Start launching the browser in the background and return the readiness future."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self.ready
+    
+    @property
+    def started(self):
+        """Whether the browser launch has been started."""
+        return self._thread is not None
+    
+    def wait_until_ready(self, timeout=None):
+        """Start the worker if needed and block until the browser is up. Raises if the launch failed."""
+        self.start()
+        self.ready.result(timeout)
+        return self
+    
+    def call(self, function):
+        """Run function(browser) on the worker thread and return its result."""
+        if threading.current_thread() is self._thread:
+            return function(self._browser)
+        
+        self.wait_until_ready()
+        future = Future()
+        # Run in the caller's context, so that what the call logs ends up in the caller's task log
+        context = contextvars.copy_context()
+        self._queue.put((lambda browser: context.run(function, browser), future))
+        return future.result()
+    
+    def stop(self):
+        """Close the browser and end the worker thread."""
+        if self._thread is None:
+            return
+        if self.ready.exception() is None:
+            future = Future()
+            self._queue.put((lambda browser: browser.close(), future))
+            future.result()
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+    
+    def _run(self):
+        """Launch the browser, then execute queued calls until stopped."""
+        started = time.perf_counter()
+        try:
+            self._browser = self.factory()
+        except BaseException as e:
+            logger.error(f"Background browser launch failed: {str(e)}")
+            self.ready.set_exception(e)
+            return
+        
+        self.launch_seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Browser ready after {self.launch_seconds} s ({self.name})")
+        self.ready.set_result(self._browser)
+        
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            function, future = item
+            try:
+                future.set_result(function(self._browser))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class BrowserProxy:
+    """Exposes the browser of a BrowserWorker with the usual browser methods."""
+    
+    def __init__(self, worker):
+        """Initialize the proxy for a worker."""
+        self._worker = worker
+    
+    @property
+    def worker(self):
+        """The worker that owns the browser."""
+        return self._worker
+    
+    def __getattr__(self, name):
+        """Forward attribute access and method calls to the worker thread."""
+        worker = self._worker
+        worker.wait_until_ready()
+        if callable(getattr(type(worker.ready.result()), name, None)):
+            return lambda *args, **kwargs: worker.call(lambda browser: getattr(browser, name)(*args, **kwargs))
+        return worker.call(lambda browser: getattr(browser, name))
+    
+    @contextmanager
+    def track_operation(self, name, record=None):
+        """Enter and exit the browser's operation tracking on the worker thread."""
+        manager = self._worker.call(lambda browser: browser.track_operation(name, record))
+        entered = self._worker.call(lambda browser: manager.__enter__())
+        try:
+            yield entered
+        except BaseException:
+            exc_info = sys.exc_info()
+            if not self._worker.call(lambda browser: manager.__exit__(*exc_info)):
+                raise
+        else:
+            self._worker.call(lambda browser: manager.__exit__(None, None, None))
@@ -3,16 +3,27 @@ import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 # Global store for logs to be displayed in UI for current command
 current_task_logs = []
 
-def setup_logger(name, log_file=None, level=logging.INFO):
+# Log list of the task running in the current context; tasks running at the same time each collect their own
+_task_logs = ContextVar("task_logs", default=None)
+
+# Maximum number of entries kept in the task log (None for no limit)
+task_log_limit = None
+
+def setup_logger(name, log_file=None, level=logging.INFO, max_bytes=10*1024*1024, backup_count=5):
     """Set up and return a logger with console and file handlers."""
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    logger.handlers = []  # Clear existing handlers to avoid duplicates
+    # Close and remove existing handlers to avoid duplicates and leaking their open log files
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
 
     # Create formatter
     formatter = logging.Formatter(
@@ -33,7 +44,7 @@ def setup_logger(name, log_file=None, level=logging.INFO):
             log_dir.mkdir(parents=True, exist_ok=True)
 
         file_handler = RotatingFileHandler(
-            log_file, maxBytes=10*1024*1024, backupCount=5)
+            log_file, maxBytes=max_bytes, backupCount=backup_count)
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
 
@@ -42,32 +53,56 @@ def setup_logger(name, log_file=None, level=logging.INFO):
 # Main application logger
 logger = setup_logger('browser_agent')
 
+def set_task_log_limit(limit):
+    """Limit how many entries the task log keeps; older entries are dropped first."""
+    global task_log_limit
+    task_log_limit = limit
+
+@contextmanager
+def collect_task_logs(entries):
+    """Collect the task log entries written inside the block, and in contexts copied from it, in entries."""
+    token = _task_logs.set(entries)
+    try:
+        yield entries
+    finally:
+        _task_logs.reset(token)
+
+def _append_task_log(entry):
+    """Add an entry to the task log, dropping the oldest entries beyond the limit."""
+    entries = _task_logs.get()
+    if entries is None:
+        entries = current_task_logs
+    entries.append(entry)
+    if task_log_limit and len(entries) > task_log_limit:
+        del entries[:len(entries) - task_log_limit]
+
 def log_step(message):
     """Log a step in the process and add to the current task logs."""
     logger.info(message)
-    current_task_logs.append({"type": "info", "message": message})
+    _append_task_log({"type": "info", "message": message})
 
 def log_error(message):
     """Log an error and add to the current task logs."""
     logger.error(message)
-    current_task_logs.append({"type": "error", "message": message})
+    _append_task_log({"type": "error", "message": message})
 
 def log_browser(message, url=None):
     """Log a browser action and add to the current task logs."""
     logger.info(f"[BROWSER] {message}")
     if url:
-        current_task_logs.append({"type": "browser", "message": message, "url": url})
+        _append_task_log({"type": "browser", "message": message, "url": url})
     else:
-        current_task_logs.append({"type": "browser", "message": message})
+        _append_task_log({"type": "browser", "message": message})
 
 def log_ai(message):
     """Log an AI action and add to the current task logs."""
     logger.info(f"[AI] {message}")
-    current_task_logs.append({"type": "ai", "message": message})
+    _append_task_log({"type": "ai", "message": message})
 
 def get_task_logs():
     """Return the current task logs."""
-    return current_task_logs
+    entries = _task_logs.get()
+    return current_task_logs if entries is None else entries
 
 def clear_task_logs():
     """Clear the current task logs."""
@@ -1,6 +1,10 @@
 import os
 import sys
 import json
+import time
+import queue
+import random
+import threading
 import logging
 from pathlib import Path
 import traceback
@@ -11,20 +15,36 @@ from typing import Dict, Any, Optional
 project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(project_root))
 
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory
 from flask_cors import CORS
 
 # Import our modules
 from src.ai.provider_factory import AIProviderFactory
-from src.ai.base_provider import BaseAIProvider
+from src.ai.base_provider import BaseAIProvider, record_routes
+from src.ai.http_transport import configure_transport
+from src.ai.plan_stream import PlanStream
+from src.ai.plan_cache import PlanCache
+from src.ai.fast_planner import plan_command, record_model_plan, fast_planner_snapshot
+from src.ai.hedging import HedgedProvider, hedging_snapshot
+from src.ai.provider_router import ProviderRouter
+from src.ai.response_cache import CachedProvider, get_response_cache, bypass_cache, model_name
 from src.browser.engine import PlaywrightBrowser, RequestsBrowser
-from src.utils.logger import setup_logger, log_step, log_error, log_browser, log_ai, clear_task_logs
+from src.browser.subresource_cache import get_shared_cache
+from src.browser.tab_cache import tab_cache_stats
+from src.browser.dismissal import dismissal_snapshot
+from src.browser.locators import describe_target, is_valid_target
+from src.browser.driver_metrics import driver_metrics, timed_operation
+from src.browser.worker import BrowserProxy
+from src.browser.shards import ShardPool, resolve_shard_count
+from src.browser.remote import get_endpoint_registry
+from src.utils.logger import setup_logger, set_task_log_limit, log_step, log_error, log_browser, log_ai, clear_task_logs, collect_task_logs
 
 # Setup logging
 os.makedirs(project_root / 'logs', exist_ok=True)
+log_file_path = project_root / 'logs' / f'browser_agent_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
 logger = setup_logger(
     'browser_agent', 
-    log_file=project_root / 'logs' / f'browser_agent_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    log_file=log_file_path
 )
 
 # Initialize Flask app
@@ -37,22 +57,35 @@ CORS(app)
 config = {}  # Will be set in initialize_with_config
 ai_client = None  # Current AI provider
 current_provider_name = None  # Name of current provider
-browser = None  # Browser engine
+browser = None  # Requests browser used when Playwright cannot be started
+browser_pool = None  # Playwright browser shards, launched in the background
+requests_browser = None  # Lightweight browser preferred in low-resource mode
+server_started_at = None
+first_response_logged = False
+plan_cache = None  # Validated plans of earlier commands, set up in initialize_with_config
+provider_router = None  # Routes AI calls over all available providers when ai.router is enabled
+last_task_routes = {}  # Provider that served each call type of the most recent task
+
+# Plan steps that use a browser at all
+BROWSER_ACTIONS = {'browse', 'extract_content', 'click', 'type', 'scroll_collect'}
+
+# Plan steps that need a real rendering engine
+INTERACTIVE_ACTIONS = {'click', 'type', 'scroll_collect'}
 
-# Global store for the current task's logs
-current_task_logs = []
-last_processed_url = None
-last_screenshot = None
 available_providers = []
 
 def initialize_with_config(app_config: Dict[str, Any]) -> None:
     """Initialize the server with the provided configuration."""
-    global config, ai_client, current_provider_name, browser, available_providers
+    global config, ai_client, current_provider_name, available_providers, server_started_at
     
     # Store the configuration
     config = app_config
+    server_started_at = time.perf_counter()
     logger.info("Flask server initialized with configuration")
     
+    # Share pooled HTTP connections between all AI providers
+    configure_transport(config.get('ai', {}).get('http', {}))
+    
     # Get the default AI provider from config
     default_provider = config.get('ai', {}).get('defaultProvider', 'gemini')
     
@@ -62,7 +95,24 @@ def initialize_with_config(app_config: Dict[str, Any]) -> None:
     # Discover available providers
     detect_available_providers()
     
-    # Initialize browser engine - try Playwright, fall back to Requests if needed
+    # Spread calls over all available providers, failing over between them
+    initialize_provider_router()
+    
+    # Reuse the plans of repeated commands
+    initialize_plan_cache()
+    
+    # Shrink log buffers when running with little memory
+    low_resource = config.get('lowResource', {})
+    if low_resource.get('enabled', False):
+        setup_logger(
+            'browser_agent',
+            log_file=log_file_path,
+            max_bytes=low_resource.get('logFileMaxKB', 512) * 1024,
+            backup_count=low_resource.get('logBackupCount', 1)
+        )
+        set_task_log_limit(low_resource.get('maxTaskLogEntries', 200))
+    
+    # Start the browser engine without waiting for it; Requests is the fallback if Playwright fails
     initialize_browser_engine()
     
     # Create screenshots directory
@@ -99,7 +149,11 @@ def initialize_ai_provider(provider_name: str) -> bool:
     try:
         new_client = AIProviderFactory.create_provider(provider_name, provider_config)
         if new_client:
-            ai_client = new_client
+            # The cache wraps each provider rather than the hedge, so replies are keyed by the provider that wrote them
+            response_cache = get_configured_response_cache()
+            if response_cache:
+                new_client = CachedProvider(new_client, response_cache)
+            ai_client = add_hedging(new_client, provider_name, response_cache)
             current_provider_name = provider_name
             logger.info(f"Initialized AI provider: {provider_name}")
             return True
@@ -111,169 +165,652 @@ def initialize_ai_provider(provider_name: str) -> bool:
         logger.error(traceback.format_exc())
         return False
 
+def add_hedging(client, provider_name, response_cache=None):
+    """Race the configured secondary provider against the client, if hedging is enabled."""
+    hedging = config.get('ai', {}).get('hedging', {})
+    secondary_name = hedging.get('secondary')
+    if not hedging.get('enabled', False) or not secondary_name or secondary_name == provider_name:
+        return client
+    
+    secondary_config = config.get('ai', {}).get('providers', {}).get(secondary_name, {})
+    secondary = AIProviderFactory.create_provider(secondary_name, secondary_config) if secondary_config else None
+    if secondary is None:
+        logger.warning(f"Hedging disabled: secondary provider {secondary_name} could not be created")
+        return client
+    if response_cache:
+        secondary = CachedProvider(secondary, response_cache)
+    
+    logger.info(f"Hedging {provider_name} calls with {secondary_name}")
+    return HedgedProvider(
+        client, secondary,
+        percentile=hedging.get('percentile', 0.9),
+        initial_delay_seconds=hedging.get('initialDelaySeconds', 2.0),
+        min_samples=hedging.get('minSamples', 10),
+        max_prompt_chars=hedging.get('maxPromptChars', 4000),
+        measure_fraction=hedging.get('measureFraction', 0.1)
+    )
+
+def get_configured_response_cache():
+    """Return the shared LLM response cache, or None if it is disabled."""
+    cache_config = config.get('ai', {}).get('responseCache', {})
+    if not cache_config.get('enabled', False):
+        return None
+    return get_response_cache(
+        project_root / cache_config.get('directory', 'cache/responses'),
+        memory_entries=cache_config.get('memoryEntries', 512),
+        disk_bytes=cache_config.get('diskMB', 64) * 1024 * 1024,
+        ttl_seconds=cache_config.get('ttlSeconds')
+    )
+
+def initialize_provider_router():
+    """Replace the single AI provider with a router over all available providers, if enabled."""
+    global ai_client, provider_router
+    router_config = config.get('ai', {}).get('router', {})
+    if not router_config.get('enabled', False):
+        return
+    
+    # Each provider gets its own cache wrapper, so replies are keyed by the provider and model that produced them
+    response_cache = get_configured_response_cache()
+    clients = {}
+    for name in available_providers:
+        client = AIProviderFactory.create_provider(name, config['ai']['providers'][name])
+        if client:
+            clients[name] = CachedProvider(client, response_cache) if response_cache else client
+    if not clients:
+        logger.warning("Provider router disabled: none of the providers could be created")
+        return
+    
+    # The current provider only breaks ties, so the other providers are measured and can win on latency
+    provider_router = ProviderRouter(
+        clients,
+        preferences=router_config.get('preferences'),
+        default=current_provider_name,
+        alpha=router_config.get('ewmaAlpha', 0.3),
+        failure_threshold=router_config.get('failureThreshold', 3),
+        error_rate_threshold=router_config.get('errorRateThreshold', 0.5),
+        cooldown_seconds=router_config.get('cooldownSeconds', 30)
+    )
+    ai_client = provider_router
+    logger.info(f"Routing AI calls over: {', '.join(clients)}")
+    if config.get('ai', {}).get('hedging', {}).get('enabled', False):
+        logger.warning("Hedging is not applied while the provider router is enabled; the router fails over instead")
+
+def initialize_plan_cache():
+    """Create the action plan cache if it is enabled in the configuration."""
+    global plan_cache
+    cache_config = config.get('ai', {}).get('planCache', {})
+    if not cache_config.get('enabled', False):
+        plan_cache = None
+        return
+    cache_file = cache_config.get('file', 'cache/plans.json')
+    plan_cache = PlanCache(
+        file_path=project_root / cache_file if cache_file else None,
+        max_entries=cache_config.get('maxEntries', 1000),
+        ttl_seconds=cache_config.get('ttlSeconds', 86400)
+    )
+
 def initialize_browser_engine():
-    """Initialize the browser engine based on configuration."""
-    global browser
+    """Set up the browser engine, launching Playwright in the background or on first use."""
+    global browser_pool, requests_browser
     
-    try:
-        browser_config = config.get('browserAgent', {})
-        
-        browser = PlaywrightBrowser(
-            headless=browser_config.get('headless', True),
+    browser_config = config.get('browserAgent', {})
+    low_resource = config.get('lowResource', {})
+    if low_resource.get('enabled', False):
+        # Chromium is only launched once a plan actually needs page interaction
+        requests_browser = RequestsBrowser(
             user_agent=browser_config.get('userAgent'),
-            viewport_size={
-                "width": browser_config.get('viewport', {}).get('width', 1280),
-                "height": browser_config.get('viewport', {}).get('height', 800)
-            },
-            timeout=browser_config.get('defaultTimeout', 30000)
+            max_download_bytes=low_resource.get('maxDownloadKB', 512) * 1024
         )
-        logger.info("Playwright browser engine initialized successfully")
+        logger.info("Low-resource mode: using the Requests browser, Playwright will start on demand")
+    
+    shard_count = 1 if low_resource.get('enabled', False) else resolve_shard_count(browser_config.get('shards', 1))
+    browser_pool = ShardPool(create_playwright_browser, shard_count)
+    
+    startup = browser_config.get('browserStartup', 'background')
+    if startup == 'background' and not low_resource.get('enabled', False):
+        browser_pool.start()
+        logger.info(f"Launching {shard_count} Playwright browser(s) in the background")
+    else:
+        logger.info("Playwright browser will be launched on first use")
+
+def acquire_browser(task):
+    """Place a task on a Playwright browser shard, falling back to the Requests browser if none starts."""
+    global browser
+    
+    if not browser_pool.started:
+        log_browser("Launching Playwright browser")
+    elif not browser_pool.ready:
+        log_browser("Waiting for the Playwright browser to finish launching")
+    
+    try:
+        task["shard"] = browser_pool.acquire()
+        # With remote browsers, each task goes to the least loaded endpoint
+        task["shard"].browser.begin_task()
+        return task["shard"].browser
     except Exception as e:
-        logger.warning(f"Failed to initialize Playwright browser: {str(e)}. Falling back to Requests mode.")
-        browser = RequestsBrowser()
-        logger.info("Requests browser fallback initialized")
-
-def reset_task_state():
-    """Reset the state for a new task"""
-    global current_task_logs, last_processed_url, last_screenshot
-    current_task_logs = []
-    last_processed_url = None
-    last_screenshot = None
-
-def process_user_command(user_input):
-    """Process a user command through the agent pipeline"""
-    global current_task_logs, last_processed_url, last_screenshot, ai_client
-    reset_task_state()
+        if requests_browser is not None:
+            log_error(f"Failed to start Playwright browser: {str(e)}")
+            return requests_browser
+        if browser is None:
+            logger.warning(f"Failed to initialize Playwright browser: {str(e)}. Falling back to Requests mode.")
+            browser = RequestsBrowser()
+            logger.info("Requests browser fallback initialized")
+        return browser
+
+def renders_pages(task_browser):
+    """Check whether a browser renders pages, i.e. is Playwright rather than Requests."""
+    return isinstance(task_browser, (PlaywrightBrowser, BrowserProxy))
+
+def create_playwright_browser():
+    """Create a Playwright browser from the browserAgent configuration."""
+    browser_config = config.get('browserAgent', {})
+    low_resource = config.get('lowResource', {}).get('enabled', False)
+    
+    subresource_cache = None
+    cache_config = browser_config.get('subresourceCache', {})
+    if cache_config.get('enabled', False):
+        subresource_cache = get_shared_cache(
+            project_root / cache_config.get('directory', 'cache/subresources'),
+            memory_bytes=cache_config.get('memoryMB', 64) * 1024 * 1024,
+            disk_bytes=cache_config.get('diskMB', 512) * 1024 * 1024
+        )
+    
+    return PlaywrightBrowser(
+        headless=browser_config.get('headless', True),
+        user_agent=browser_config.get('userAgent'),
+        viewport_size={
+            "width": browser_config.get('viewport', {}).get('width', 1280),
+            "height": browser_config.get('viewport', {}).get('height', 800)
+        },
+        timeout=browser_config.get('defaultTimeout', 30000),
+        track_changes=browser_config.get('incrementalExtraction', False),
+        subresource_cache=subresource_cache,
+        json_capture=build_json_capture_options(browser_config.get('jsonCapture', {})),
+        tab_cache=build_tab_cache_options(browser_config.get('tabCache', {})),
+        auto_dismiss=build_auto_dismiss_options(browser_config.get('autoDismiss', {})),
+        launch_profile='ultra-lean' if low_resource else browser_config.get('launchProfile', 'default'),
+        max_pages=1 if low_resource else None,
+        endpoint_registry=get_remote_registry()
+    )
+
+def get_remote_registry():
+    """Return the registry of remote browser endpoints, or None if none are configured."""
+    remote_config = config.get('browserAgent', {}).get('remoteBrowsers', {})
+    if not remote_config.get('endpoints'):
+        return None
+    return get_endpoint_registry(remote_config['endpoints'], retry_seconds=remote_config.get('retrySeconds', 30))
+
+def streams_plans():
+    """Check whether plan steps should run while the plan is still being generated."""
+    # Low-resource mode picks the browser from the whole plan, so it waits for the plan to finish
+    return config.get('ai', {}).get('streamPlans', False) and not config.get('lowResource', {}).get('enabled', False)
+
+def fuses_answers():
+    """Check whether direct questions are answered inside the planning call."""
+    return config.get('ai', {}).get('fusedAnswers', False)
+
+def select_task_browser(actions, task):
+    """Pick the browser for a plan, without waiting for Playwright when the plan does not browse."""
+    action_types = {action.get('type') for action in actions}
+    if not action_types & BROWSER_ACTIONS:
+        return None
+    
+    if config.get('lowResource', {}).get('enabled', False) and not action_types & INTERACTIVE_ACTIONS:
+        log_browser("Low-resource mode: using the Requests browser for this task")
+        return requests_browser
+    
+    task_browser = acquire_browser(task)
+    
+    if should_trace_task(task.get("trace")) and task_browser.start_tracing():
+        task["tracing"] = task_browser
+    return task_browser
+
+def finish_task(task):
+    """Save the task's trace and return its browser shard to the pool."""
+    tracing_browser = task.get("tracing")
+    if tracing_browser is not None:
+        trace_path = f"traces/trace_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.zip"
+        if tracing_browser.stop_tracing(project_root / 'static' / trace_path):
+            task["trace_path"] = trace_path
+        prune_traces(project_root / 'static' / 'traces')
+    
+    if task.get("shard") is not None:
+        try:
+            task["shard"].browser.end_task()
+        finally:
+            browser_pool.release(task["shard"])
+
+def screenshots_enabled():
+    """Screenshots are skipped in low-resource mode to save memory and disk."""
+    return not config.get('lowResource', {}).get('enabled', False)
+
+def apply_content_budget(content):
+    """Cut page content to the low-resource content budget before it reaches the AI provider."""
+    low_resource = config.get('lowResource', {})
+    if not content or not low_resource.get('enabled', False):
+        return content
+    
+    max_chars = low_resource.get('maxContentChars', 4000)
+    if len(content) > max_chars:
+        log_browser(f"Content cut from {len(content)} to {max_chars} characters (low-resource mode)")
+        return content[:max_chars]
+    return content
+
+def build_json_capture_options(capture_config):
+    """Translate the jsonCapture config section into JsonResponseRecorder options."""
+    if not capture_config.get('enabled', False):
+        return None
+    
+    return {
+        "url_patterns": capture_config.get('urlPatterns', []),
+        "max_response_bytes": capture_config.get('maxResponseKB', 1024) * 1024,
+        "max_total_bytes": capture_config.get('maxTotalKB', 4096) * 1024,
+        "max_responses": capture_config.get('maxResponses', 50)
+    }
+
+def build_tab_cache_options(cache_config):
+    """Translate the tabCache config section into TabCache options."""
+    if not cache_config.get('enabled', False):
+        return None
+    
+    return {
+        "max_entries": cache_config.get('maxEntries', 4),
+        "key_by": cache_config.get('keyBy', 'url'),
+        "max_age_seconds": cache_config.get('maxAgeSeconds', 300),
+        "reload_after_seconds": cache_config.get('reloadAfterSeconds', 60),
+        "max_memory_bytes": cache_config.get('maxMemoryMB', 256) * 1024 * 1024
+    }
+
+def build_auto_dismiss_options(dismiss_config):
+    """Translate the autoDismiss config section into DismissalLayer options."""
+    if not dismiss_config.get('enabled', False):
+        return None
+    
+    return {
+        "dialog_policy": dismiss_config.get('confirmDialogs', 'accept'),
+        "extra_rules": dismiss_config.get('rules', [])
+    }
+
+def should_trace_task(trace_requested):
+    """Decide whether to record a Playwright trace for a task."""
+    if trace_requested is not None:
+        return bool(trace_requested)
+    
+    tracing_config = config.get('browserAgent', {}).get('tracing', {})
+    if not tracing_config.get('enabled', False):
+        return False
+    
+    sample_rate = tracing_config.get('sampleRate', 0.0)
+    return sample_rate > 0 and random.random() < sample_rate
+
+def prune_traces(traces_dir):
+    """Delete traces that exceed the configured retention limits."""
+    tracing_config = config.get('browserAgent', {}).get('tracing', {})
+    max_traces = tracing_config.get('maxTraces', 20)
+    max_age_seconds = tracing_config.get('maxAgeHours', 24) * 3600
+    now = datetime.now().timestamp()
+    
+    traces = sorted(traces_dir.glob('trace_*.zip'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for index, trace_file in enumerate(traces):
+        if index >= max_traces or now - trace_file.stat().st_mtime > max_age_seconds:
+            try:
+                trace_file.unlink()
+            except OSError as e:
+                logger.warning(f"Could not delete old trace {trace_file}: {str(e)}")
+
+def stream_ai_text(task, chunks, step_timing):
+    """Forward streamed AI output to the task's listener and return the full text"""
+    started = time.perf_counter()
+    parts = []
+    task["emit"]("reset", {"step": step_timing["step"]})
+    
+    for chunk in chunks:
+        if not parts:
+            step_timing["first_token_seconds"] = round(time.perf_counter() - started, 3)
+        parts.append(chunk)
+        task["emit"]("chunk", {"step": step_timing["step"], "text": chunk})
+    
+    step_timing["ai_seconds"] = round(time.perf_counter() - started, 3)
+    log_ai(f"Streamed {len(parts)} chunks, first after {step_timing.get('first_token_seconds', step_timing['ai_seconds'])} s "
+           f"of {step_timing['ai_seconds']} s")
+    return "".join(parts)
+
+def generate_answer(task, step_timing, question):
+    """Answer a question directly, streaming the answer when the task has a listener"""
+    if task.get("emit"):
+        return stream_ai_text(task, ai_client.stream_response(question), step_timing)
+    return ai_client.generate_response(question)
+
+def process_page_content(task, step_timing, content, user_input, processing_goal):
+    """Process page content for a goal, streaming the result when the task has a listener"""
+    content = apply_content_budget(content)
+    if task.get("emit"):
+        return stream_ai_text(task, ai_client.stream_process_content(content, user_input, processing_goal), step_timing)
+    return ai_client.process_content(content, user_input, processing_goal)
+
+def process_user_command(user_input, trace=None, emit=None, use_cache=True):
+    """Process a user command, recording a Playwright trace if requested or sampled; emit receives streamed AI output"""
+    global last_task_routes
+    # Tasks run at the same time, so everything a task produces is kept in its own dict
+    task = {"trace": trace, "emit": emit, "use_cache": use_cache, "logs": [], "routes": {},
+            "processed_url": None, "screenshot": None}
+    with collect_task_logs(task["logs"]), record_routes(task["routes"]):
+        try:
+            if use_cache:
+                result = execute_user_command(user_input, task)
+            else:
+                with bypass_cache():
+                    result = execute_user_command(user_input, task)
+        finally:
+            finish_task(task)
+    
+    if task["routes"]:
+        last_task_routes = dict(task["routes"])
+    if task.get("trace_path"):
+        result["trace"] = task["trace_path"]
+    return result
+
+def plan_without_model(user_input, task, plan_timing):
+    """Return the plan from the fast-path rules or the plan cache, or None if the model has to plan."""
+    fast_planner = config.get('ai', {}).get('fastPlanner', {})
+    if fast_planner.get('enabled', False):
+        rule_plan = plan_command(user_input, search_engine=fast_planner.get('searchEngine', 'google'))
+        if rule_plan:
+            rule, action_plan = rule_plan
+            plan_timing.update(seconds=0.0, source="rules")
+            log_step(f"Fast-path planner: {rule} command planned without a model call "
+                     f"({len(action_plan['actions'])} steps)")
+            return action_plan
+    
+    cached_plan = plan_cache.lookup(user_input) if plan_cache and task.get("use_cache", True) else None
+    if cached_plan:
+        action_plan, entry = cached_plan
+        plan_timing.update(seconds=0.0, source="cache")
+        log_step(f"Plan cache hit: reusing a {len(action_plan['actions'])}-step plan from "
+                 f"{entry['provider']} ({entry['model']}), {entry['age_seconds']} s old")
+        return action_plan
+    return None
+
+def store_plan(user_input, action_plan, task):
+    """Keep a freshly generated plan in the plan cache, unless the task skips the caches."""
+    if plan_cache is None or not task.get("use_cache", True):
+        return
+    provider_name, client = current_provider_name, ai_client
+    if task["routes"].get("plan") in getattr(ai_client, "providers", {}):
+        # The provider the router or the hedge got this task's plan from
+        provider_name = task["routes"]["plan"]
+        client = ai_client.providers[provider_name]
+    if plan_cache.store(user_input, action_plan, provider=provider_name, model=model_name(client, "plan")):
+        log_step("Stored the plan in the plan cache")
+
+def execute_user_command(user_input, task):
+    """Run a user command through the agent pipeline, recording the browser it used in task"""
+    global ai_client
     
     if ai_client is None:
         log_error("No AI provider initialized")
         return {
             "final_result": "I couldn't process your request because no AI provider is initialized. Please check your configuration.",
-            "logs": current_task_logs,
+            "logs": task["logs"],
             "processed_url": None,
             "screenshot": None
         }
     
     log_step("Received user command: " + user_input)
+    timings = []
     
     try:
         # Plan the action steps using the current AI provider
         log_step("Planning action steps...")
-        action_plan = ai_client.create_action_plan(user_input)
+        plan_timing = {"step": 0, "type": "plan"}
+        timings.append(plan_timing)
+        plan_stream = None
+        task_browser = None
+        known_plan = plan_without_model(user_input, task, plan_timing)
         
-        if not action_plan or 'actions' not in action_plan:
-            log_error("Failed to create a valid action plan")
-            return {
-                "final_result": "I couldn't plan how to handle your request. Please try again with a clearer instruction.",
-                "logs": current_task_logs,
-                "processed_url": None,
-                "screenshot": None
-            }
-        
-        log_step(f"Created action plan with {len(action_plan['actions'])} steps")
+        if known_plan:
+            actions = known_plan['actions']
+            task_browser = select_task_browser(actions, task)
+        elif streams_plans():
+            # Steps start as soon as the model has written them; the browser is chosen at the first browsing step
+            plan_stream = PlanStream(ai_client, user_input, inline_answers=fuses_answers())
+            actions = plan_stream
+        else:
+            planning_started = time.perf_counter()
+            action_plan = ai_client.create_action_plan(user_input, inline_answers=fuses_answers())
+            plan_timing["seconds"] = round(time.perf_counter() - planning_started, 3)
+            record_model_plan(plan_timing["seconds"])
+            
+            if not action_plan or 'actions' not in action_plan:
+                log_error("Failed to create a valid action plan")
+                return {
+                    "final_result": "I couldn't plan how to handle your request. Please try again with a clearer instruction.",
+                    "logs": task["logs"],
+                    "processed_url": None,
+                    "screenshot": None
+                }
+            
+            log_step(f"Created action plan with {len(action_plan['actions'])} steps")
+            store_plan(user_input, action_plan, task)
+            actions = action_plan['actions']
+            task_browser = select_task_browser(actions, task)
         
         final_result = "Task completed successfully."
         
+        # Set after clicks and typing so the next extraction can be incremental
+        page_interacted = False
+        
         # Execute each action in the plan
-        for i, action in enumerate(action_plan['actions']):
+        for i, action in enumerate(actions):
             action_type = action.get('type')
+            if plan_stream is not None and task_browser is None:
+                task_browser = select_task_browser([action], task)
             log_step(f"Executing step {i+1}: {action_type}")
             
-            if action_type == 'answer_directly':
-                question = action.get('question', user_input)
-                log_ai(f"Generating direct answer for: {question}")
-                final_result = ai_client.generate_response(question)
-                log_ai("Answer generated successfully")
-                
-            elif action_type == 'browse':
-                url = action.get('url')
-                if not url:
-                    log_error("URL not provided for browse action")
-                    continue
+            step_timing = {"step": i + 1, "type": action_type}
+            timings.append(step_timing)
+            
+            # Plans that only answer have no browser; their steps are timed all the same
+            if task_browser is None:
+                step_context = timed_operation(step_timing)
+            else:
+                step_context = task_browser.track_operation(action_type, step_timing)
+            
+            with step_context:
+                if action_type == 'answer_directly':
+                    question = action.get('question', user_input)
+                    if action.get('answer'):
+                        # Fused mode: the planning call already answered the question
+                        log_ai(f"Using the answer written with the plan for: {question}")
+                        final_result = action['answer']
+                        if task.get("emit"):
+                            stream_ai_text(task, [final_result], step_timing)
+                    else:
+                        log_ai(f"Generating direct answer for: {question}")
+                        final_result = generate_answer(task, step_timing, question)
+                        log_ai("Answer generated successfully")
                     
-                log_browser(f"Navigating to URL: {url}")
-                result = browser.navigate(url)
-                last_processed_url = url
-                
-                if result.get('success'):
-                    log_browser("Navigation successful")
+                elif action_type == 'browse':
+                    url = action.get('url')
+                    if not url:
+                        log_error("URL not provided for browse action")
+                        continue
+                        
+                    log_browser(f"Navigating to URL: {url}")
+                    result = task_browser.navigate(url)
+                    task["processed_url"] = url
                     
-                    # Take a screenshot if using Playwright
-                    if isinstance(browser, PlaywrightBrowser):
-                        screenshot_path = f"screenshots/screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                        full_path = browser.take_screenshot(project_root / 'static' / screenshot_path)
-                        if full_path:
-                            last_screenshot = screenshot_path
-                            log_step(f"Screenshot captured and saved")
-                else:
-                    log_error(f"Failed to navigate: {result.get('error')}")
-                
-            elif action_type == 'extract_content':
-                log_browser("Extracting content from current page")
-                content = browser.get_content()
-                
-                if content:
-                    log_browser("Content extracted successfully")
-                    processing_goal = action.get('processing_goal', 'Analyze the content')
+                    if result.get('success'):
+                        log_browser("Navigation successful")
+                        
+                        # Take a screenshot if using Playwright
+                        if renders_pages(task_browser) and screenshots_enabled():
+                            screenshot_path = f"screenshots/screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+                            with task_browser.track_operation('screenshot'):
+                                full_path = task_browser.take_screenshot(project_root / 'static' / screenshot_path)
+                            if full_path:
+                                task["screenshot"] = screenshot_path
+                                log_step(f"Screenshot captured and saved")
+                    else:
+                        log_error(f"Failed to navigate: {result.get('error')}")
                     
-                    log_ai(f"Processing content for: {processing_goal}")
-                    final_result = ai_client.process_content(content, user_input, processing_goal)
-                    log_ai("Content processing completed")
-                else:
-                    log_error("Failed to extract content")
-                    final_result = "I couldn't extract content from the page."
+                elif action_type == 'extract_content':
+                    log_browser("Extracting content from current page")
+                    browser_config = config.get('browserAgent', {})
+                    extraction_mode = action.get('mode', browser_config.get('extractionMode', 'text'))
+                    content = None
                     
-            elif action_type == 'click':
-                selector = action.get('selector')
-                if not selector:
-                    log_error("Selector not provided for click action")
-                    continue
+                    # Prefer the JSON the page loaded from its APIs over the rendered text
+                    if action.get('source') == 'network':
+                        payloads = task_browser.get_json_responses()
+                        if payloads and action.get('return_raw'):
+                            log_browser(f"Returning {len(payloads)} captured JSON responses directly")
+                            final_result = json.dumps(payloads, indent=2, ensure_ascii=False)
+                            page_interacted = False
+                            continue
+                        if payloads:
+                            content = json.dumps(payloads, ensure_ascii=False)
+                            log_browser(f"Using {len(payloads)} captured JSON responses")
+                        else:
+                            log_browser("No JSON responses captured, falling back to page content")
                     
-                log_browser(f"Clicking element: {selector}")
-                result = browser.click(selector)
-                
-                if result.get('success'):
-                    log_browser("Click successful")
+                    if not content and extraction_mode == 'accessibility' and renders_pages(task_browser):
+                        content = task_browser.get_accessibility_tree(
+                            max_tokens=browser_config.get('accessibilityTokenBudget', 3000)
+                        )
+                        if content:
+                            log_browser(f"Using accessibility tree ({len(content)} characters)")
+                        else:
+                            log_browser("Accessibility tree unavailable, falling back to page text")
                     
-                    # Take a screenshot after clicking
-                    if isinstance(browser, PlaywrightBrowser):
-                        screenshot_path = f"screenshots/screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                        full_path = browser.take_screenshot(project_root / 'static' / screenshot_path)
-                        if full_path:
-                            last_screenshot = screenshot_path
-                            log_step(f"Screenshot captured after click")
-                else:
-                    log_error(f"Failed to click: {result.get('error')}")
+                    if not content and page_interacted and browser_config.get('incrementalExtraction', False):
+                        content = task_browser.get_content_changes().get('content')
+                    elif not content:
+                        content = task_browser.get_content()
+                    page_interacted = False
                     
-            elif action_type == 'type':
-                selector = action.get('selector')
-                text = action.get('text')
+                    if content:
+                        log_browser("Content extracted successfully")
+                        processing_goal = action.get('processing_goal', 'Analyze the content')
+                        
+                        log_ai(f"Processing content for: {processing_goal}")
+                        final_result = process_page_content(task, step_timing, content, user_input, processing_goal)
+                        log_ai("Content processing completed")
+                    else:
+                        log_error("Failed to extract content")
+                        final_result = "I couldn't extract content from the page."
                 
-                if not selector or not text:
-                    log_error("Selector or text not provided for type action")
-                    continue
+                elif action_type == 'scroll_collect':
+                    scroll_config = config.get('browserAgent', {}).get('scrollCollect', {})
+                    log_browser("Scrolling and collecting content from current page")
+                    # The plan may ask for fewer items than the configured cap, never more
+                    max_items_cap = scroll_config.get('maxItems', 200)
+                    try:
+                        max_items = min(int(action.get('max_items', max_items_cap)), max_items_cap)
+                    except (TypeError, ValueError):
+                        max_items = max_items_cap
+                    result = task_browser.scroll_collect(
+                        item_selector=action.get('item_selector'),
+                        max_items=max_items,
+                        max_bytes=scroll_config.get('maxBytes', 50000),
+                        max_seconds=scroll_config.get('maxSeconds', 30),
+                        max_scrolls=scroll_config.get('maxScrolls', 30)
+                    )
                     
-                log_browser(f"Typing '{text}' into: {selector}")
-                result = browser.type(selector, text)
-                
-                if result.get('success'):
-                    log_browser("Typing successful")
-                else:
-                    log_error(f"Failed to type: {result.get('error')}")
+                    if result.get('success'):
+                        content = result.get('content')
+                    else:
+                        log_error(f"Failed to scroll and collect: {result.get('error')}")
+                        content = task_browser.get_content()
+                    page_interacted = False
                     
-            elif action_type == 'clarify':
-                message = action.get('message', "Could you please clarify your request?")
-                log_step(f"Clarification needed: {message}")
-                final_result = message
+                    if content:
+                        processing_goal = action.get('processing_goal', 'Analyze the content')
+                        
+                        log_ai(f"Processing collected content for: {processing_goal}")
+                        final_result = process_page_content(task, step_timing, content, user_input, processing_goal)
+                        log_ai("Content processing completed")
+                    else:
+                        log_error("Failed to collect content")
+                        final_result = "I couldn't collect content from the page."
                 
-            else:
-                log_error(f"Unknown action type: {action_type}")
+                elif action_type == 'click':
+                    selector = action.get('selector')
+                    target = action.get('target') if is_valid_target(action.get('target')) else None
+                    if not selector and not target:
+                        log_error("Selector or target not provided for click action")
+                        continue
+                    
+                    # Text and role targets miss less often; the selector is the fallback
+                    result = {"success": False}
+                    if target:
+                        log_browser(f"Clicking {describe_target(target)}")
+                        result = task_browser.click(target=target)
+                    if not result.get('success') and selector:
+                        log_browser(f"Clicking element: {selector}")
+                        result = task_browser.click(selector)
+                    
+                    if result.get('success'):
+                        log_browser("Click successful")
+                        page_interacted = True
+                        
+                        # Take a screenshot after clicking
+                        if renders_pages(task_browser) and screenshots_enabled():
+                            screenshot_path = f"screenshots/screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+                            with task_browser.track_operation('screenshot'):
+                                full_path = task_browser.take_screenshot(project_root / 'static' / screenshot_path)
+                            if full_path:
+                                task["screenshot"] = screenshot_path
+                                log_step(f"Screenshot captured after click")
+                    else:
+                        log_error(f"Failed to click: {result.get('error')}")
+                        
+                elif action_type == 'type':
+                    selector = action.get('selector')
+                    target = action.get('target') if is_valid_target(action.get('target')) else None
+                    text = action.get('text')
+                    
+                    if not (selector or target) or not text:
+                        log_error("Selector or text not provided for type action")
+                        continue
+                    
+                    result = {"success": False}
+                    if target:
+                        log_browser(f"Typing '{text}' into: {describe_target(target)}")
+                        result = task_browser.type(None, text, target=target)
+                    if not result.get('success') and selector:
+                        log_browser(f"Typing '{text}' into: {selector}")
+                        result = task_browser.type(selector, text)
+                    
+                    if result.get('success'):
+                        log_browser("Typing successful")
+                        page_interacted = True
+                    else:
+                        log_error(f"Failed to type: {result.get('error')}")
+                        
+                elif action_type == 'clarify':
+                    message = action.get('message', "Could you please clarify your request?")
+                    log_step(f"Clarification needed: {message}")
+                    final_result = message
+                    
+                else:
+                    log_error(f"Unknown action type: {action_type}")
+        
+        if plan_stream is not None:
+            plan_timing.update(plan_stream.timing())
+            record_model_plan(plan_timing["seconds"])
+            if plan_stream.complete:
+                store_plan(user_input, {"actions": plan_stream.actions}, task)
+            log_step(f"Plan of {len(plan_stream.actions)} steps streamed in {plan_timing['seconds']} s, "
+                     f"first step after {plan_timing['first_action_seconds']} s, "
+                     f"{plan_timing['overlap_seconds']} s overlapped with execution")
                 
         return {
             "final_result": final_result,
-            "logs": current_task_logs,
-            "processed_url": last_processed_url,
-            "screenshot": last_screenshot
+            "logs": task["logs"],
+            "processed_url": task["processed_url"],
+            "screenshot": task["screenshot"],
+            "timings": timings
         }
         
     except Exception as e:
@@ -283,11 +820,20 @@ def process_user_command(user_input):
         
         return {
             "final_result": "I encountered an error while processing your request. Please try again.",
-            "logs": current_task_logs,
-            "processed_url": last_processed_url,
-            "screenshot": last_screenshot
+            "logs": task["logs"],
+            "processed_url": task["processed_url"],
+            "screenshot": task["screenshot"],
+            "timings": timings
         }
 
+def log_first_response():
+    """Log how long after startup the first command response was ready."""
+    global first_response_logged
+    if first_response_logged or server_started_at is None:
+        return
+    first_response_logged = True
+    logger.info(f"First response {time.perf_counter() - server_started_at:.2f} s after startup")
+
 # Flask routes
 @app.route('/')
 def index():
@@ -306,21 +852,67 @@ def handle_command():
     if not user_command:
         return jsonify({"error": "No command provided"}), 400
         
-    result = process_user_command(user_command)
+    result = process_user_command(user_command, trace=data.get('trace'), use_cache=data.get('cache', True))
+    log_first_response()
     return jsonify(result)
 
+@app.route('/api/command/stream', methods=['POST'])
+def handle_command_stream():
+    """API endpoint to handle user commands, streaming the AI output as server-sent events"""
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+        
+    data = request.json
+    user_command = data.get('command')
+    
+    if not user_command:
+        return jsonify({"error": "No command provided"}), 400
+    
+    events = queue.Queue()
+    
+    def run_command():
+        result = None
+        try:
+            result = process_user_command(user_command, trace=data.get('trace'), use_cache=data.get('cache', True),
+                                          emit=lambda event, payload: events.put((event, payload)))
+        except Exception as e:
+            error_msg = f"Error processing streamed command: {str(e)}"
+            log_error(error_msg)
+            result = {"final_result": "I encountered an error while processing your request. Please try again.",
+                      "logs": [{"type": "error", "message": error_msg}]}
+        finally:
+            events.put(("result", result))
+    
+    def generate_events():
+        while True:
+            event, payload = events.get()
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+            if event == "result":
+                log_first_response()
+                return
+    
+    threading.Thread(target=run_command, name="command-stream", daemon=True).start()
+    return Response(generate_events(), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route('/api/providers', methods=['GET'])
 def get_available_providers():
     """Get available AI providers"""
-    return jsonify({
+    providers = {
         "providers": available_providers,
         "current": current_provider_name,
-        "default": config.get('ai', {}).get('defaultProvider', 'gemini')
-    })
+        "default": config.get('ai', {}).get('defaultProvider', 'gemini'),
+        # The providers that actually served the last task, which can differ from the current one
+        "last_routes": last_task_routes
+    }
+    if provider_router is not None:
+        providers["router"] = provider_router.state()
+    return jsonify(providers)
 
 @app.route('/api/providers/switch', methods=['POST'])
 def switch_ai_provider():
     """Switch to a different AI provider"""
+    global current_provider_name
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
         
@@ -336,6 +928,12 @@ def switch_ai_provider():
     if provider == current_provider_name:
         return jsonify({"message": f"Already using {provider}"})
     
+    if provider_router is not None and provider in provider_router.providers:
+        # The router keeps failing over; the chosen provider just goes first for every call type
+        provider_router.prefer(provider)
+        current_provider_name = provider
+        return jsonify({"message": f"Successfully switched to {provider}"})
+    
     success = initialize_ai_provider(provider)
     
     if success:
@@ -343,11 +941,53 @@ def switch_ai_provider():
     else:
         return jsonify({"error": f"Failed to switch to {provider}"}), 500
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Report driver round trips per operation and other runtime counters"""
+    metrics = {"driver": driver_metrics.snapshot()}
+    
+    if browser_pool is not None:
+        metrics["browser_shards"] = browser_pool.snapshot()
+    
+    remote_registry = get_remote_registry()
+    if remote_registry:
+        metrics["remote_browsers"] = remote_registry.snapshot()
+    
+    if config.get('browserAgent', {}).get('autoDismiss', {}).get('enabled', False):
+        metrics["dismissal"] = dismissal_snapshot()
+    
+    if config.get('browserAgent', {}).get('tabCache', {}).get('enabled', False):
+        metrics["tab_cache"] = dict(tab_cache_stats)
+    
+    response_cache = get_configured_response_cache()
+    if response_cache:
+        metrics["response_cache"] = response_cache.snapshot()
+    
+    if plan_cache is not None:
+        metrics["plan_cache"] = plan_cache.snapshot()
+    
+    if config.get('ai', {}).get('fastPlanner', {}).get('enabled', False):
+        metrics["fast_planner"] = fast_planner_snapshot()
+    
+    if config.get('ai', {}).get('hedging', {}).get('enabled', False):
+        metrics["hedging"] = hedging_snapshot()
+    
+    cache_config = config.get('browserAgent', {}).get('subresourceCache', {})
+    if cache_config.get('enabled', False):
+        metrics["subresource_cache"] = get_shared_cache(project_root / cache_config.get('directory', 'cache/subresources')).stats
+    
+    return jsonify(metrics)
+
 @app.route('/static/screenshots/<path:filename>')
 def serve_screenshot(filename):
     """Serve screenshot files"""
     return send_from_directory(project_root / 'static' / 'screenshots', filename)
 
+@app.route('/static/traces/<path:filename>')
+def serve_trace(filename):
+    """Serve Playwright trace archives"""
+    return send_from_directory(project_root / 'static' / 'traces', filename)
+
 if __name__ == '__main__':
     host = config['server'].get('host', '0.0.0.0')
     port = config['server'].get('port', 5000)
@@ -63,8 +63,8 @@ async function handleSendCommand() {
     addLogEntry('info', `Command: "${command}"`, 'command');
     
     try {
-        // Send command to backend
-        const response = await fetch('/api/command', {
+        // Send command to backend and show the AI output as it streams in
+        const response = await fetch('/api/command/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -76,7 +76,25 @@ async function handleSendCommand() {
             throw new Error(`Server error: ${response.status}`);
         }
         
-        const data = await response.json();
+        let streamedText = '';
+        const data = await readEventStream(response, (event, payload) => {
+            if (event === 'reset') {
+                streamedText = '';
+            } else if (event === 'chunk') {
+                if (!streamedText) {
+                    // Let the user read the answer while the task finishes
+                    loadingOverlay.classList.add('hidden');
+                    loadingOverlay.classList.remove('flex');
+                }
+                streamedText += payload.text;
+                resultContainer.innerHTML = formatResultContent(streamedText);
+                resultContainer.scrollTop = resultContainer.scrollHeight;
+            }
+        });
+        
+        if (!data) {
+            throw new Error('The response stream ended without a result');
+        }
         
         // Process the response
         processResponse(data);
@@ -93,6 +111,40 @@ async function handleSendCommand() {
     }
 }
 
+/**
+ * Reads server-sent events from a fetch response, passing each event to onEvent,
+ * and returns the payload of the final "result" event
+ */
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) return null;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let dataText = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataText += line.slice(5).trim();
+            });
+            
+            const payload = dataText ? JSON.parse(dataText) : null;
+            if (event === 'result') return payload;
+            onEvent(event, payload);
+        }
+    }
+}
+
 /**
  * Processes the response from the backend
  */
@@ -151,6 +203,11 @@ function processResponse(data) {
         showScreenshot(`/static/${data.screenshot}`);
     }
     
+    // Link the Playwright trace if one was recorded
+    if (data.trace) {
+        addLogEntry('browser', 'Playwright trace recorded for this task', `/static/${data.trace}`);
+    }
+    
     // Update status
     setStatusText('Ready');
 }
@@ -0,0 +1,50 @@
+"""Tests for the rule-based fast-path planner."""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.ai.fast_planner import plan_command, plan_question
+
+
+def test_url_commands():
+    """A single URL is browsed, with an extraction step only when the command asks for more."""
+    assert plan_command("open example.com") == ("url", {"actions": [{"type": "browse", "url": "https://example.com"}]})
+    
+    rule, plan = plan_command("summarize https://example.com/post")
+    assert rule == "url"
+    assert [action["type"] for action in plan["actions"]] == ["browse", "extract_content"]
+    
+    assert plan_command("compare example.com and example.org") is None
+    assert plan_command("open example.com and click login") is None
+    assert plan_command("open config.json") is None
+
+
+def test_search_commands():
+    """Search commands go to the named engine, or to the default one."""
+    rule, plan = plan_command("search for python tutorials on bing")
+    assert rule == "search"
+    assert plan["actions"][0]["url"] == "https://www.bing.com/search?q=python+tutorials"
+    
+    _, plan = plan_command("look up c++ templates", search_engine="duckduckgo")
+    assert plan["actions"][0]["url"] == "https://duckduckgo.com/html/?q=c%2B%2B+templates"
+    
+    assert plan_command("search for shoes and click the first result") is None
+
+
+def test_self_contained_questions_are_answered_directly():
+    """Questions about stable facts need no browsing."""
+    for question in ("what is the capital of france", "explain quantum entanglement", "who wrote hamlet",
+                     "is a tomato a fruit or a vegetable?"):
+        assert plan_question(question) == {"actions": [{"type": "answer_directly", "question": question}]}
+
+
+def test_questions_that_need_browsing_or_context():
+    """Current facts, requests and short questions without context go to the model planner."""
+    for question in ("what's the weather in berlin today", "who won the game last night",
+                     "what time is it in tokyo", "who is the president of the united states",
+                     "how much is a flight to paris", "what is the population of tokyo in 2024",
+                     "what does this page say about pricing", "can you check my inbox?",
+                     "is this correct?", "summarize the article"):
+        assert plan_question(question) is None, question
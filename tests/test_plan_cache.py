@@ -0,0 +1,27 @@
+"""Tests for the plan cache templates."""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.ai.plan_cache import PlanCache
+
+SEARCH_PLAN = {"actions": [
+    {"type": "browse", "url": "https://www.google.com/search?q=cats"},
+    {"type": "extract_content", "processing_goal": "Summarize the search results for: cats"}
+]}
+
+
+def test_literals_in_urls_are_encoded():
+    """A template learned from a literal that needs no encoding still encodes spaces and + in its URLs."""
+    cache = PlanCache()
+    assert cache.store('search "cats" on google', SEARCH_PLAN, provider="Gemini", model="test")
+    
+    plan, _ = cache.lookup('search "dogs and more" on google')
+    assert plan["actions"][0]["url"] == "https://www.google.com/search?q=dogs+and+more"
+    assert plan["actions"][1]["processing_goal"] == "Summarize the search results for: dogs and more"
+    
+    plan, _ = cache.lookup('search "c++" on google')
+    assert plan["actions"][0]["url"] == "https://www.google.com/search?q=c%2B%2B"
+    assert plan["actions"][1]["processing_goal"] == "Summarize the search results for: c++"
@@ -0,0 +1,42 @@
+"""Tests for the incremental action plan parser."""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.ai.plan_stream import IncrementalPlanParser
+
+PLAN = ('{"actions": [{"type": "browse", "url": "https://example.com/{x}"}, '
+        '{"type": "extract_content", "processing_goal": "Say \\"hi\\" }"}]}')
+
+
+def test_actions_are_returned_once_complete():
+    """Each action is handed over by the chunk that closes it, however the text is split."""
+    for size in (1, 3, 7, len(PLAN)):
+        parser = IncrementalPlanParser()
+        actions = []
+        for start in range(0, len(PLAN), size):
+            actions.extend(parser.feed(PLAN[start:start + size]))
+        assert actions == [
+            {"type": "browse", "url": "https://example.com/{x}"},
+            {"type": "extract_content", "processing_goal": 'Say "hi" }'}
+        ]
+        assert parser.done
+
+
+def test_partial_action_waits_for_its_closing_brace():
+    """Nothing is returned until the action object is complete."""
+    parser = IncrementalPlanParser()
+    assert parser.feed('Here is the plan: {"actions": [{"type": "bro') == []
+    assert parser.feed('wse", "url": "https://example.com"}') == [{"type": "browse", "url": "https://example.com"}]
+    assert not parser.done
+
+
+def test_comments_and_invalid_actions_are_skipped():
+    """Comments copied from the prompt example are ignored and unparsable actions are dropped."""
+    parser = IncrementalPlanParser()
+    actions = parser.feed('{"actions": [\n// First open the page\n{"type": "browse", "url": "https://a.com"},\n'
+                          '{"type": oops},\n{"type": "answer_directly", "question": "Why?"}\n]}')
+    assert actions == [{"type": "browse", "url": "https://a.com"},
+                       {"type": "answer_directly", "question": "Why?"}]
@@ -0,0 +1,123 @@
+"""Tests for the provider router's health tracking and routing."""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.ai.base_provider import BaseAIProvider, record_routes
+from src.ai.provider_router import ProviderHealth, ProviderRouter
+
+
+class FakeProvider(BaseAIProvider):
+    """Provider that returns a fixed reply or raises an error."""
+    
+    def __init__(self, name, reply="Answer", error=None):
+        self.provider_name = name
+        self.reply = reply
+        self.error = error
+        self.calls = 0
+    
+    def _complete(self, prompt, system=None, purpose="response"):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.reply
+
+
+def measured(health, seconds):
+    """Give a provider a latency EWMA with one successful call."""
+    health.record(seconds, True)
+    return health
+
+
+def test_breaker_opens_when_an_unmeasured_provider_fails():
+    """A provider that fails before it ever answered waits for a probe instead of being scored as fastest."""
+    health = ProviderHealth(cooldown_seconds=30)
+    health.record(0.1, False)
+    assert health.state == "open"
+    assert not health.available(time.monotonic())
+
+
+def test_breaker_opens_after_consecutive_failures():
+    """A measured provider stays in rotation until failure_threshold failures in a row."""
+    health = measured(ProviderHealth(failure_threshold=3, min_calls=100), 1.0)
+    health.record(1.0, False)
+    health.record(1.0, False)
+    assert health.state == "closed"
+    health.record(1.0, False)
+    assert health.state == "open"
+
+
+def test_half_open_breaker_lets_one_probe_through_first():
+    """After the cool-down a single probe is allowed, scored ahead of every measured provider."""
+    health = ProviderHealth(cooldown_seconds=30)
+    health.record(0.1, False)
+    later = health.opened_at + 30
+    assert health.available(later)
+    assert health.state == "half_open"
+    assert health.score(later) == 0.0
+    
+    health.probing = True
+    assert not health.available(later)
+    
+    health.record(0.5, True)
+    assert health.state == "closed"
+    assert health.latency_ewma == 0.5
+
+
+def test_failed_probe_reopens_the_breaker():
+    """A probe that fails sends the provider back into its cool-down."""
+    health = measured(ProviderHealth(cooldown_seconds=30), 1.0)
+    health.state, health.opened_at = "open", time.monotonic() - 30
+    assert health.available(time.monotonic())
+    health.record(1.0, False)
+    assert health.state == "open"
+
+
+def test_error_rate_halves_per_idle_cool_down():
+    """Without calls, the error rate decays so that a provider sidelined by its errors is tried again."""
+    health = measured(ProviderHealth(cooldown_seconds=10, min_calls=100, failure_threshold=100), 1.0)
+    health.record(1.0, False)
+    rate = health.error_rate
+    assert rate > 0
+    assert abs(health.decayed_error_rate(health.last_call_at + 10) - rate / 2) < 1e-9
+    assert abs(health.decayed_error_rate(health.last_call_at + 20) - rate / 4) < 1e-9
+
+
+def test_route_orders_preferences_then_latency_then_broken():
+    """Preferred providers go first, then the fastest, and providers with open breakers last."""
+    router = ProviderRouter({name: FakeProvider(name) for name in ("a", "b", "c", "d")},
+                            preferences={"plan": ["c"]})
+    measured(router.health["a"], 2.0)
+    measured(router.health["b"], 0.5)
+    measured(router.health["c"], 3.0)
+    router.health["d"].record(1.0, False)
+    
+    assert router.route("plan") == ["c", "b", "a", "d"]
+    assert router.route("response") == ["b", "a", "c", "d"]
+
+
+def test_default_only_breaks_ties():
+    """The default provider wins among unmeasured providers but not against a faster measured one."""
+    router = ProviderRouter({name: FakeProvider(name) for name in ("a", "b")}, default="b")
+    assert router.route("plan") == ["b", "a"]
+    
+    measured(router.health["a"], 0.5)
+    measured(router.health["b"], 2.0)
+    assert router.route("plan") == ["a", "b"]
+
+
+def test_failover_records_the_provider_that_answered():
+    """A failing provider is skipped, and the routes name the provider whose reply was returned."""
+    failing = FakeProvider("a", error=RuntimeError("down"))
+    working = FakeProvider("b")
+    router = ProviderRouter({"a": failing, "b": working}, default="a")
+    
+    routes = {}
+    with record_routes(routes):
+        assert router._complete("prompt", purpose="response") == "Answer"
+    assert failing.calls == 1 and working.calls == 1
+    assert routes == {"response": "b"}
+    assert router.health["a"].state == "open"
@@ -0,0 +1,47 @@
+"""Tests for the HTTP caching rules of the subresource cache."""
+
+import sys
+import time
+from email.utils import formatdate
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.browser.subresource_cache import MAX_HEURISTIC_FRESHNESS, freshness_lifetime, is_storable
+
+
+def test_freshness_from_cache_control():
+    """s-maxage wins over max-age, and no-cache means every use is revalidated."""
+    assert freshness_lifetime({"cache-control": "public, max-age=600"}) == 600
+    assert freshness_lifetime({"cache-control": "max-age=600, s-maxage=60"}) == 60
+    assert freshness_lifetime({"cache-control": "no-cache, max-age=600"}) == 0
+    assert freshness_lifetime({"cache-control": "max-age=soon"}) == 0
+
+
+def test_freshness_from_expires_and_last_modified():
+    """Without max-age, Expires counts from Date; otherwise 10% of the age since Last-Modified, capped."""
+    now = time.time()
+    assert freshness_lifetime({"date": formatdate(now, usegmt=True),
+                               "expires": formatdate(now + 300, usegmt=True)}) == 300
+    assert freshness_lifetime({"date": formatdate(now, usegmt=True),
+                               "last-modified": formatdate(now - 1000, usegmt=True)}) == 100
+    assert freshness_lifetime({"date": formatdate(now, usegmt=True),
+                               "last-modified": formatdate(now - 10 ** 8, usegmt=True)}) == MAX_HEURISTIC_FRESHNESS
+    assert freshness_lifetime({}) == 0
+
+
+def test_storable_responses():
+    """Only shareable 200 responses with a lifetime or a validator are stored."""
+    cacheable = {"cache-control": "max-age=600"}
+    assert is_storable({}, 200, cacheable)
+    assert is_storable({}, 200, {"etag": '"v1"'})
+    assert is_storable({"cookie": "id=1"}, 200, {"cache-control": "public, max-age=600"})
+    assert is_storable({}, 200, dict(cacheable, vary="Accept-Encoding"))
+    
+    assert not is_storable({}, 404, cacheable)
+    assert not is_storable({}, 200, {})
+    assert not is_storable({}, 200, {"cache-control": "private, max-age=600"})
+    assert not is_storable({}, 200, {"cache-control": "no-store"})
+    assert not is_storable({}, 200, dict(cacheable, **{"set-cookie": "id=1"}))
+    assert not is_storable({"authorization": "Bearer x"}, 200, cacheable)
+    assert not is_storable({}, 200, dict(cacheable, vary="Cookie"))
@@ -0,0 +1,70 @@
+"""Tests for the hot tab cache."""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.browser.tab_cache import TabCache
+
+
+class FakePage:
+    """Page with the URL and closed state the cache looks at."""
+    
+    def __init__(self, url):
+        self.url = url
+        self.closed = False
+    
+    def is_closed(self):
+        return self.closed
+
+
+def test_least_recently_used_page_is_evicted():
+    """Beyond max_entries the page put longest ago is evicted; taking and putting back a page renews it."""
+    cache = TabCache(max_entries=2)
+    now = time.time()
+    a, b, c = FakePage("https://a.com/"), FakePage("https://b.com/"), FakePage("https://c.com/")
+    assert cache.put(a, now) == []
+    assert cache.put(b, now) == []
+    
+    page, _, action, _ = cache.take("https://a.com")
+    assert page is a and action == "reuse"
+    cache.put(a, now)
+    
+    assert cache.put(c, now) == [b]
+    assert cache.pages() == [a, c]
+
+
+def test_memory_limit_evicts_pages():
+    """Pages are evicted, oldest first, until the combined heap fits the memory limit."""
+    cache = TabCache(max_entries=10, max_memory_bytes=100)
+    now = time.time()
+    a, b = FakePage("https://a.com/"), FakePage("https://b.com/")
+    cache.put(a, now, memory_bytes=60)
+    assert cache.put(b, now, memory_bytes=60) == [a]
+    assert len(cache) == 1
+
+
+def test_redirected_page_is_found_by_the_requested_url():
+    """A page that was redirected can be taken by the URL that was requested for it, with its data."""
+    cache = TabCache()
+    page, loaded_at = FakePage("https://www.example.com/home"), time.time()
+    cache.put(page, loaded_at, requested_url="https://example.com", data="content")
+    assert cache.take("https://example.com/#top") == (page, loaded_at, "reuse", "content")
+    assert cache.take("https://example.com") is None
+
+
+def test_stale_and_closed_pages():
+    """Old pages are reloaded or navigated again, and closed pages count as misses."""
+    cache = TabCache(max_age_seconds=300, reload_after_seconds=60)
+    page = FakePage("https://a.com/")
+    cache.put(page, time.time() - 120, data="content")
+    assert cache.take("https://a.com/")[2:] == ("reload", "content")
+    
+    cache.put(page, time.time() - 600, data="content")
+    assert cache.take("https://a.com/")[2:] == ("navigate", None)
+    
+    cache.put(page, time.time())
+    page.closed = True
+    assert cache.take("https://a.com/") is None